@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import time
+import traceback
+from PyQt5.QtWidgets import QApplication
+
+
+class ScriptRunner:
+    """脚本模式：逐行执行命令，每条命令输出一行JSON记录，最后输出汇总"""
+
+    def __init__(self, console, out):
+        self.console = console
+        self.out = out
+        self.output = []
+
+        # 关闭打字效果，命令输出立即显示
+        console.terminal.set_typing_enabled(False)
+        console.terminal.text_inserted.connect(self.output.append)
+
+    def write(self, record):
+        """输出一行JSON"""
+        self.out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.out.flush()
+
+    def run_command(self, number, command):
+        """执行一条命令并返回记录"""
+        self.output.clear()
+        started = time.perf_counter()
+        try:
+            error = self.console.process_command(command)
+            status = "error" if error else "ok"
+        except Exception:
+            error = traceback.format_exc(limit=3).strip()
+            status = "exception"
+        # 让新打开的窗口完成显示和绘制，计入这条命令的耗时
+        QApplication.processEvents()
+        elapsed = (time.perf_counter() - started) * 1000
+
+        record = {"line": number, "command": command, "status": status,
+                  "ms": round(elapsed, 3), "output": "".join(self.output)}
+        if error:
+            record["error"] = error
+        return record
+
+    def run(self, lines):
+        """执行所有命令，返回退出状态：全部成功为0，否则为1"""
+        started = time.perf_counter()
+        count = failed = 0
+        for number, line in enumerate(lines, 1):
+            command = line.strip()
+            # 跳过空行和注释
+            if not command or command.startswith("#"):
+                continue
+            record = self.run_command(number, command)
+            self.write(record)
+            count += 1
+            if record["status"] != "ok":
+                failed += 1
+            # exit/quit 命令关闭主窗口后结束脚本
+            if not self.console.isVisible():
+                break
+
+        elapsed = time.perf_counter() - started
+        self.write({"summary": True, "commands": count, "failed": failed,
+                    "total_ms": round(elapsed * 1000, 3),
+                    "commands_per_second": round(count / elapsed, 1) if elapsed > 0 else None})
+        return 1 if failed else 0
@@ -1,27 +1,219 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import random
+import sys
 import numpy as np
+from PyQt5 import sip
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QDesktopWidget
 from PyQt5.QtCore import Qt, QTimer, QRect
-from PyQt5.QtGui import QPainter, QColor, QFont, QPen, QBrush
+from PyQt5.QtGui import QPainter, QColor, QFont, QPen, QBrush, QImage, QPixmap
+
+from damage import DamageTracker, region_columns
+from pacing import FramePacer
+from quality import QualityGovernor
+from theme import ensure_theme
+from visibility import VisibilityWatcher
+from rain_engine import CHARSET, RAIN_TICK, RainEngine
+
+# 默认目标帧率
+RAIN_FPS = 30
+
+# 字形图集的亮度级别数
+BRIGHTNESS_LEVELS = 32
+
+# 渲染后端
+BACKEND_ATLAS = "atlas"    # QPainter批量绘制字形图集
+BACKEND_RASTER = "raster"  # NumPy帧缓冲合成
+
+# 帧缓冲后端中残影每帧保留的亮度比例，0表示不保留残影
+TRAIL_DECAY = 0.6
+
+# 窗口重新可见时最多快进的模拟时间(秒)，足够让雨滴重新铺满画面
+CATCH_UP_TIME = 3.0
+
+
+class GlyphAtlas:
+    """字形图集，把字符集中每个字符按固定的亮度级别预渲染到一张QPixmap中"""
+    
+    def __init__(self, font, cell_width, cell_height, charset=CHARSET, levels=BRIGHTNESS_LEVELS):
+        self.font = QFont(font)
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.charset = charset
+        self.levels = levels
+        
+        # 亮度(0~255)到亮度级别的查找表
+        self.level_table = (np.arange(256) * (levels - 1) + 127) // 255
+        
+        # 每行一个亮度级别，每列一个字符
+        self.image = QImage(len(charset) * cell_width, levels * cell_height,
+                            QImage.Format_ARGB32_Premultiplied)
+        self.image.fill(Qt.transparent)
+        painter = QPainter(self.image)
+        painter.setFont(self.font)
+        for level in range(levels):
+            brightness = level * 255 // (levels - 1)
+            painter.setPen(QColor(0, brightness, 0))
+            for i, ch in enumerate(charset):
+                painter.drawText(QRect(i * cell_width, level * cell_height, cell_width, cell_height),
+                                 Qt.AlignCenter, ch)
+        painter.end()
+        self.pixmap = QPixmap.fromImage(self.image)
+    
+    def matches(self, font, cell_width, cell_height, charset):
+        """判断图集是否仍适用于给定的字体、字符尺寸和字符集"""
+        return (self.font == font and self.cell_width == cell_width
+                and self.cell_height == cell_height and self.charset == charset)
+    
+    def fragments(self, xs, ys, glyphs, brightness):
+        """把字符位置、索引和亮度数组一次性填充为drawPixmapFragments所需的片段数组"""
+        count = len(xs)
+        fragments = sip.array(QPainter.PixmapFragment, count)
+        if count:
+            # PixmapFragment依次为 x, y, sourceLeft, sourceTop, width, height,
+            # scaleX, scaleY, rotation, opacity，均为double
+            data = np.frombuffer(memoryview(fragments), dtype=np.float64).reshape(count, 10)
+            data[:, 0] = xs + self.cell_width / 2  # 片段位置为目标中心点
+            data[:, 1] = ys + self.cell_height / 2
+            data[:, 2] = glyphs.astype(np.float64) * self.cell_width
+            data[:, 3] = self.level_table[brightness] * self.cell_height
+            data[:, 4] = self.cell_width
+            data[:, 5] = self.cell_height
+            data[:, 6:8] = 1.0
+            data[:, 8] = 0.0
+            data[:, 9] = 1.0
+        return fragments
+    
+    def draw(self, painter, xs, ys, glyphs, brightness):
+        """批量绘制字符"""
+        painter.drawPixmapFragments(self.fragments(xs, ys, glyphs, brightness), self.pixmap)
+    
+    def coverageMasks(self):
+        """返回每个字符的覆盖度位图，形状为(字符数, 字符高度, 字符宽度)的uint8数组"""
+        image = self.image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+        ptr = image.constBits()
+        ptr.setsize(image.byteCount())
+        pixels = np.frombuffer(ptr, dtype=np.uint32).reshape(image.height(), image.bytesPerLine() // 4)
+        
+        # 最亮一级的绿色分量即为字形覆盖度
+        top = (self.levels - 1) * self.cell_height
+        green = (pixels[top:top + self.cell_height, :len(self.charset) * self.cell_width] >> 8) & 0xFF
+        masks = green.astype(np.uint8).reshape(self.cell_height, len(self.charset), self.cell_width)
+        return np.ascontiguousarray(masks.transpose(1, 0, 2))
+
+
+class RasterRenderer:
+    """帧缓冲渲染器，把字形位图直接合成到NumPy uint32数组中，该数组零拷贝包装为QImage"""
+    
+    def __init__(self, atlas, trail_decay=TRAIL_DECAY):
+        self.atlas = atlas
+        self.masks = atlas.coverageMasks().astype(np.uint16)
+        self.cell_width = atlas.cell_width
+        self.cell_height = atlas.cell_height
+        
+        # 每个基准步长残影保留的亮度比例
+        self.trail_decay = trail_decay
+        
+        # 0xFFRRGGBB像素在内存中的字节顺序
+        if sys.byteorder == "little":
+            self.channel_r, self.channel_g, self.channel_b, self.channel_a = 2, 1, 0, 3
+        else:
+            self.channel_r, self.channel_g, self.channel_b, self.channel_a = 1, 2, 3, 0
+        
+        self.width = 0
+        self.height = 0
+        self.image = None
+    
+    def resize(self, width, height):
+        """按窗口尺寸重新分配帧缓冲"""
+        self.width = width
+        self.height = height
+        
+        # 底部多留一行字符的高度，超出窗口的字符部分无需裁剪
+        padded = height + self.cell_height
+        self.intensity = np.zeros((padded, width), dtype=np.uint8)  # 绿色亮度(含残影)
+        self.scratch = np.zeros((padded, width), dtype=np.uint16)
+        self.buffer = np.zeros((padded, width), dtype=np.uint32)
+        self.channels = self.buffer.view(np.uint8).reshape(padded, width, 4)
+        self.channels[..., self.channel_a] = 255
+        
+        # 上一帧高光像素的位置，下一帧只需清除这些像素
+        self.highlighted = np.empty(0, dtype=np.intp)
+        
+        # 帧缓冲中仍有亮度(含残影)的列，这些列在下一帧必须重绘
+        self.columns = width // self.cell_width
+        self.lit_columns = np.empty(0, dtype=np.intp)
+        
+        # 每个字符图块内各像素相对左上角的偏移
+        self.tile_offsets = (np.arange(self.cell_height)[:, None] * width
+                             + np.arange(self.cell_width)[None, :])
+        
+        # QImage直接引用buffer的内存，不做拷贝；必须保持buffer存活
+        self.image = QImage(self.buffer.data, width, height, width * 4, QImage.Format_RGB32)
+    
+    def render(self, xs, ys, glyphs, brightness, ticks=1.0):
+        """合成一帧并返回对应的QImage，ticks为距上一帧经过的基准步长数"""
+        # 残影按经过的时间渐隐，衰减系数以1/256为单位的定点数表示
+        decay_factor = int(self.trail_decay ** ticks * 256) if self.trail_decay > 0 else 0
+        if decay_factor > 0:
+            np.multiply(self.intensity, np.uint16(decay_factor), out=self.scratch)
+            np.right_shift(self.scratch, 8, out=self.scratch)
+            self.intensity[...] = self.scratch
+        else:
+            self.intensity.fill(0)
+        
+        flat = self.intensity.reshape(-1)
+        pixels = np.empty(0, dtype=np.intp)
+        tiles = np.empty(0, dtype=np.uint8)
+        if len(xs):
+            # 按亮度缩放所有字形，得到(字符数, 高, 宽)的图块
+            tiles = (self.masks[glyphs] * brightness.astype(np.uint16)[:, None, None] // 255).astype(np.uint8)
+            
+            # 同一列的字符互不重叠，不同列也不重叠，可以一次性散射写入
+            pixels = (ys.astype(np.intp) * self.width + xs)[:, None, None] + self.tile_offsets[None]
+            flat[pixels] = np.maximum(flat[pixels], tiles)
+        
+        # 写入绿色通道
+        self.channels[..., self.channel_g] = self.intensity
+        
+        # 清除上一帧的头部高光，再为本帧雨滴头部(亮度255)叠加白色高光
+        raw = self.buffer.view(np.uint8).reshape(-1)
+        raw[self.highlighted * 4 + self.channel_r] = 0
+        raw[self.highlighted * 4 + self.channel_b] = 0
+        heads = brightness == 255
+        self.highlighted = pixels[heads].reshape(-1)
+        glow = (tiles[heads].astype(np.uint16) * 3 // 4).astype(np.uint8).reshape(-1)
+        raw[self.highlighted * 4 + self.channel_r] = glow
+        raw[self.highlighted * 4 + self.channel_b] = glow
+        
+        lit = self.intensity[:, :self.columns * self.cell_width].max(axis=0)
+        self.lit_columns = np.flatnonzero(lit.reshape(self.columns, self.cell_width).any(axis=1))
+        return self.image
 
-# 字符集，用于代码雨的显示
-CHARSET = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789!@#$%^&*()-=_+[]{}|;:'\",.<>/?"
 
 class CodeRainWindow(QWidget):
     """代码雨效果窗口"""
     
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, backend=BACKEND_ATLAS, target_fps=RAIN_FPS):
         super().__init__(parent, Qt.Window | Qt.FramelessWindowHint)
+        self.backend = backend
+        ensure_theme()
         self.initUI()
         self.initRain()
         
-        # 开始动画计时器
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.updateRain)
-        self.timer.start(50)  # 每50ms更新一次
+        # 开始动画，模拟按实际经过的时间推进
+        self.pacer = FramePacer(self, self.updateRain, self.renderRain, target_fps,
+                                catch_up=self.catchUp)
+        self.pacer.start()
+        
+        # 隐藏、最小化或被遮挡时暂停动画
+        self.visibility = VisibilityWatcher(self)
+        self.visibility.visibility_changed.connect(self.pacer.set_visible)
+        self.pacer.set_visible(self.visibility.visible)
+        
+        # 根据绘制耗时自动调节画质
+        self.governor = QualityGovernor(self.pacer)
+        self.governor.level_changed.connect(self.applyQuality)
         
         # 鼠标追踪
         self.setMouseTracking(True)
@@ -36,9 +228,6 @@ class CodeRainWindow(QWidget):
         self.resize(800, 600)
         self.setWindowTitle("Matrix Code Rain")
         
-        # 设置背景色
-        self.setStyleSheet("background-color: #000000;")
-        
         # 设置窗口半透明
         self.setWindowOpacity(0.9)
     
@@ -57,100 +246,145 @@ class CodeRainWindow(QWidget):
         self.columns = self.width() // self.char_width
         self.rows = self.height() // self.char_height
         
-        # 雨滴位置，-1表示该列当前没有雨滴
-        self.drops = [-1] * self.columns
-        
-        # 雨滴长度
-        self.drop_length = [random.randint(5, 20) for _ in range(self.columns)]
-        
-        # 雨滴速度
-        self.drop_speed = [random.uniform(0.3, 1.0) for _ in range(self.columns)]
-        
-        # 雨滴字符
-        self.drop_chars = [[] for _ in range(self.columns)]
-        
-        # 雨滴亮度
-        self.drop_brightness = [[] for _ in range(self.columns)]
-        
-        # 初始化一些雨滴
-        for i in range(0, self.columns, 3):  # 每3列初始化一个雨滴
-            self.drops[i] = random.randint(0, self.rows // 2)
-            self.generateDropChars(i)
-    
-    def generateDropChars(self, col):
-        """为一个雨滴生成随机字符"""
-        length = self.drop_length[col]
-        self.drop_chars[col] = [random.choice(CHARSET) for _ in range(length)]
-        
-        # 设置亮度，头部最亮，尾部最暗
-        brightness = []
-        for i in range(length):
-            if i == 0:
-                # 头部亮度255
-                brightness.append(255)
-            else:
-                # 后面逐渐变暗
-                b = max(0, 255 - (i * 255 // length))
-                brightness.append(b)
-        
-        self.drop_brightness[col] = brightness
-    
-    def updateRain(self):
-        """更新雨滴位置"""
-        for i in range(self.columns):
-            # 随机可能产生新雨滴
-            if self.drops[i] == -1 and random.random() < 0.02:
-                self.drops[i] = 0
-                self.generateDropChars(i)
-            
-            # 更新现有雨滴位置
-            if self.drops[i] >= 0:
-                self.drops[i] += self.drop_speed[i]
-                
-                # 如果雨滴超出屏幕底部，移除它
-                if self.drops[i] - self.drop_length[i] > self.rows:
-                    self.drops[i] = -1
-                
-                # 随机改变一些字符
-                if random.random() < 0.1:
-                    pos = random.randint(0, self.drop_length[i] - 1)
-                    if pos < len(self.drop_chars[i]):
-                        self.drop_chars[i][pos] = random.choice(CHARSET)
-        
-        # 触发重绘
+        # 脏区域跟踪，只重绘雨滴移动或变化的列
+        self.damage = DamageTracker(self, self.char_width, self.char_height)
+        
+        # 距上一次绘制经过的基准步长数
+        self.pending_ticks = 0.0
+        
+        # 雨滴模拟核心
+        self.charset = CHARSET
+        self.engine = RainEngine(self.columns, self.rows, self.charset)
+        
+        # 字体和字形图集，图集在字体或字符集改变时才重建
+        self.rain_font = QFont("Consolas", 16)
+        self.rain_font.setStyleHint(QFont.Monospace)
+        self.atlas = None
+        self.raster = None
+    
+    def ensureAtlas(self):
+        """确保字形图集与当前字体、字符尺寸和字符集一致"""
+        if self.atlas is None or not self.atlas.matches(self.rain_font, self.char_width,
+                                                        self.char_height, self.charset):
+            self.atlas = GlyphAtlas(self.rain_font, self.char_width, self.char_height, self.charset)
+        return self.atlas
+    
+    def ensureRaster(self):
+        """确保帧缓冲渲染器与当前图集和窗口尺寸一致"""
+        atlas = self.ensureAtlas()
+        if self.raster is None or self.raster.atlas is not atlas:
+            self.raster = RasterRenderer(atlas, self.trailDecay())
+        if (self.raster.width, self.raster.height) != (self.width(), self.height()):
+            self.raster.resize(self.width(), self.height())
+        return self.raster
+    
+    def setRainFont(self, font):
+        """设置代码雨字体"""
+        self.rain_font = QFont(font)
+        self.update()
+    
+    def setCharset(self, charset):
+        """设置代码雨字符集"""
+        self.charset = charset
+        self.engine.setCharset(charset)
         self.update()
     
+    def setTargetFps(self, fps):
+        """设置目标帧率"""
+        self.pacer.set_target_fps(fps)
+    
+    def trailDecay(self):
+        """当前画质下帧缓冲后端的残影保留比例"""
+        return TRAIL_DECAY if self.governor.trails else 0
+    
+    def applyQuality(self, level, reason):
+        """画质级别改变时调整雨滴密度和残影，并整体重绘"""
+        self.engine.density = self.governor.density
+        if self.raster is not None:
+            self.raster.trail_decay = self.trailDecay()
+        self.damage.mark_all()
+    
+    def perf_metrics(self):
+        """性能浮层和指标导出读取的数据"""
+        active = self.engine.heads >= 0
+        glyphs = np.minimum(self.engine.lengths[active], self.engine.heads[active] + 1).sum()
+        return {"name": "code_rain", **self.pacer.probe.metrics(),
+                "quality": self.quality_status(), "objects": {"glyphs": int(glyphs)}}
+    
+    def quality_status(self):
+        """当前画质级别和原因，与其他动画窗口同名，供监控使用"""
+        return self.governor.status()
+    
+    def updateRain(self, dt):
+        """按经过的时间更新雨滴位置"""
+        ticks = dt / RAIN_TICK
+        self.engine.step(ticks)
+        self.pending_ticks += ticks
+        
+        # 记录发生变化的列，跳过的帧中的变化也会累积下来
+        cols, tops, bottoms = self.engine.dirtySpans()
+        tops = np.maximum(np.floor(tops * self.char_height), 0).astype(np.int32)
+        bottoms = (bottoms * self.char_height).astype(np.int32) + self.char_height
+        self.damage.mark_column_spans(cols.tolist(), tops.tolist(), bottoms.tolist())
+    
+    def catchUp(self, seconds):
+        """窗口重新可见时快进隐藏期间的模拟，最多快进CATCH_UP_TIME秒，然后整体重绘"""
+        steps = int(min(seconds, CATCH_UP_TIME) / RAIN_TICK)
+        for _ in range(steps):
+            self.engine.step()
+        # 帧缓冲中的残影按经过的步数衰减
+        self.pending_ticks += steps
+        self.damage.mark_all()
+        self.damage.flush()
+    
+    def renderRain(self):
+        """只重绘发生变化的列"""
+        # 帧缓冲后端中残影还未消失的列整列重绘
+        if self.backend == BACKEND_RASTER and self.raster is not None:
+            lit = self.raster.lit_columns.tolist()
+            self.damage.mark_column_spans(lit, [0] * len(lit), [self.height()] * len(lit))
+        
+        self.damage.flush()
+    
     def paintEvent(self, event):
         """绘制事件，用于显示代码雨"""
+        self.pacer.paint_started()
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
-        
-        # 设置字体 - 增大字体
-        font = QFont("Consolas", 16)  # 字体大小从12增加到16
-        font.setStyleHint(QFont.Monospace)
-        painter.setFont(font)
-        
-        for i in range(self.columns):
-            if self.drops[i] >= 0:
-                # 绘制雨滴中的每个字符
-                for j in range(self.drop_length[i]):
-                    y_pos = int((self.drops[i] - j) * self.char_height)
-                    
-                    # 如果字符位置在屏幕内，则绘制
-                    if 0 <= y_pos < self.height() and j < len(self.drop_chars[i]):
-                        # 设置颜色，根据字符位置调整亮度
-                        if j < len(self.drop_brightness[i]):
-                            brightness = self.drop_brightness[i][j]
-                        else:
-                            brightness = 100
-                        
-                        color = QColor(0, brightness, 0)
-                        painter.setPen(color)
-                        
-                        # 绘制字符
-                        x_pos = i * self.char_width
-                        painter.drawText(QRect(x_pos, y_pos, self.char_width, self.char_height), 
-                                        Qt.AlignCenter, self.drop_chars[i][j])
+        painter.setRenderHint(QPainter.Antialiasing, self.governor.antialiasing)
+        
+        cols, positions, glyphs, brightness = self.engine.visibleCells(self.height() / self.char_height)
+        if not self.governor.trails:
+            # 关闭拖尾时只绘制雨滴头部
+            heads = brightness == 255
+            cols, positions, glyphs, brightness = cols[heads], positions[heads], glyphs[heads], brightness[heads]
+        xs = cols * self.char_width
+        ys = (positions * self.char_height).astype(np.int32)
+        
+        if self.backend == BACKEND_RASTER:
+            # 整帧在NumPy中合成，只需一次贴图，QPainter自动裁剪到重绘区域
+            frame = self.ensureRaster().render(xs, ys, glyphs, brightness, self.pending_ticks)
+            painter.drawImage(0, 0, frame)
+        else:
+            # 只绘制位于重绘区域内的列，所有字符通过字形图集一次批量绘制
+            damaged = np.zeros(self.columns, dtype=bool)
+            for first, last in region_columns(event.region(), self.char_width, self.columns):
+                damaged[first:last + 1] = True
+            keep = damaged[cols]
+            self.ensureAtlas().draw(painter, xs[keep], ys[keep], glyphs[keep], brightness[keep])
+        
+        painter.end()
+        self.pending_ticks = 0.0
+        self.pacer.paint_finished()
+    
+    def reset_state(self):
+        """重置为刚打开时的状态，窗口被复用时调用"""
+        self.engine = RainEngine(self.columns, self.rows, self.charset)
+        self.engine.density = self.governor.density
+        self.pending_ticks = 0.0
+        self.raster = None
+        self.damage.mark_all()
+        self.positionWindow()
+        self.pacer.start()
     
     def resizeEvent(self, event):
         """窗口大小改变时，重新计算雨滴"""
@@ -159,21 +393,7 @@ class CodeRainWindow(QWidget):
         self.rows = self.height() // self.char_height
         
         # 调整雨滴数组大小
-        old_columns = len(self.drops)
-        if self.columns > old_columns:
-            # 如果列增加了，添加新列
-            self.drops.extend([-1] * (self.columns - old_columns))
-            self.drop_length.extend([random.randint(5, 20) for _ in range(self.columns - old_columns)])
-            self.drop_speed.extend([random.uniform(0.3, 1.0) for _ in range(self.columns - old_columns)])
-            self.drop_chars.extend([[] for _ in range(self.columns - old_columns)])
-            self.drop_brightness.extend([[] for _ in range(self.columns - old_columns)])
-        else:
-            # 如果列减少了，截断数组
-            self.drops = self.drops[:self.columns]
-            self.drop_length = self.drop_length[:self.columns]
-            self.drop_speed = self.drop_speed[:self.columns]
-            self.drop_chars = self.drop_chars[:self.columns]
-            self.drop_brightness = self.drop_brightness[:self.columns]
+        self.engine.resize(self.columns, self.rows)
     
     def mousePressEvent(self, event):
         """鼠标按下事件，用于移动窗口"""
@@ -196,6 +416,6 @@ class CodeRainWindow(QWidget):
     
     def closeEvent(self, event):
         """窗口关闭事件"""
-        # 停止计时器
-        self.timer.stop()
+        # 停止动画
+        self.pacer.stop()
         super().closeEvent(event) 
\ No newline at end of file
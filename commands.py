@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# 前缀下有多个不同命令时的标记
+AMBIGUOUS = object()
+
+
+class Command:
+    """已注册的命令"""
+
+    def __init__(self, name, handler, aliases=(), args=(), help=""):
+        self.name = name
+        self.handler = handler
+        self.aliases = tuple(aliases)
+        self.args = tuple(args)  # 参数名，用[]括起来的为可选参数
+        self.help = help
+
+    @property
+    def names(self):
+        """命令名和所有别名"""
+        return (self.name,) + self.aliases
+
+    @property
+    def required_args(self):
+        """必须提供的参数个数"""
+        return sum(1 for arg in self.args if not arg.startswith("["))
+
+    def usage(self):
+        """用法说明"""
+        return " ".join((self.name,) + self.args)
+
+
+class TrieNode:
+    """前缀树节点"""
+
+    __slots__ = ("children", "command", "sole")
+
+    def __init__(self):
+        self.children = {}
+        self.command = None  # 恰好以此节点结尾的名字对应的命令
+        self.sole = None     # 以此节点为前缀的所有名字对应的唯一命令，有多个时为AMBIGUOUS
+
+
+class CommandRegistry:
+    """命令注册表，命令名和别名保存在前缀树中，查找和补全的耗时只与输入长度有关"""
+
+    def __init__(self):
+        self.root = TrieNode()
+        self.commands = []
+
+    def register(self, name, handler, aliases=(), args=(), help=""):
+        """注册命令，handler按顺序接收参数"""
+        command = Command(name.lower(), handler, [alias.lower() for alias in aliases], args, help)
+        for word in command.names:
+            if self.find(word) is not None:
+                raise ValueError(f"命令已存在: {word}")
+        for word in command.names:
+            self._insert(word, command)
+        self.commands.append(command)
+        return command
+
+    def _insert(self, word, command):
+        """把一个名字插入前缀树"""
+        node = self.root
+        for ch in word:
+            node.sole = command if node.sole in (None, command) else AMBIGUOUS
+            node = node.children.setdefault(ch, TrieNode())
+        node.sole = command if node.sole in (None, command) else AMBIGUOUS
+        node.command = command
+
+    def _node(self, prefix):
+        """返回前缀对应的节点，不存在时返回None"""
+        node = self.root
+        for ch in prefix:
+            node = node.children.get(ch)
+            if node is None:
+                return None
+        return node
+
+    def find(self, name):
+        """按完整名字查找命令"""
+        node = self._node(name)
+        return node.command if node is not None else None
+
+    def resolve(self, word):
+        """按完整名字或无歧义的前缀查找命令，返回(命令, 候选名字列表)"""
+        node = self._node(word.lower())
+        if node is None:
+            return None, []
+        if node.command is not None:
+            return node.command, []
+        if node.sole is not AMBIGUOUS:
+            return node.sole, []
+        return None, self.matches(word)
+
+    def matches(self, prefix):
+        """以prefix开头的所有名字"""
+        prefix = prefix.lower()
+        node = self._node(prefix)
+        if node is None:
+            return []
+        names = []
+        stack = [(prefix, node)]
+        while stack:
+            word, node = stack.pop()
+            if node.command is not None:
+                names.append(word)
+            for ch, child in node.children.items():
+                stack.append((word + ch, child))
+        return sorted(names)
+
+    def complete(self, prefix):
+        """补全前缀，返回(补全后的文本, 是否唯一确定)"""
+        prefix = prefix.lower()
+        node = self._node(prefix)
+        if node is None:
+            return prefix, False
+        if node.sole is not AMBIGUOUS:
+            command = node.sole
+            # 优先补全为以该前缀开头的正式命令名，否则补全为匹配的别名
+            for word in command.names:
+                if word.startswith(prefix):
+                    return word, True
+        # 有多个候选时补全到它们的公共前缀
+        while node.command is None and len(node.children) == 1:
+            ch, node = next(iter(node.children.items()))
+            prefix += ch
+        return prefix, False
+
+    def execute(self, line):
+        """解析并执行一行命令，返回(命令, 错误信息)，成功时错误信息为None"""
+        words = line.split()
+        if not words:
+            return None, None
+        command, candidates = self.resolve(words[0])
+        if command is None:
+            if candidates:
+                return None, f"命令不明确: {words[0]} 可能是 {', '.join(candidates)}"
+            return None, f"未知命令: {words[0]}"
+        args = words[1:]
+        if not command.required_args <= len(args) <= len(command.args):
+            return command, f"用法: {command.usage()}"
+        command.handler(*args)
+        return command, None
+
+    def help_text(self):
+        """根据注册信息生成帮助文本"""
+        entries = [("/".join(command.names) + "".join(" " + arg for arg in command.args), command.help)
+                   for command in self.commands]
+        width = max((len(usage) for usage, _ in entries), default=0)
+        lines = [f"  {usage:<{width}} - {text}" for usage, text in entries]
+        return "\n可用命令列表:\n" + "\n".join(lines) + "\n\n"
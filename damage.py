@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from PyQt5.QtCore import QRect
+from PyQt5.QtGui import QRegion
+
+
+class DamageTracker:
+    """脏区域跟踪器，累积控件中需要重绘的区域，一次性提交局部重绘"""
+
+    def __init__(self, widget, cell_width=1, cell_height=1):
+        self.widget = widget
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.region = QRegion()
+        self.full = False
+
+    def set_cell_size(self, cell_width, cell_height):
+        """设置字符单元格尺寸"""
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+
+    def mark_rect(self, rect):
+        """标记一个像素矩形需要重绘"""
+        if not self.full and not rect.isEmpty():
+            self.region = self.region.united(rect)
+
+    def mark_cell(self, column, row):
+        """标记一个字符单元格需要重绘"""
+        self.mark_rect(QRect(column * self.cell_width, row * self.cell_height,
+                             self.cell_width, self.cell_height))
+
+    def mark_column_spans(self, columns, tops, bottoms):
+        """标记若干列中[top, bottom)像素范围需要重绘，相邻的列合并为一个矩形"""
+        run_start = run_end = None
+        run_top = run_bottom = 0
+        for column, top, bottom in zip(columns, tops, bottoms):
+            if run_start is not None and column == run_end + 1:
+                # 与上一列相邻，扩展当前矩形
+                run_end = column
+                run_top = min(run_top, top)
+                run_bottom = max(run_bottom, bottom)
+                continue
+            self._mark_run(run_start, run_end, run_top, run_bottom)
+            run_start = run_end = column
+            run_top, run_bottom = top, bottom
+        self._mark_run(run_start, run_end, run_top, run_bottom)
+
+    def _mark_run(self, first, last, top, bottom):
+        """标记从first到last的连续列"""
+        if first is None:
+            return
+        self.mark_rect(QRect(first * self.cell_width, top,
+                             (last - first + 1) * self.cell_width, bottom - top))
+
+    def mark_all(self):
+        """标记整个控件需要重绘"""
+        self.full = True
+        self.region = QRegion()
+
+    def is_dirty(self):
+        """是否有待提交的脏区域"""
+        return self.full or not self.region.isEmpty()
+
+    def flush(self):
+        """提交累积的脏区域并清空"""
+        if self.full:
+            self.widget.update()
+        elif not self.region.isEmpty():
+            self.widget.update(self.region)
+        self.full = False
+        self.region = QRegion()
+
+
+def region_columns(region, cell_width, columns):
+    """返回与重绘区域相交的列范围列表[(first, last), ...]"""
+    ranges = []
+    for rect in region.rects():
+        first = max(0, rect.left() // cell_width)
+        last = min(columns - 1, rect.right() // cell_width)
+        if first <= last:
+            ranges.append((first, last))
+    return ranges
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from PyQt5.QtCore import Qt, QObject, QTimer, QElapsedTimer
+from PyQt5.QtWidgets import QApplication
+
+# 订阅者的回调在计划时间之前这么多帧以内就会执行，使相近的频率对齐到同一帧
+DUE_TOLERANCE = 0.5
+
+_clock = None
+
+
+def frame_clock():
+    """程序共用的帧时钟，第一次调用时创建"""
+    global _clock
+    if _clock is None:
+        _clock = FrameClock(QApplication.instance())
+    return _clock
+
+
+class Subscription:
+    """帧时钟的一个订阅，接口与QTimer相近：start/stop/isActive/setInterval"""
+
+    def __init__(self, clock, callback, interval):
+        self.clock = clock
+        self.callback = callback  # 不带参数，与QTimer.timeout的槽相同
+        self.interval = max(1, int(interval))  # 毫秒
+        self.due = 0  # 下次执行的时钟时间(毫秒)
+        self.active = False
+
+    def start(self, interval=None):
+        """开始(或重新开始)订阅，从现在起经过一个间隔后第一次执行"""
+        if interval is not None:
+            self.interval = max(1, int(interval))
+        self.due = self.clock.now() + self.interval
+        self.clock.activate(self)
+
+    def stop(self, *args):
+        """停止订阅，停止后不再占用时钟"""
+        self.clock.deactivate(self)
+
+    def isActive(self):
+        return self.active
+
+    def setInterval(self, interval):
+        """修改间隔，正在运行时从下一次执行开始生效"""
+        self.interval = max(1, int(interval))
+        if self.active:
+            self.due = min(self.due, self.clock.now() + self.interval)
+            self.clock.reschedule()
+
+
+class FrameClock(QObject):
+    """统一的帧时钟：所有动画共用一个计时器，每帧唤醒一次并执行所有到期的订阅
+
+    计时器间隔取正在运行的订阅中最短的间隔，没有运行中的订阅时计时器停止。
+    同一帧内执行的回调请求的重绘会在同一次事件循环中合并绘制。
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.subscriptions = []  # 正在运行的订阅
+        self.clock = QElapsedTimer()
+        self.clock.start()
+
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.tick)
+
+        # 统计
+        self.wakeups = 0
+        self.dispatched = 0
+
+    def now(self):
+        """时钟时间(毫秒)"""
+        return self.clock.elapsed()
+
+    def subscribe(self, owner, callback, interval):
+        """创建一个订阅(初始未运行)；owner销毁时订阅自动停止"""
+        subscription = Subscription(self, callback, interval)
+        if owner is not None:
+            owner.destroyed.connect(subscription.stop)
+        return subscription
+
+    def activate(self, subscription):
+        """把订阅加入运行列表"""
+        if not subscription.active:
+            subscription.active = True
+            self.subscriptions.append(subscription)
+        self.reschedule()
+
+    def deactivate(self, subscription):
+        """把订阅移出运行列表"""
+        if subscription.active:
+            subscription.active = False
+            self.subscriptions.remove(subscription)
+            self.reschedule()
+
+    def frame_interval(self):
+        """当前的帧间隔(毫秒)，没有运行中的订阅时为None"""
+        if not self.subscriptions:
+            return None
+        return min(subscription.interval for subscription in self.subscriptions)
+
+    def reschedule(self):
+        """按运行中的订阅调整计时器间隔，没有订阅时停止计时器"""
+        interval = self.frame_interval()
+        if interval is None:
+            self.timer.stop()
+        elif not self.timer.isActive():
+            self.timer.start(interval)
+        elif self.timer.interval() != interval:
+            self.timer.setInterval(interval)
+
+    def tick(self):
+        """执行所有到期的订阅"""
+        self.wakeups += 1
+        now = self.now()
+        deadline = now + self.timer.interval() * DUE_TOLERANCE
+        # 回调中可能启动或停止订阅，遍历副本
+        for subscription in list(self.subscriptions):
+            if not subscription.active or subscription.due > deadline:
+                continue
+            # 落后超过一个间隔时从现在重新计算，避免连续补帧
+            subscription.due += subscription.interval
+            if subscription.due <= now:
+                subscription.due = now + subscription.interval
+            self.dispatched += 1
+            subscription.callback()
+
+    def stats(self):
+        """唤醒和分发次数"""
+        return {
+            "subscriptions": len(self.subscriptions),
+            "interval": self.frame_interval(),
+            "wakeups": self.wakeups,
+            "dispatched": self.dispatched,
+        }
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows上没有fcntl，只依赖O_APPEND
+    fcntl = None
+
+from PyQt5.QtCore import QStandardPaths
+
+# 历史文件名
+HISTORY_FILE = "history"
+
+# 被覆盖的重复记录占比超过该比例时压缩内存中的列表
+COMPACT_RATIO = 0.5
+COMPACT_MIN_ENTRIES = 1024
+
+
+def default_history_path():
+    """用户数据目录下的历史文件路径"""
+    directory = QStandardPaths.writableLocation(QStandardPaths.AppDataLocation)
+    return os.path.join(directory, HISTORY_FILE)
+
+
+class CommandHistory:
+    """持久化的命令历史：追加写入文件，第一次使用时才加载，重复的命令只保留最近一次"""
+
+    def __init__(self, path=None):
+        self.path = path or default_history_path()
+        # 按时间顺序的命令列表，被更新的重复命令原位置置为None
+        self.entries = None
+        self.positions = {}  # 命令 -> 在entries中的位置
+        self.live = 0
+        self.unterminated = False  # 文件最后一行没有换行结尾(如写入时被中断)
+
+        # 增量搜索缓存：上一次的查询和匹配位置(由新到旧)
+        self.search_query = ""
+        self.search_matches = []
+
+    def ensure_loaded(self):
+        """第一次使用时从文件加载历史"""
+        if self.entries is not None:
+            return
+        self.entries = []
+        try:
+            with open(self.path, encoding="utf-8", errors="replace") as f:
+                for line in f:
+                    command = line.rstrip("\n")
+                    if command:
+                        self._add(command)
+                    self.unterminated = not line.endswith("\n")
+        except OSError:
+            pass
+
+    def __len__(self):
+        self.ensure_loaded()
+        return self.live
+
+    def commands(self):
+        """去重后的命令列表，由旧到新"""
+        self.ensure_loaded()
+        return [command for command in self.entries if command is not None]
+
+    def _add(self, command):
+        """在内存中记录一条命令，旧的重复记录置为None"""
+        previous = self.positions.get(command)
+        if previous is not None:
+            self.entries[previous] = None
+        else:
+            self.live += 1
+        self.positions[command] = len(self.entries)
+        self.entries.append(command)
+        self.search_query = ""
+        self.search_matches = []
+        if len(self.entries) > COMPACT_MIN_ENTRIES and self.live < len(self.entries) * COMPACT_RATIO:
+            self._compact()
+
+    def _compact(self):
+        """去掉被覆盖的记录"""
+        self.entries = [command for command in self.entries if command is not None]
+        self.positions = {command: index for index, command in enumerate(self.entries)}
+
+    def add(self, command):
+        """记录一条命令并追加到历史文件"""
+        command = command.replace("\n", " ").strip()
+        if not command:
+            return
+        self.ensure_loaded()
+        if self.entries and self.entries[-1] == command:
+            return
+        self._add(command)
+        self._append(command)
+
+    def _append(self, command):
+        """以单次写入追加一行，加锁使多个同时运行的终端不会互相穿插"""
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        except OSError:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            # 先补上缺少的换行，避免和残缺的最后一行连在一起
+            prefix = "\n" if self.unterminated else ""
+            os.write(fd, (prefix + command + "\n").encode("utf-8"))
+            self.unterminated = False
+        except OSError:
+            pass
+        finally:
+            os.close(fd)  # 关闭文件时锁随之释放
+
+    def older(self, index):
+        """返回index之前最近的一条记录(位置, 命令)，index为None表示从最新开始"""
+        self.ensure_loaded()
+        index = len(self.entries) if index is None else index
+        for position in range(index - 1, -1, -1):
+            if self.entries[position] is not None:
+                return position, self.entries[position]
+        return None
+
+    def newer(self, index):
+        """返回index之后最近的一条记录(位置, 命令)，已经是最新时返回None"""
+        self.ensure_loaded()
+        if index is None:
+            return None
+        for position in range(index + 1, len(self.entries)):
+            if self.entries[position] is not None:
+                return position, self.entries[position]
+        return None
+
+    def search(self, query):
+        """返回包含query的命令，由新到旧；query在上一次查询后追加字符时只在上一次的结果中筛选"""
+        self.ensure_loaded()
+        if not query:
+            self.search_query = ""
+            self.search_matches = []
+            return []
+        if self.search_query and query.startswith(self.search_query):
+            candidates = self.search_matches
+        else:
+            candidates = range(len(self.entries) - 1, -1, -1)
+        entries = self.entries
+        self.search_matches = [index for index in candidates
+                               if entries[index] is not None and query in entries[index]]
+        self.search_query = query
+        return [entries[index] for index in self.search_matches]
@@ -1,19 +1,107 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import time
+
+# 启动计时起点，需在导入Qt之前记录
+START_TIME = time.perf_counter()
+
+import os
 import sys
+import argparse
 from PyQt5.QtWidgets import QApplication
-from main_window import HackerConsole
+from PyQt5.QtCore import QTimer
+
+# 脚本文件无法读取时的退出状态
+SCRIPT_ERROR_STATUS = 2
+
+
+def run_script(app, window, path):
+    """脚本模式：执行文件或标准输入中的命令后关闭窗口并退出"""
+    from batch import ScriptRunner
+    runner = ScriptRunner(window, sys.stdout)
+    if path == "-":
+        status = runner.run(sys.stdin)
+    else:
+        try:
+            with open(path, encoding="utf-8") as f:
+                status = runner.run(f)
+        except (OSError, UnicodeDecodeError) as error:
+            # 在槽函数中抛出的异常会使Qt直接中止进程，这里输出错误汇总后正常退出
+            print(f"cannot read script {path}: {error}", file=sys.stderr)
+            runner.write({"summary": True, "commands": 0, "failed": 0,
+                          "error": f"cannot read script: {error}"})
+            status = SCRIPT_ERROR_STATUS
+    window.close()
+    app.exit(status)
+
+
+class StartupReport:
+    """记录启动各阶段耗时，启动序列结束后输出并退出"""
+
+    def __init__(self, app, window, import_time, budget=None):
+        self.app = app
+        self.budget = budget  # 首帧耗时预算(毫秒)
+        self.times = [("import", import_time)]
+        window.first_painted.connect(lambda: self.mark("first paint"))
+        window.boot_completed.connect(self.finish)
+
+    def mark(self, stage):
+        """记录一个阶段的完成时间"""
+        self.times.append((stage, (time.perf_counter() - START_TIME) * 1000))
+
+    def finish(self):
+        """输出报告，首帧超出预算时以非零状态退出"""
+        self.mark("boot complete")
+        for stage, elapsed in self.times:
+            print(f"{stage + ':':<16}{elapsed:8.1f} ms")
+        from main_window import FEATURE_MODULES
+        loaded = [name for name in FEATURE_MODULES if name in sys.modules]
+        print(f"{'modules:':<16}{', '.join(loaded) or '-'}")
+
+        first_paint = dict(self.times).get("first paint")
+        over_budget = self.budget is not None and (first_paint is None or first_paint > self.budget)
+        if over_budget:
+            print(f"first paint exceeded budget of {self.budget:.0f} ms", file=sys.stderr)
+        self.app.exit(1 if over_budget else 0)
+
+
+def main(argv=None):
+    """程序入口"""
+    parser = argparse.ArgumentParser(description="黑客终端模拟器")
+    parser.add_argument("--prewarm", action="store_true", help="启动序列结束后在后台预先加载功能模块")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="输出导入、首帧和启动序列完成的耗时后退出")
+    parser.add_argument("--startup-budget", type=float, default=None, metavar="MS",
+                        help="首帧耗时预算(毫秒)，超出时以状态1退出")
+    parser.add_argument("--script", metavar="FILE",
+                        help="无界面执行文件中的命令，'-'表示标准输入；每条命令输出一行JSON")
+    args, qt_args = parser.parse_known_args(sys.argv[1:] if argv is None else argv)
+
+    # 脚本模式默认不需要显示器
+    if args.script:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    app = QApplication(sys.argv[:1] + qt_args)
 
-if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    
     # 设置应用程序名称和组织
     app.setApplicationName("Hacker Simulator")
     app.setOrganizationName("BlackHat")
-    
+
+    from main_window import HackerConsole
+    import_time = (time.perf_counter() - START_TIME) * 1000
+
     # 创建并显示主窗口
-    main_window = HackerConsole()
+    main_window = HackerConsole(prewarm=args.prewarm, boot=not args.script)
+    if args.startup_report:
+        report = StartupReport(app, main_window, import_time, args.startup_budget)
     main_window.show()
-    
-    sys.exit(app.exec_()) 
\ No newline at end of file
+
+    if args.script:
+        QTimer.singleShot(0, lambda: run_script(app, main_window, args.script))
+
+    return app.exec_()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,23 +3,58 @@
 
 import sys
 import random
+import importlib
+from collections import deque
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-                             QLabel, QPushButton, QTextEdit, QLineEdit, 
+                             QLabel, QPushButton, QAbstractScrollArea, QLineEdit, 
                              QFrame, QSizePolicy, QApplication, QDesktopWidget)
-from PyQt5.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve, QRect, pyqtSignal, pyqtSlot, QPoint
-from PyQt5.QtGui import QFont, QColor, QPalette, QIcon, QPixmap, QPainter, QBrush, QPen, QFontDatabase
+from PyQt5.QtCore import Qt, QEvent, QThread, QTimer, QElapsedTimer, QPropertyAnimation, QEasingCurve, QRect, pyqtSignal, pyqtSlot, QPoint
+from PyQt5.QtGui import (QFont, QColor, QPalette, QIcon, QPixmap, QPainter, QBrush, QPen, QFontDatabase,
+                         QKeySequence, QClipboard)
 
-from code_rain import CodeRainWindow
-from network_scanner import NetworkScannerWindow
-from system_breach import SystemBreachWindow
-from threat_map import ThreatMapWindow
+from scrollback import LineBuffer, wrap_line
+from damage import DamageTracker
+from commands import CommandRegistry
+from history import CommandHistory
+from window_manager import WindowManager
+from frame_clock import frame_clock
+from theme import ensure_theme, TEXT_COLOR, DEFAULT_FONT, DEFAULT_FONT_SIZE
+from visibility import VisibilityWatcher
+from perf_hud import PerfHud, PerfProbe
+
+# 打字效果
+TYPING_SPEED = 30           # 每个字符间隔时间(ms)
+TYPING_TICK = 15            # 输出队列的处理间隔(ms)，每次插入这段时间内应显示的所有字符
+FAST_FORWARD_CHARS = 1000   # 队列中积压的字符超过该数量时立即全部输出
+CURSOR_BLINK = 500          # 光标闪烁间隔(ms)
+SELECTION_COLOR = "#005500"  # 终端中选中文本的底色
+
+# 按需加载的功能模块：模块名 -> 窗口类名，模块在第一次使用对应命令时才导入
+FEATURE_MODULES = {
+    "code_rain": "CodeRainWindow",
+    "network_scanner": "NetworkScannerWindow",
+    "system_breach": "SystemBreachWindow",
+    "threat_map": "ThreatMapWindow",
+}
+
+# 终端最多保留的行数和文字边距
+TERMINAL_SCROLLBACK = 5000
+TERMINAL_PADDING = 4
+
+def load_window_class(module_name):
+    """导入功能模块并返回其窗口类，已导入的模块直接从缓存中取得"""
+    return getattr(importlib.import_module(module_name), FEATURE_MODULES[module_name])
+
+
+class PrewarmThread(QThread):
+    """后台预先导入功能模块，使第一次打开窗口时不必等待导入"""
+    
+    def run(self):
+        for module_name in FEATURE_MODULES:
+            if self.isInterruptionRequested():
+                break
+            importlib.import_module(module_name)
 
-# 自定义标题栏样式常量
-TITLE_COLOR = "#00FF00"
-BG_COLOR = "#000000"
-HIGHLIGHT_COLOR = "#00FFAA"
-DEFAULT_FONT = "Consolas"
-DEFAULT_FONT_SIZE = 14  # 增大默认字体大小
 
 class CustomTitleBar(QWidget):
     """自定义窗口标题栏"""
@@ -38,7 +73,7 @@ class CustomTitleBar(QWidget):
         
         # 窗口标题
         self.title_label = QLabel("HACKER TERMINAL v1.0")
-        self.title_label.setStyleSheet(f"color: {TITLE_COLOR}; font-weight: bold; font-family: {DEFAULT_FONT}; font-size: 16px;")
+        self.title_label.setObjectName("titleLabel")
         self.title_label.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
         
         # 窗口按钮
@@ -54,9 +89,6 @@ class CustomTitleBar(QWidget):
         self.close_button.setFixedSize(35, 35)
         self.close_button.clicked.connect(self.parent.close)
         
-        # 设置按钮样式
-        self.set_button_style()
-        
         # 添加控件到布局
         layout.addSpacing(10)
         layout.addWidget(self.title_label)
@@ -67,30 +99,6 @@ class CustomTitleBar(QWidget):
         
         self.setLayout(layout)
     
-    def set_button_style(self):
-        """设置按钮样式"""
-        style = f"""
-            QPushButton {{
-                background-color: transparent;
-                color: {TITLE_COLOR};
-                border: none;
-                font-family: {DEFAULT_FONT};
-                font-weight: bold;
-                font-size: 18px;
-            }}
-            QPushButton:hover {{
-                background-color: rgba(0, 255, 170, 30%);
-                color: white;
-            }}
-            QPushButton:pressed {{
-                background-color: rgba(0, 255, 170, 50%);
-            }}
-        """
-        
-        self.minimize_button.setStyleSheet(style)
-        self.maximize_button.setStyleSheet(style)
-        self.close_button.setStyleSheet(style)
-    
     def toggle_maximize(self):
         """切换窗口最大化状态"""
         if self.parent.isMaximized():
@@ -123,88 +131,389 @@ class CustomTitleBar(QWidget):
         return super().mouseReleaseEvent(event)
 
 
-class Terminal(QTextEdit):
-    """自定义终端文本显示控件"""
+class Terminal(QAbstractScrollArea):
+    """自定义终端文本显示控件，文本保存在固定容量的行缓冲区中，只绘制可见的行"""
     
-    def __init__(self, parent=None):
+    # 输出队列中的文本全部显示完毕
+    output_drained = pyqtSignal()
+    # 文本实际插入终端时发出，供脚本模式收集每条命令的输出
+    text_inserted = pyqtSignal(str)
+    
+    def __init__(self, parent=None, scrollback=TERMINAL_SCROLLBACK):
         super().__init__(parent)
+        
+        # 逻辑行和按控件宽度折行后的显示行，超出回滚行数时丢弃最早的行
+        # 显示行为(文本, 是否为上一行的折行延续)，复制时折行处不插入换行
+        self.lines = LineBuffer(scrollback)
+        self.lines.append("")
+        self.rows = LineBuffer(scrollback)
+        self.rows.append(("", False))
+        self.last_line_rows = 1  # 最后一个逻辑行占用的显示行数
+        
+        # 鼠标选中的范围，两端为(显示行, 字符位置)，None表示没有选中
+        self.selection = None
+        self.wrap_width = 0
+        self.char_widths = {}
+        
         self.setup_ui()
         
-        # 打字效果计时器
-        self.typing_timer = QTimer(self)
-        self.typing_timer.timeout.connect(self.type_next_char)
-        self.typing_text = ""
-        self.typing_index = 0
-        self.typing_speed = 30  # 每个字符间隔时间(ms)
+        # 输出队列，元素为待显示的文本或停顿的毫秒数，按加入顺序输出
+        self.output_queue = deque()
+        self.queued_chars = 0
+        self.typing_speed = TYPING_SPEED
+        self.typing_enabled = True  # 关闭时type_text立即显示
+        self.typing_credit = 0.0  # 已经到期、可以显示的字符数
+        self.typing_clock = QElapsedTimer()
+        self.typing_timer = frame_clock().subscribe(self, self.type_next_chunk, TYPING_TICK)
         
-        # 光标闪烁效果
+        # 光标闪烁效果，光标在绘制时叠加在最后一行末尾，闪烁只重绘光标所在的矩形
         self.cursor_visible = True
-        self.cursor_timer = QTimer(self)
-        self.cursor_timer.timeout.connect(self.toggle_cursor)
-        self.cursor_timer.start(500)  # 500ms闪烁一次
+        self.cursor_damage = DamageTracker(self.viewport())
+        
+        # 绘制耗时，供性能浮层读取
+        self.probe = PerfProbe(self)
+        self.paint_clock = QElapsedTimer()
+        self.cursor_timer = frame_clock().subscribe(self, self.toggle_cursor, CURSOR_BLINK)
     
     def setup_ui(self):
         """设置界面"""
-        self.setReadOnly(True)
-        self.setStyleSheet(f"""
-            QTextEdit {{
-                background-color: {BG_COLOR};
-                color: {TITLE_COLOR};
-                border: 1px solid {TITLE_COLOR};
-                font-family: {DEFAULT_FONT};
-                font-size: {DEFAULT_FONT_SIZE}px;
-                selection-background-color: {HIGHLIGHT_COLOR};
-                selection-color: {BG_COLOR};
-            }}
-        """)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setFocusPolicy(Qt.NoFocus)  # 焦点始终留在命令输入框，复制键由输入框转发
+        self.viewport().setCursor(Qt.IBeamCursor)
         
         # 设置等宽字体
         font = QFont(DEFAULT_FONT, DEFAULT_FONT_SIZE)
         font.setStyleHint(QFont.Monospace)
         self.setFont(font)
     
+    def set_scrollback(self, scrollback):
+        """设置最多保留的行数"""
+        lines = list(self.lines)[-scrollback:]
+        self.lines = LineBuffer(scrollback)
+        for line in lines:
+            self.lines.append(line)
+        self.rows = LineBuffer(scrollback)
+        self.rewrap()
+    
+    def char_width(self, ch):
+        """单个字符的像素宽度，结果按字符缓存"""
+        width = self.char_widths.get(ch)
+        if width is None:
+            width = self.fontMetrics().horizontalAdvance(ch)
+            self.char_widths[ch] = width
+        return width
+    
+    def wrap(self, line):
+        """按当前宽度折行"""
+        return wrap_line(line, self.wrap_width, self.char_width)
+    
+    def append_rows(self, line):
+        """把一个逻辑行折行后追加到显示行，返回(占用的显示行数, 因超出容量而丢弃的行数)"""
+        wrapped = self.wrap(line)
+        dropped = 0
+        for index, row in enumerate(wrapped):
+            dropped += self.rows.append((row, index > 0))
+        return len(wrapped), dropped
+    
+    def rewrap(self):
+        """控件宽度或字体改变后重新折行所有逻辑行"""
+        self.wrap_width = max(1, self.viewport().width() - 2 * TERMINAL_PADDING)
+        self.rows.clear()
+        self.selection = None
+        for line in self.lines:
+            self.last_line_rows, _ = self.append_rows(line)
+        self.update_scrollbar(True)
+    
+    def update_scrollbar(self, follow, dropped=0):
+        """更新滚动范围，follow为True时滚动到底部，否则保持当前看到的内容不动"""
+        bar = self.verticalScrollBar()
+        value = bar.value() - dropped
+        page = max(1, self.viewport().height() // self.fontMetrics().lineSpacing())
+        bar.setRange(0, max(0, len(self.rows) - page))
+        bar.setPageStep(page)
+        bar.setValue(bar.maximum() if follow else value)
+        self.viewport().update()
+    
+    def at_bottom(self):
+        """是否显示在最底部"""
+        bar = self.verticalScrollBar()
+        return bar.value() >= bar.maximum()
+    
     def append_text(self, text):
-        """添加文本，不带打字效果"""
-        cursor = self.textCursor()
-        cursor.movePosition(cursor.End)
-        cursor.insertText(text)
-        self.setTextCursor(cursor)
-        self.ensureCursorVisible()
-    
-    def type_text(self, text):
-        """使用打字效果显示文本"""
-        self.typing_text = text
-        self.typing_index = 0
-        self.typing_timer.start(self.typing_speed)
-    
-    def type_next_char(self):
-        """打字效果，逐个字符显示"""
-        if self.typing_index < len(self.typing_text):
-            char = self.typing_text[self.typing_index]
-            self.append_text(char)
-            self.typing_index += 1
-            
-            # 随机延迟，使打字效果更自然
-            delay = self.typing_speed
-            if random.random() < 0.1:  # 10%的几率有额外延迟
-                delay += random.randint(50, 200)
-            self.typing_timer.setInterval(delay)
+        """添加文本，不带打字效果；队列中还有未显示的输出时排在其后"""
+        if self.output_queue:
+            self.output_queue.append((text, True))
+            self.queued_chars += len(text)
         else:
+            self.insert_text(text)
+    
+    def insert_text(self, text):
+        """在末尾一次性插入文本，只重新折行最后一个逻辑行"""
+        self.text_inserted.emit(text)
+        follow = self.at_bottom()
+        parts = text.split("\n")
+        
+        # 撤下最后一个逻辑行原有的显示行
+        for _ in range(min(self.last_line_rows, len(self.rows))):
+            self.rows.pop()
+        
+        self.lines[-1] += parts[0]
+        for part in parts[1:]:
+            self.lines.append(part)
+        
+        # 新增内容从最后一个原有逻辑行开始折行
+        dropped = 0
+        for line_index in range(max(-len(parts), -len(self.lines)), 0):
+            self.last_line_rows, line_dropped = self.append_rows(self.lines[line_index])
+            dropped += line_dropped
+        self.shift_selection(dropped)
+        self.update_scrollbar(follow, dropped)
+    
+    def toPlainText(self):
+        """返回缓冲区中的全部文本"""
+        return "\n".join(self.lines)
+    
+    def type_text(self, text, pause=0):
+        """使用打字效果显示文本，pause为开始显示前的停顿(ms)"""
+        if not self.typing_enabled:
+            self.append_text(text)
+            return
+        if pause > 0:
+            self.output_queue.append(pause)
+        self.output_queue.append((text, False))
+        self.queued_chars += len(text)
+        if not self.typing_timer.isActive():
+            self.typing_credit = 0.0
+            self.typing_clock.start()
+            self.typing_timer.start()
+    
+    def type_next_chunk(self):
+        """打字效果，把上次处理以来应显示的字符合并为一次插入"""
+        if self.queued_chars > FAST_FORWARD_CHARS:
+            self.fast_forward()
+            return
+        
+        self.typing_credit += self.typing_clock.restart() / self.typing_speed
+        chunk = []
+        while self.output_queue and self.typing_credit >= 1:
+            item = self.output_queue[0]
+            if not isinstance(item, tuple):
+                # 停顿：消耗对应的字符额度
+                needed = item / self.typing_speed
+                if self.typing_credit < needed:
+                    break
+                self.typing_credit -= needed
+                self.output_queue.popleft()
+                continue
+            
+            text, instant = item
+            count = len(text) if instant else min(len(text), int(self.typing_credit))
+            if not instant:
+                self.typing_credit -= count
+                # 10%的几率有额外延迟，使打字效果更自然
+                for _ in range(count):
+                    if random.random() < 0.1:
+                        self.typing_credit -= random.randint(50, 200) / self.typing_speed
+            chunk.append(text[:count])
+            self.queued_chars -= count
+            if count < len(text):
+                self.output_queue[0] = (text[count:], instant)
+            else:
+                self.output_queue.popleft()
+        
+        if chunk:
+            self.insert_text("".join(chunk))
+        if not self.output_queue:
             self.typing_timer.stop()
+            self.output_drained.emit()
+    
+    def set_typing_enabled(self, enabled):
+        """开启或关闭打字效果，关闭时立即显示队列中的文本"""
+        self.typing_enabled = enabled
+        if not enabled:
+            self.fast_forward()
+    
+    def fast_forward(self):
+        """立即显示队列中所有未输出的文本"""
+        chunk = [item[0] for item in self.output_queue if isinstance(item, tuple)]
+        self.output_queue.clear()
+        self.queued_chars = 0
+        self.typing_timer.stop()
+        if chunk:
+            self.insert_text("".join(chunk))
+        self.output_drained.emit()
+    
+    def clear(self):
+        """清空终端和未输出的队列"""
+        self.output_queue.clear()
+        self.queued_chars = 0
+        self.typing_timer.stop()
+        self.lines.clear()
+        self.lines.append("")
+        self.rows.clear()
+        self.rows.append(("", False))
+        self.last_line_rows = 1
+        self.selection = None
+        self.update_scrollbar(True)
+    
+    def cursor_rect(self):
+        """光标在视口中的矩形，位于最后一行文本之后"""
+        metrics = self.fontMetrics()
+        line_height = metrics.lineSpacing()
+        row = len(self.rows) - 1 - self.verticalScrollBar().value()
+        x = TERMINAL_PADDING + metrics.horizontalAdvance(self.rows[-1][0])
+        return QRect(x, TERMINAL_PADDING + row * line_height, self.char_width("█"), line_height)
+    
+    def set_cursor_blinking(self, blinking):
+        """开始或停止光标闪烁，停止时光标保持显示"""
+        if blinking:
+            self.cursor_timer.start()
+        else:
+            self.cursor_timer.stop()
+            if not self.cursor_visible:
+                self.toggle_cursor()
     
     def toggle_cursor(self):
-        """切换光标可见性，实现闪烁效果"""
+        """切换光标可见性，实现闪烁效果，不修改文本"""
         self.cursor_visible = not self.cursor_visible
+        self.cursor_damage.mark_rect(self.cursor_rect().intersected(self.viewport().rect()))
+        self.cursor_damage.flush()
+    
+    def paintEvent(self, event):
+        """只绘制可见范围内的行"""
+        self.paint_clock.start()
+        painter = QPainter(self.viewport())
+        painter.setFont(self.font())
+        painter.setPen(QColor(TEXT_COLOR))
+        
+        metrics = self.fontMetrics()
+        line_height = metrics.lineSpacing()
+        first = self.verticalScrollBar().value()
+        
+        # 只遍历与重绘区域相交的行
+        clip = event.rect()
+        begin = first + max(0, (clip.top() - TERMINAL_PADDING) // line_height)
+        end = min(len(self.rows), first + (clip.bottom() - TERMINAL_PADDING) // line_height + 1)
+        selection = self.selection_range()
+        for index in range(begin, end):
+            top = TERMINAL_PADDING + (index - first) * line_height
+            text = self.rows[index][0]
+            # 选中部分先画底色再画文字
+            if selection is not None and selection[0][0] <= index <= selection[1][0]:
+                start = selection[0][1] if index == selection[0][0] else 0
+                stop = selection[1][1] if index == selection[1][0] else len(text)
+                if stop > start:
+                    left = TERMINAL_PADDING + metrics.horizontalAdvance(text[:start])
+                    width = metrics.horizontalAdvance(text[start:stop])
+                    painter.fillRect(left, top, width, line_height, QColor(SELECTION_COLOR))
+            painter.drawText(TERMINAL_PADDING, top + metrics.ascent(), text)
+        
+        # 叠加绘制光标
         if self.cursor_visible:
-            self.append_text("█")
-            cursor = self.textCursor()
-            cursor.deletePreviousChar()
-            self.setTextCursor(cursor)
+            cursor = self.cursor_rect()
+            if cursor.intersects(clip):
+                painter.fillRect(cursor, QColor(TEXT_COLOR))
+        painter.end()
+        self.probe.record_paint(self.paint_clock.nsecsElapsed() / 1e9)
+    
+    def position_at(self, point):
+        """视口坐标对应的(显示行, 字符位置)，字符位置取离该点最近的字符边界"""
+        line_height = self.fontMetrics().lineSpacing()
+        row = self.verticalScrollBar().value() + (point.y() - TERMINAL_PADDING) // line_height
+        row = max(0, min(len(self.rows) - 1, row))
+        text = self.rows[row][0]
+        x = point.x() - TERMINAL_PADDING
+        column = 0
+        for ch in text:
+            advance = self.char_width(ch)
+            if x < advance / 2:
+                break
+            x -= advance
+            column += 1
+        return row, column
+    
+    def selection_range(self):
+        """按先后顺序排列的选中范围，没有选中或范围为空时返回None"""
+        if self.selection is None:
+            return None
+        start, end = sorted(self.selection)
+        return None if start == end else (start, end)
+    
+    def shift_selection(self, dropped):
+        """最早的显示行被丢弃后调整选中范围，选中的行被丢弃时取消选中"""
+        if self.selection is None or not dropped:
+            return
+        anchor, end = self.selection
+        if min(anchor[0], end[0]) < dropped:
+            self.selection = None
         else:
-            self.append_text(" ")
-            cursor = self.textCursor()
-            cursor.deletePreviousChar()
-            self.setTextCursor(cursor)
+            self.selection = ((anchor[0] - dropped, anchor[1]), (end[0] - dropped, end[1]))
+    
+    def selected_text(self):
+        """选中的文本，折行处不插入换行"""
+        selection = self.selection_range()
+        if selection is None:
+            return ""
+        (first_row, first_column), (last_row, last_column) = selection
+        parts = []
+        for index in range(first_row, last_row + 1):
+            text, continued = self.rows[index]
+            if index > first_row and not continued:
+                parts.append("\n")
+            start = first_column if index == first_row else 0
+            stop = last_column if index == last_row else len(text)
+            parts.append(text[start:stop])
+        return "".join(parts)
+    
+    def copy(self):
+        """把选中的文本复制到剪贴板，返回是否有内容被复制"""
+        text = self.selected_text()
+        if text:
+            QApplication.clipboard().setText(text)
+        return bool(text)
+    
+    def mousePressEvent(self, event):
+        """左键按下开始选中"""
+        if event.button() == Qt.LeftButton:
+            position = self.position_at(event.pos())
+            self.selection = (position, position)
+            self.viewport().update()
+        super().mousePressEvent(event)
+    
+    def mouseMoveEvent(self, event):
+        """拖动时扩展选中范围"""
+        if event.buttons() & Qt.LeftButton and self.selection is not None:
+            self.selection = (self.selection[0], self.position_at(event.pos()))
+            self.viewport().update()
+        super().mouseMoveEvent(event)
+    
+    def mouseReleaseEvent(self, event):
+        """选中结束时同时放入系统的选择缓冲区(X11)"""
+        clipboard = QApplication.clipboard()
+        if event.button() == Qt.LeftButton and clipboard.supportsSelection():
+            text = self.selected_text()
+            if text:
+                clipboard.setText(text, QClipboard.Selection)
+        super().mouseReleaseEvent(event)
+    
+    def scrollContentsBy(self, dx, dy):
+        """滚动时重绘可见区域"""
+        self.viewport().update()
+    
+    def resizeEvent(self, event):
+        """宽度改变时重新折行"""
+        super().resizeEvent(event)
+        if self.viewport().width() - 2 * TERMINAL_PADDING != self.wrap_width:
+            self.rewrap()
+        else:
+            self.update_scrollbar(self.at_bottom())
+    
+    def changeEvent(self, event):
+        """字体改变时清除字符宽度缓存并重新折行"""
+        super().changeEvent(event)
+        if event.type() == QEvent.FontChange:
+            self.char_widths = {}
+            self.rewrap()
 
 
 class CommandInput(QLineEdit):
@@ -212,30 +521,27 @@ class CommandInput(QLineEdit):
     
     # 自定义信号
     command_entered = pyqtSignal(str)
+    completions_available = pyqtSignal(list)  # Tab补全有多个候选时发出
+    search_updated = pyqtSignal(str, str)     # 反向搜索的(查询, 匹配的命令)
+    search_finished = pyqtSignal()
+    copy_requested = pyqtSignal()             # 输入框没有选中文本时按下复制键
     
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, commands=None, history=None):
         super().__init__(parent)
         self.setup_ui()
-        self.history = []
-        self.history_index = 0
+        self.history = history if history is not None else CommandHistory()
+        self.history_index = None  # 正在浏览的历史位置，None表示不在浏览
+        self.commands = commands  # 用于Tab补全的命令注册表
+        
+        # Ctrl+R反向搜索状态
+        self.searching = False
+        self.search_results = []
+        self.search_position = 0
+        self.saved_text = ""
+        self.textChanged.connect(self.on_text_changed)
     
     def setup_ui(self):
         """设置界面"""
-        self.setStyleSheet(f"""
-            QLineEdit {{
-                background-color: {BG_COLOR};
-                color: {TITLE_COLOR};
-                border: 1px solid {TITLE_COLOR};
-                border-radius: 0px;
-                padding: 5px 8px;
-                font-family: {DEFAULT_FONT};
-                font-size: {DEFAULT_FONT_SIZE}px;
-                selection-background-color: {HIGHLIGHT_COLOR};
-                selection-color: {BG_COLOR};
-                min-height: 30px;
-            }}
-        """)
-        
         self.setPlaceholderText("输入命令...")
         
         # 设置等宽字体
@@ -243,36 +549,119 @@ class CommandInput(QLineEdit):
         font.setStyleHint(QFont.Monospace)
         self.setFont(font)
     
+    def event(self, event):
+        """拦截Tab键用于命令补全，避免焦点切换"""
+        if event.type() == QEvent.KeyPress and event.key() == Qt.Key_Tab:
+            if self.searching:
+                self.finish_search(True)
+            else:
+                self.complete_command()
+            return True
+        return super().event(event)
+    
+    def complete_command(self):
+        """补全命令名，有多个候选且无法继续补全时列出候选"""
+        text = self.text()
+        if self.commands is None or " " in text.strip():
+            return
+        completion, unique = self.commands.complete(text.strip())
+        if unique:
+            self.setText(completion + " ")
+        elif completion != text:
+            self.setText(completion)
+        else:
+            candidates = self.commands.matches(completion)
+            if candidates:
+                self.completions_available.emit(candidates)
+    
+    def start_search(self):
+        """开始反向搜索，或在搜索中跳到更早的匹配"""
+        if not self.searching:
+            self.searching = True
+            self.saved_text = self.text()
+            self.search_results = []
+            self.search_position = 0
+            self.setText("")
+        elif self.search_position + 1 < len(self.search_results):
+            self.search_position += 1
+        self.emit_search()
+    
+    def on_text_changed(self, text):
+        """搜索中输入框的内容作为查询，按键时增量更新匹配"""
+        if self.searching:
+            self.search_results = self.history.search(text)
+            self.search_position = 0
+            self.emit_search()
+    
+    def current_match(self):
+        """当前选中的匹配命令"""
+        if self.search_position < len(self.search_results):
+            return self.search_results[self.search_position]
+        return ""
+    
+    def emit_search(self):
+        """通知界面当前的查询和匹配"""
+        self.search_updated.emit(self.text(), self.current_match())
+    
+    def finish_search(self, accept):
+        """结束搜索，accept为True时把匹配的命令放入输入框，否则恢复搜索前的内容"""
+        text = (self.current_match() or self.text()) if accept else self.saved_text
+        self.searching = False
+        self.search_results = []
+        self.setText(text)
+        self.search_finished.emit()
+    
     def keyPressEvent(self, event):
         """处理按键事件"""
         key = event.key()
         
+        # 输入框自己没有选中文本时，复制键复制终端中选中的文本
+        if event.matches(QKeySequence.Copy) and not self.hasSelectedText():
+            self.copy_requested.emit()
+            return
+        
+        if key == Qt.Key_R and event.modifiers() & Qt.ControlModifier:
+            self.start_search()
+            return
+        
+        if self.searching:
+            if key == Qt.Key_Escape:
+                self.finish_search(False)
+                return
+            if key in (Qt.Key_Return, Qt.Key_Enter, Qt.Key_Up, Qt.Key_Down, Qt.Key_Left, Qt.Key_Right):
+                self.finish_search(True)
+                if key not in (Qt.Key_Return, Qt.Key_Enter):
+                    return
+        
         if key == Qt.Key_Return or key == Qt.Key_Enter:
             command = self.text().strip()
             if command:
                 self.command_entered.emit(command)
                 
                 # 添加到历史记录
-                if not self.history or self.history[-1] != command:
-                    self.history.append(command)
-                self.history_index = len(self.history)
+                self.history.add(command)
+                self.history_index = None
                 
                 # 清空输入框
                 self.clear()
         
         elif key == Qt.Key_Up:
             # 浏览历史命令（向上）
-            if self.history and self.history_index > 0:
-                self.history_index -= 1
-                self.setText(self.history[self.history_index])
+            entry = self.history.older(self.history_index)
+            if entry is not None:
+                self.history_index, command = entry
+                self.setText(command)
         
         elif key == Qt.Key_Down:
             # 浏览历史命令（向下）
-            if self.history and self.history_index < len(self.history) - 1:
-                self.history_index += 1
-                self.setText(self.history[self.history_index])
-            elif self.history_index == len(self.history) - 1:
-                self.history_index = len(self.history)
+            if self.history_index is None:
+                return
+            entry = self.history.newer(self.history_index)
+            if entry is not None:
+                self.history_index, command = entry
+                self.setText(command)
+            else:
+                self.history_index = None
                 self.clear()
         
         else:
@@ -282,18 +671,35 @@ class CommandInput(QLineEdit):
 class HackerConsole(QMainWindow):
     """黑客模拟主窗口"""
     
-    def __init__(self):
+    # 第一次绘制完成、启动序列显示完毕的信号，用于统计启动耗时
+    first_painted = pyqtSignal()
+    boot_completed = pyqtSignal()
+    
+    def __init__(self, prewarm=False, boot=True):
         super().__init__(None, Qt.FramelessWindowHint)
+        ensure_theme()
+        self.painted = False
+        self.booting = False
+        self.prewarm = prewarm  # 启动序列结束后在后台预先导入功能模块
+        self.prewarm_thread = None
+        self.commands = CommandRegistry()
+        self.register_commands()
         self.init_ui()
         self.setup_connections()
-        self.child_windows = []
+        # 子窗口管理，关闭的窗口放回池中复用
+        self.windows = WindowManager(self)
+        # 性能浮层
+        self.perf = PerfHud()
+        
+        # 最小化或隐藏时停止光标闪烁
+        self.visibility = VisibilityWatcher(self)
+        self.visibility.visibility_changed.connect(self.terminal.set_cursor_blinking)
+        self.terminal.set_cursor_blinking(self.visibility.visible)
         
         # 初始化模拟启动序列
-        QTimer.singleShot(500, self.start_boot_sequence)
+        if boot:
+            QTimer.singleShot(500, self.start_boot_sequence)
         
-        self.code_rain_window = None
-        self.network_scanner_window = None
-        self.system_breach_window = None
         self.threat_map_window = None
     
     def init_ui(self):
@@ -302,14 +708,6 @@ class HackerConsole(QMainWindow):
         self.resize(1000, 700)
         self.center_on_screen()
         
-        # 设置窗口样式
-        self.setStyleSheet(f"""
-            QMainWindow {{
-                background-color: {BG_COLOR};
-                border: 1px solid {TITLE_COLOR};
-            }}
-        """)
-        
         # 创建中央部件和布局
         central_widget = QWidget()
         main_layout = QVBoxLayout(central_widget)
@@ -324,7 +722,7 @@ class HackerConsole(QMainWindow):
         separator = QFrame()
         separator.setFrameShape(QFrame.HLine)
         separator.setFrameShadow(QFrame.Sunken)
-        separator.setStyleSheet(f"background-color: {TITLE_COLOR};")
+        separator.setObjectName("separator")
         separator.setFixedHeight(1)
         main_layout.addWidget(separator)
         
@@ -336,7 +734,7 @@ class HackerConsole(QMainWindow):
         separator2 = QFrame()
         separator2.setFrameShape(QFrame.HLine)
         separator2.setFrameShadow(QFrame.Sunken)
-        separator2.setStyleSheet(f"background-color: {TITLE_COLOR};")
+        separator2.setObjectName("separator")
         separator2.setFixedHeight(1)
         main_layout.addWidget(separator2)
         
@@ -344,11 +742,11 @@ class HackerConsole(QMainWindow):
         input_layout = QHBoxLayout()
         input_layout.setContentsMargins(8, 8, 8, 8)
         
-        prompt_label = QLabel("> ")
-        prompt_label.setStyleSheet(f"color: {TITLE_COLOR}; font-weight: bold; font-family: {DEFAULT_FONT}; font-size: {DEFAULT_FONT_SIZE}px;")
-        input_layout.addWidget(prompt_label)
+        self.prompt_label = QLabel("> ")
+        self.prompt_label.setObjectName("promptLabel")
+        input_layout.addWidget(self.prompt_label)
         
-        self.command_input = CommandInput()
+        self.command_input = CommandInput(commands=self.commands)
         input_layout.addWidget(self.command_input)
         
         main_layout.addLayout(input_layout)
@@ -367,6 +765,24 @@ class HackerConsole(QMainWindow):
     def setup_connections(self):
         """设置信号连接"""
         self.command_input.command_entered.connect(self.process_command)
+        self.command_input.completions_available.connect(self.show_completions)
+        self.command_input.search_updated.connect(self.show_search)
+        self.command_input.search_finished.connect(lambda: self.prompt_label.setText("> "))
+        self.command_input.copy_requested.connect(self.terminal.copy)
+        self.terminal.output_drained.connect(self.on_output_drained)
+    
+    def register_commands(self):
+        """注册内置命令"""
+        register = self.commands.register
+        register("help", self.show_help, help="显示此帮助信息")
+        register("clear", self.clear_terminal, aliases=["cls"], help="清空终端")
+        register("exit", self.close, aliases=["quit"], help="退出程序")
+        register("matrix", self.show_code_rain, aliases=["code"], help="显示代码雨效果")
+        register("scan", self.show_network_scanner, aliases=["nmap"], help="显示网络扫描窗口")
+        register("hack", self.show_system_breach, aliases=["breach"], help="显示系统入侵窗口")
+        register("map", self.show_threat_map, aliases=["threatmap"], help="启动全球网络威胁地图")
+        register("windows", self.show_window_stats, help="显示子窗口数量和内存占用")
+        register("perf", self.toggle_perf, args=["[json]"], help="切换所有窗口的性能浮层，json输出各窗口指标")
     
     def start_boot_sequence(self):
         """启动序列，显示启动文本"""
@@ -383,81 +799,124 @@ class HackerConsole(QMainWindow):
             "输入 'help' 查看可用命令.\n"
         ]
         
-        delay = 0
-        for line in boot_sequence:
-            # 逐行显示，每行有延迟
-            QTimer.singleShot(delay, lambda text=line: self.terminal.type_text(text))
-            delay += len(line) * 40 + 500
+        # 逐行加入输出队列，行与行之间停顿
+        self.booting = True
+        for index, line in enumerate(boot_sequence):
+            self.terminal.type_text(line, pause=500 if index else 0)
+    
+    def on_output_drained(self):
+        """终端输出全部显示完毕，第一次发生时表示启动序列结束"""
+        if not self.booting:
+            return
+        self.booting = False
+        self.boot_completed.emit()
+        if self.prewarm and self.prewarm_thread is None:
+            self.prewarm_thread = PrewarmThread(self)
+            QApplication.instance().aboutToQuit.connect(self.stop_prewarm)
+            self.prewarm_thread.start()
+    
+    def stop_prewarm(self):
+        """等待后台预加载结束，避免退出时线程仍在运行"""
+        if self.prewarm_thread is not None:
+            self.prewarm_thread.requestInterruption()
+            self.prewarm_thread.wait()
     
     def process_command(self, command):
-        """处理输入的命令"""
+        """处理输入的命令，返回错误信息，成功时返回None"""
         self.terminal.type_text(f"\n> {command}\n")
         
-        command = command.lower()
-        
-        if command == "help":
-            self.show_help()
-        elif command == "clear" or command == "cls":
-            self.terminal.clear()
-        elif command == "exit" or command == "quit":
-            self.close()
-        elif command == "matrix" or command == "code":
-            self.show_code_rain()
-        elif command == "scan" or command == "nmap":
-            self.show_network_scanner()
-        elif command == "hack" or command == "breach":
-            self.show_system_breach()
-        elif command == "map" or command == "threatmap":
-            self.show_threat_map()
-        else:
-            self.terminal.type_text(f"未知命令: {command}\n")
+        _, error = self.commands.execute(command)
+        if error:
+            self.terminal.type_text(f"{error}\n")
+        return error
     
     def show_help(self):
         """显示帮助信息"""
-        help_text = """
-可用命令列表:
-  help      - 显示此帮助信息
-  clear/cls - 清空终端
-  exit/quit - 退出程序
-  matrix    - 显示代码雨效果
-  scan      - 显示网络扫描窗口
-  hack      - 显示系统入侵窗口
-  map       - 启动全球网络威胁地图
-        
-"""
-        self.terminal.type_text(help_text)
+        self.terminal.type_text(self.commands.help_text())
+    
+    def show_completions(self, candidates):
+        """显示Tab补全的候选命令"""
+        self.terminal.append_text("\n" + "  ".join(candidates) + "\n")
+    
+    def show_search(self, query, match):
+        """在提示符处显示反向搜索的状态"""
+        self.prompt_label.setText(f"(reverse-i-search)`{query}': {match}")
+    
+    def clear_terminal(self):
+        """清空终端"""
+        self.terminal.clear()
+    
+    def show_window_stats(self):
+        """显示子窗口数量和内存估算"""
+        stats = self.windows.stats()
+        clock = frame_clock().stats()
+        memory = f"{stats['memory'] / 1048576:.1f} MB" if stats["memory"] else "未知"
+        self.terminal.type_text(
+            f"窗口: {stats['visible']} 个显示中, {stats['pooled']} 个待复用 "
+            f"(创建 {stats['created']}, 复用 {stats['reused']}, 释放 {stats['released']}, "
+            f"拒绝 {stats['refused']})\n"
+            f"Qt对象: {stats['objects']}  进程内存: {memory}\n"
+            f"动画时钟: {clock['subscriptions']} 个订阅, 间隔 {clock['interval'] or '-'} ms, "
+            f"唤醒 {clock['wakeups']} 次, 分发 {clock['dispatched']} 次\n")
+    
+    def open_windows(self):
+        """主窗口和所有显示中的子窗口"""
+        windows = [self]
+        windows += [window for live in self.windows.windows.values() for window in live if window.isVisible()]
+        if self.threat_map_window:
+            windows.append(self.threat_map_window)
+        return windows
+    
+    def perf_metrics(self):
+        """性能浮层和指标导出读取的数据"""
+        return {"name": "console", **self.terminal.probe.metrics(),
+                "objects": {"lines": len(self.terminal.lines), "queued": self.terminal.queued_chars}}
+    
+    def toggle_perf(self, mode=None):
+        """切换性能浮层，perf json 立即输出所有窗口的指标"""
+        if mode == "json":
+            self.terminal.append_text(self.perf.export(self.open_windows()) + "\n")
+        elif mode is None:
+            enabled = self.perf.toggle(self.open_windows())
+            self.terminal.type_text("性能浮层已开启\n" if enabled else "性能浮层已关闭\n")
+        else:
+            self.terminal.type_text("用法: perf [json]\n")
+    
+    def open_module_window(self, module):
+        """通过窗口管理器打开功能模块的窗口，已达到数量上限时提示用户"""
+        window = self.windows.open(load_window_class(module), self)
+        if window is None:
+            self.terminal.type_text(f"已达到窗口数量上限({self.windows.max_windows} 个)，"
+                                    f"请先关闭一个同类窗口\n")
+        else:
+            self.perf.attach(window)
     
     def show_code_rain(self):
         """显示代码雨窗口"""
         self.terminal.type_text("正在启动矩阵代码雨...\n")
-        code_rain = CodeRainWindow(self)
-        code_rain.show()
-        self.child_windows.append(code_rain)
+        self.open_module_window("code_rain")
     
     def show_network_scanner(self):
         """显示网络扫描窗口"""
         self.terminal.type_text("正在启动网络扫描模块...\n")
-        scanner = NetworkScannerWindow(self)
-        scanner.show()
-        self.child_windows.append(scanner)
+        self.open_module_window("network_scanner")
     
     def show_system_breach(self):
         """显示系统入侵窗口"""
         self.terminal.type_text("正在启动系统入侵模块...\n")
-        breach = SystemBreachWindow(self)
-        breach.show()
-        self.child_windows.append(breach)
+        self.open_module_window("system_breach")
     
     def show_threat_map(self):
         """显示网络威胁地图窗口"""
         self.terminal.type_text("正在启动全球网络威胁地图...\n")
         
         if not self.threat_map_window:
-            self.threat_map_window = ThreatMapWindow()
+            self.threat_map_window = load_window_class("threat_map")()
             # 设置关闭信号
             self.threat_map_window.closed.connect(self.on_threat_map_closed)
         
         self.threat_map_window.show()
+        self.perf.attach(self.threat_map_window)
         self.terminal.type_text("威胁地图已启动，显示全球实时网络攻击")
     
     def on_threat_map_closed(self):
@@ -465,13 +924,18 @@ class HackerConsole(QMainWindow):
         self.threat_map_window = None
         self.terminal.type_text("威胁地图已关闭")
     
+    def paintEvent(self, event):
+        """绘制事件，记录第一次绘制"""
+        super().paintEvent(event)
+        if not self.painted:
+            self.painted = True
+            self.first_painted.emit()
+    
     def closeEvent(self, event):
         """窗口关闭时关闭所有子窗口"""
-        for window in self.child_windows:
-            try:
-                window.close()
-            except:
-                pass
+        self.stop_prewarm()
+        
+        self.windows.close_all()
         
         # 确保关闭威胁地图窗口
         if self.threat_map_window:
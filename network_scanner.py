@@ -3,20 +3,20 @@
 
 import random
 import time
+import asyncio
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-                            QTreeWidget, QTreeWidgetItem, QProgressBar, 
+                            QTreeView, QProgressBar, 
                             QPushButton, QFrame, QDesktopWidget, QLineEdit,
                             QFormLayout, QGroupBox)
 from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QThread, QSize
-from PyQt5.QtGui import QFont, QColor, QPalette, QIcon, QBrush
+from PyQt5.QtGui import QFont, QColor, QPalette, QIcon, QBrush, QIntValidator
 
-# 样式常量
-BG_COLOR = "#000000"
-TEXT_COLOR = "#00FF00"
-ACCENT_COLOR = "#00FFAA"
-HIGHLIGHT_COLOR = "#FF0000"
-DEFAULT_FONT = "Consolas"
-DEFAULT_FONT_SIZE = 14  # 增大默认字体大小
+from frame_clock import frame_clock
+from perf_hud import PerfProbe
+from scan_results import (ScanResultModel, SEVERITY_INFO, SEVERITY_WARNING,
+                          SEVERITY_CRITICAL, NO_VULNERABILITY)
+from scan_targets import parse_targets
+from theme import ensure_theme, DEFAULT_FONT, DEFAULT_FONT_SIZE
 
 # 模拟网络服务
 COMMON_SERVICES = {
@@ -51,140 +51,105 @@ VULNERABILITIES = [
     "Open Port"
 ]
 
+# 扫描结果在工作线程中缓存，达到时间间隔或数量后一次发送给界面
+RESULT_FLUSH_INTERVAL = 0.04  # 秒，即每秒最多25批
+RESULT_BATCH_SIZE = 500
+
+# 每个端口的模拟扫描延迟范围(秒)
+SCAN_DELAY = (0.1, 0.3)
+
+# 同时进行的模拟探测数，各探测的延迟相互重叠
+SCAN_CONCURRENCY = 64
+MAX_SCAN_CONCURRENCY = 4096
+
+# 界面把收到的结果攒起来定时插入模型(ms)；插入顶层行后视图要重新布局所有顶层行，
+# 结果很多时按上次插入的耗时放宽间隔，使插入最多占用界面线程 1/RESULT_APPLY_SHARE 的时间
+RESULT_APPLY_INTERVAL = 100
+RESULT_APPLY_SHARE = 5
+
+# 结果少于该行数时新主机自动展开；展开的行每次插入都要重新布局，结果很多时保持折叠
+AUTO_EXPAND_ROWS = 2000
+
 class ScannerThread(QThread):
     """用于在后台执行扫描操作的线程"""
     
     # 自定义信号
     progress_updated = pyqtSignal(int)
-    host_found = pyqtSignal(str, str, str)  # IP, 描述, 类型(info/warning/critical)
-    port_found = pyqtSignal(str, int, str, str)  # IP, 端口, 服务名, 类型
+    # 一批结果，每项为 ("host", IP, 延迟毫秒, 严重程度) 或 ("port", IP, 端口, 严重程度, 漏洞编号)
+    # IP为整数，严重程度和漏洞编号的含义见scan_results
+    results_ready = pyqtSignal(list)
     scan_complete = pyqtSignal()
     
-    def __init__(self, ip_range, port_range, parent=None):
+    def __init__(self, targets, port_range, concurrency=SCAN_CONCURRENCY, parent=None):
         super().__init__(parent)
-        self.ip_range = ip_range
+        self.targets = targets  # scan_targets.TargetSet
         self.port_range = port_range
+        self.concurrency = concurrency
         self.is_running = True
+        
+        # 待发送的结果和进度
+        self.pending = []
+        self.progress = 0
+        self.reported_progress = None
+        self.last_flush = time.perf_counter()
+        
+        # 扫描统计，界面线程读取这些计数计算速率
+        self.started = None
+        self.finished_at = None
+        self.hosts_done = 0
+        self.probes_done = 0
     
     def stop(self):
         """停止扫描"""
         self.is_running = False
     
+    def add_result(self, *result):
+        """缓存一条结果，缓存已满或距上次发送已超过间隔时发送"""
+        self.pending.append(result)
+        if (len(self.pending) >= RESULT_BATCH_SIZE
+                or time.perf_counter() - self.last_flush >= RESULT_FLUSH_INTERVAL):
+            self.flush()
+    
+    def flush(self):
+        """发送缓存的结果，进度有变化时一并发送"""
+        if self.pending:
+            self.results_ready.emit(self.pending)
+            self.pending = []
+        if self.progress != self.reported_progress:
+            self.progress_updated.emit(self.progress)
+            self.reported_progress = self.progress
+        self.last_flush = time.perf_counter()
+    
+    def rates(self):
+        """扫描速率：已完成的主机数和探测数，以及每秒完成的数量"""
+        elapsed = 0
+        if self.started is not None:
+            elapsed = (self.finished_at or time.perf_counter()) - self.started
+        return {
+            "hosts": self.hosts_done,
+            "probes": self.probes_done,
+            "seconds": round(elapsed, 2),
+            "hosts_per_s": round(self.hosts_done / elapsed, 1) if elapsed else 0.0,
+            "probes_per_s": round(self.probes_done / elapsed, 1) if elapsed else 0.0,
+        }
+    
     def run(self):
         """执行扫描操作"""
-        total_ips = 10  # 模拟扫描的IP数量
-        current_progress = 0
-        
-        # 生成目标IP，严格基于用户输入的IP范围
-        target_ips = []
-        
-        # 定义处理IP生成的函数
-        def generate_ips_for_partial(parts, count=total_ips):
-            """根据部分IP生成完整IP地址"""
-            result = []
-            if len(parts) == 1:  # 如 "192"
-                for _ in range(count):
-                    ip = f"{parts[0]}.{random.randint(0, 255)}.{random.randint(0, 255)}.{random.randint(1, 254)}"
-                    result.append(ip)
-            elif len(parts) == 2:  # 如 "192.1"
-                for _ in range(count):
-                    ip = f"{parts[0]}.{parts[1]}.{random.randint(0, 255)}.{random.randint(1, 254)}"
-                    result.append(ip)
-            elif len(parts) == 3:  # 如 "192.168.1"
-                for _ in range(count):
-                    ip = f"{parts[0]}.{parts[1]}.{parts[2]}.{random.randint(1, 254)}"
-                    result.append(ip)
-            else:  # 无效部分
-                for _ in range(count):
-                    ip = f"192.168.1.{random.randint(1, 254)}"
-                    result.append(ip)
-            return result
-        
-        if self.ip_range:
-            # 处理输入，去除可能的空格
-            ip_range = self.ip_range.strip()
-            
-            # 处理CIDR格式 (例如 192.168.1.0/24)
-            if '/' in ip_range:
-                ip_base = ip_range.split('/')[0].strip()
-            else:
-                ip_base = ip_range
-            
-            # 解析IP部分，支持部分IP格式（如"192.1"）
-            parts = [p for p in ip_base.split('.') if p]  # 移除空部分
-            
-            # 处理特殊情况: "192.1"这样的格式会生成两个部分
-            if len(parts) == 2:
-                # 专门处理"192.1"格式，确保生成"192.1.x.y"而不是默认的"192.168.1.x"
-                for _ in range(total_ips):
-                    third = random.randint(0, 255)
-                    fourth = random.randint(1, 254)
-                    ip = f"{parts[0]}.{parts[1]}.{third}.{fourth}"
-                    target_ips.append(ip)
-            elif len(parts) == 1:
-                # 单段IP，如"192"
-                for _ in range(total_ips):
-                    second = random.randint(0, 255)
-                    third = random.randint(0, 255)
-                    fourth = random.randint(1, 254)
-                    ip = f"{parts[0]}.{second}.{third}.{fourth}"
-                    target_ips.append(ip)
-            elif len(parts) == 3:
-                # 3段IP，如"192.168.1"
-                for _ in range(total_ips):
-                    fourth = random.randint(1, 254)
-                    ip = f"{parts[0]}.{parts[1]}.{parts[2]}.{fourth}"
-                    target_ips.append(ip)
-            elif len(parts) == 4:
-                # 完整IP
-                try:
-                    last_part = int(parts[3])
-                    if last_part == 0:  # 网段，如"192.168.1.0"
-                        for _ in range(total_ips):
-                            fourth = random.randint(1, 254)
-                            ip = f"{parts[0]}.{parts[1]}.{parts[2]}.{fourth}"
-                            target_ips.append(ip)
-                    else:  # 具体IP，生成附近IP
-                        base = max(1, last_part - 5)
-                        for i in range(total_ips):
-                            if base + i > 254:
-                                ip = f"{parts[0]}.{parts[1]}.{parts[2]}.{base - (i - (254-base))}"
-                            else:
-                                ip = f"{parts[0]}.{parts[1]}.{parts[2]}.{base + i}"
-                            target_ips.append(ip)
-                except ValueError:
-                    # 最后一段不是数字
-                    for _ in range(total_ips):
-                        fourth = random.randint(1, 254)
-                        ip = f"{parts[0]}.{parts[1]}.{parts[2]}.{fourth}"
-                        target_ips.append(ip)
-            else:
-                # 无效格式，使用默认
-                target_ips = generate_ips_for_partial([], total_ips)
-        else:
-            # 未提供IP范围，使用默认值
-            for _ in range(total_ips):
-                ip = f"192.168.1.{random.randint(1, 254)}"
-                target_ips.append(ip)
-        
-        # 确保没有重复的IP
-        target_ips = list(dict.fromkeys(target_ips))
-        
-        # 如果生成的IP不足，补充到需要的数量
-        while len(target_ips) < total_ips:
-            if len(parts) >= 1:
-                # 使用现有IP部分生成新IP
-                new_ips = generate_ips_for_partial(parts, total_ips - len(target_ips))
-                for ip in new_ips:
-                    if ip not in target_ips:
-                        target_ips.append(ip)
-                        if len(target_ips) >= total_ips:
-                            break
-            else:
-                # 使用默认值
-                ip = f"192.168.1.{random.randint(1, 254)}"
-                if ip not in target_ips:
-                    target_ips.append(ip)
+        port_list = self.parse_ports()
+        self.started = time.perf_counter()
+        asyncio.run(self.scan(port_list))
+        self.finished_at = time.perf_counter()
+        
+        # 完成扫描
+        if self.is_running:
+            self.progress = 100
+        self.flush()
+        if self.is_running:
+            self.scan_complete.emit()
+    
+    def parse_ports(self):
+        """解析端口范围，返回要探测的端口列表"""
+        port_list = []
         
         # 解析端口范围
         port_list = []
@@ -242,60 +207,71 @@ class ScannerThread(QThread):
         # 如果端口列表仍然为空，使用默认端口
         if not port_list:
             port_list = random.sample(list(COMMON_SERVICES.keys()), min(8, len(COMMON_SERVICES)))
-        
-        # 开始扫描过程
-        for ip_index, ip in enumerate(target_ips):
+        return port_list
+    
+    async def scan(self, port_list):
+        """在本线程的事件循环中并发执行所有探测"""
+        # 各探测者从同一个生成器领取探测，目标地址按需逐个生成，不展开为列表
+        probes = self.probes(port_list)
+        remaining = {}  # 正在扫描的主机 -> 未完成的探测数
+        total = len(self.targets) * len(port_list)
+        workers = [asyncio.ensure_future(self.probe_worker(probes, port_list, remaining, total))
+                   for _ in range(self.concurrency)]
+        flusher = asyncio.ensure_future(self.flush_periodically())
+        await asyncio.gather(*workers)
+        flusher.cancel()
+    
+    def probes(self, port_list):
+        """按顺序生成(IP, 端口)探测，开始扫描一个主机时先通知发现主机"""
+        for ip in self.targets.addresses():
+            severity = random.choice((SEVERITY_INFO, SEVERITY_WARNING, SEVERITY_CRITICAL))
+            self.add_result("host", ip, random.randint(1, 100), severity)
+            for port in port_list:
+                yield ip, port
+    
+    async def probe_worker(self, probes, port_list, remaining, total):
+        """不断领取并执行探测，直到没有探测或扫描被停止"""
+        for ip, port in probes:
             if not self.is_running:
                 break
+            remaining.setdefault(ip, len(port_list))
             
-            # 通知发现主机
-            status_type = random.choice(["info", "warning", "critical"])
-            desc = f"Host is up ({random.randint(1, 100)}ms latency)"
-            self.host_found.emit(ip, desc, status_type)
+            # 模拟探测延迟，期间其他探测继续进行
+            await asyncio.sleep(random.uniform(*SCAN_DELAY))
+            if not self.is_running:
+                break
             
-            # 为每个IP扫描端口
-            ports_scanned = 0
-            for port in port_list:
-                if not self.is_running:
-                    break
-                
-                # 随机决定端口是否开放 (70%几率开放)
-                if random.random() < 0.7:
-                    # 获取服务名称，如果不在预定义服务列表中，则显示"Unknown"
-                    service = COMMON_SERVICES.get(port, "Unknown")
-                    
-                    # 80%的几率是信息，15%的几率是警告，5%的几率是严重
-                    r = random.random()
-                    if r < 0.8:
-                        status_type = "info"
-                        detail = "Open Port"
-                    elif r < 0.95:
-                        status_type = "warning"
-                        detail = random.choice(VULNERABILITIES)
-                    else:
-                        status_type = "critical"
-                        detail = f"Critical: {random.choice(VULNERABILITIES)}"
-                    
-                    # 通知发现端口
-                    self.port_found.emit(ip, port, service, status_type)
-                    ports_scanned += 1
-                
-                # 更新进度 - 每个IP的进度贡献为总进度的1/total_ips
-                ip_progress = (ip_index / total_ips) * 100
-                # 每个端口的扫描贡献为单个IP进度的1/len(port_list)
-                port_progress = (ports_scanned / len(port_list)) * (100 / total_ips)
-                current_progress = ip_progress + port_progress
-                
-                self.progress_updated.emit(min(int(current_progress), 99))  # 保留最后1%给完成信号
+            # 随机决定端口是否开放 (70%几率开放)
+            if random.random() < 0.7:
+                # 80%的几率是信息，15%的几率是警告，5%的几率是严重
+                r = random.random()
+                if r < 0.8:
+                    severity = SEVERITY_INFO
+                    detail = NO_VULNERABILITY
+                elif r < 0.95:
+                    severity = SEVERITY_WARNING
+                    detail = random.randrange(len(VULNERABILITIES))
+                else:
+                    severity = SEVERITY_CRITICAL
+                    detail = random.randrange(len(VULNERABILITIES))
                 
-                # 模拟扫描延迟
-                if self.is_running:
-                    time.sleep(random.uniform(0.1, 0.3))
-        
-        # 完成扫描
-        if self.is_running:
-            self.progress_updated.emit(100)
-            self.scan_complete.emit()
+                # 通知发现端口，服务名由端口号决定，显示时再查找
+                self.add_result("port", ip, port, severity, detail)
+            
+            # 主机的所有探测完成后计为完成一个主机
+            self.probes_done += 1
+            remaining[ip] -= 1
+            if not remaining[ip]:
+                del remaining[ip]
+                self.hosts_done += 1
+            self.progress = min(self.probes_done * 100 // total, 99)  # 保留最后1%给完成信号
+    
+    async def flush_periodically(self):
+        """探测都在等待时，按时发送已缓存的结果"""
+        while True:
+            await asyncio.sleep(RESULT_FLUSH_INTERVAL)
+            if self.pending or self.progress != self.reported_progress:
+                self.flush()
 
 
 class NetworkScannerWindow(QWidget):
@@ -303,9 +279,15 @@ class NetworkScannerWindow(QWidget):
     
     def __init__(self, parent=None):
         super().__init__(parent, Qt.Window | Qt.FramelessWindowHint)
+        ensure_theme()
         self.initUI()
         self.scanner_thread = None
         self.drag_position = None
+        self.probe = PerfProbe(self)  # 扫描窗口没有动画，统计跨线程信号和插入结果的耗时
+        
+        # 等待插入模型的结果
+        self.pending_results = []
+        self.apply_timer = frame_clock().subscribe(self, self.apply_results, RESULT_APPLY_INTERVAL)
         
         # 设置窗口位置在右下角
         self.positionWindow()
@@ -316,86 +298,6 @@ class NetworkScannerWindow(QWidget):
         self.resize(900, 650)
         self.setWindowTitle("Network Scanner")
         
-        # 设置窗口样式
-        self.setStyleSheet(f"""
-            QWidget {{
-                background-color: {BG_COLOR};
-                color: {TEXT_COLOR};
-                font-family: {DEFAULT_FONT};
-                border: 1px solid {TEXT_COLOR};
-            }}
-            QLabel {{
-                border: none;
-                font-size: {DEFAULT_FONT_SIZE}px;
-            }}
-            QProgressBar {{
-                border: 1px solid {TEXT_COLOR};
-                border-radius: 0px;
-                text-align: center;
-                background-color: {BG_COLOR};
-                font-size: {DEFAULT_FONT_SIZE}px;
-                min-height: 20px;
-            }}
-            QProgressBar::chunk {{
-                background-color: {TEXT_COLOR};
-            }}
-            QPushButton {{
-                background-color: {BG_COLOR};
-                color: {TEXT_COLOR};
-                border: 1px solid {TEXT_COLOR};
-                padding: 5px;
-                min-height: 30px;
-                font-size: {DEFAULT_FONT_SIZE}px;
-            }}
-            QPushButton:hover {{
-                background-color: rgba(0, 255, 170, 30%);
-                color: white;
-            }}
-            QPushButton:pressed {{
-                background-color: rgba(0, 255, 170, 50%);
-            }}
-            QTreeWidget {{
-                background-color: {BG_COLOR};
-                color: {TEXT_COLOR};
-                border: 1px solid {TEXT_COLOR};
-                alternate-background-color: #0A0A0A;
-                font-size: {DEFAULT_FONT_SIZE}px;
-            }}
-            QTreeWidget::item:selected {{
-                background-color: rgba(0, 255, 170, 30%);
-            }}
-            QTreeWidget::item {{
-                border-bottom: 1px solid #222222;
-                padding: 2px;
-            }}
-            QHeaderView::section {{
-                background-color: {BG_COLOR};
-                color: {TEXT_COLOR};
-                border: 1px solid {TEXT_COLOR};
-                padding: 6px;
-                font-size: {DEFAULT_FONT_SIZE}px;
-            }}
-            QLineEdit {{
-                background-color: {BG_COLOR};
-                color: {TEXT_COLOR};
-                border: 1px solid {TEXT_COLOR};
-                padding: 5px;
-                font-size: {DEFAULT_FONT_SIZE}px;
-            }}
-            QGroupBox {{
-                background-color: {BG_COLOR};
-                color: {TEXT_COLOR};
-                border: 1px solid {TEXT_COLOR};
-                margin-top: 12px;
-                font-size: {DEFAULT_FONT_SIZE}px;
-            }}
-            QGroupBox::title {{
-                subcontrol-origin: margin;
-                subcontrol-position: top left;
-                padding: 0 5px;
-            }}
-        """)
-        
         # 设置窗口半透明
         self.setWindowOpacity(0.95)
         
@@ -408,25 +310,14 @@ class NetworkScannerWindow(QWidget):
         title_layout = QHBoxLayout()
         
         title_label = QLabel("NETWORK SCANNER v1.0")
-        title_label.setStyleSheet(f"color: {TEXT_COLOR}; font-weight: bold; font-size: 16px;")
+        title_label.setObjectName("titleLabel")
         title_layout.addWidget(title_label)
         
         title_layout.addStretch()
         
         close_button = QPushButton("×")
         close_button.setFixedSize(30, 30)
-        close_button.setStyleSheet(f"""
-            QPushButton {{
-                background-color: transparent;
-                color: {TEXT_COLOR};
-                border: none;
-                font-size: 18px;
-                font-weight: bold;
-            }}
-            QPushButton:hover {{
-                color: {HIGHLIGHT_COLOR};
-            }}
-        """)
+        close_button.setObjectName("closeButton")
         close_button.clicked.connect(self.close)
         title_layout.addWidget(close_button)
         
@@ -436,19 +327,19 @@ class NetworkScannerWindow(QWidget):
         separator = QFrame()
         separator.setFrameShape(QFrame.HLine)
         separator.setFrameShadow(QFrame.Sunken)
-        separator.setStyleSheet(f"background-color: {TEXT_COLOR};")
+        separator.setObjectName("separator")
         separator.setFixedHeight(1)
         main_layout.addWidget(separator)
         
         # 目标设置区域
         target_group = QGroupBox("扫描配置")
-        target_group.setMaximumHeight(120)
+        target_group.setMaximumHeight(150)
         target_layout = QFormLayout(target_group)
         target_layout.setContentsMargins(10, 25, 10, 10)
         
         # IP范围输入
         self.ip_range_input = QLineEdit("192.168.1.0/24")
-        self.ip_range_input.setPlaceholderText("例如: 192.168.1.0/24")
+        self.ip_range_input.setPlaceholderText("例如: 10.0.0.0/16, 10.1.0.1-10.1.0.50, !10.0.5.0/24")
         target_layout.addRow("目标IP范围:", self.ip_range_input)
         
         # 端口范围输入
@@ -456,13 +347,18 @@ class NetworkScannerWindow(QWidget):
         self.port_range_input.setPlaceholderText("例如: 1-1024")
         target_layout.addRow("端口范围:", self.port_range_input)
         
+        # 并发探测数输入
+        self.concurrency_input = QLineEdit(str(SCAN_CONCURRENCY))
+        self.concurrency_input.setValidator(QIntValidator(1, MAX_SCAN_CONCURRENCY, self))
+        self.concurrency_input.setPlaceholderText(f"1-{MAX_SCAN_CONCURRENCY}")
+        target_layout.addRow("并发探测数:", self.concurrency_input)
+        
         main_layout.addWidget(target_group)
         
         # 状态布局
         status_layout = QHBoxLayout()
         
         self.status_label = QLabel("等待开始扫描...")
-        self.status_label.setStyleSheet(f"font-size: {DEFAULT_FONT_SIZE}px;")
         status_layout.addWidget(self.status_label)
         
         status_layout.addStretch()
@@ -476,9 +372,11 @@ class NetworkScannerWindow(QWidget):
         
         main_layout.addLayout(status_layout)
         
-        # 结果树形视图
-        self.results_tree = QTreeWidget()
-        self.results_tree.setHeaderLabels(["目标", "端口/服务", "状态", "详情"])
+        # 结果树形视图，数据保存在模型中，视图只生成可见行的内容
+        self.results_model = ScanResultModel(COMMON_SERVICES, VULNERABILITIES, self)
+        self.results_tree = QTreeView()
+        self.results_tree.setModel(self.results_model)
+        self.results_tree.setUniformRowHeights(True)
         self.results_tree.setAlternatingRowColors(True)
         self.results_tree.setColumnWidth(0, 180)
         self.results_tree.setColumnWidth(1, 180)
@@ -525,37 +423,55 @@ class NetworkScannerWindow(QWidget):
             self.status_label.setText("扫描已停止")
             self.ip_range_input.setEnabled(True)
             self.port_range_input.setEnabled(True)
+            self.concurrency_input.setEnabled(True)
         else:
             # 开始扫描
             self.start_scan()
     
+    def perf_metrics(self):
+        """性能浮层和指标导出读取的数据"""
+        objects = {"rows": self.results_model.row_count()}
+        if self.scanner_thread is not None:
+            rates = self.scanner_thread.rates()
+            objects.update({"hosts/s": rates["hosts_per_s"], "probes/s": rates["probes_per_s"]})
+        return {"name": "network_scanner", **self.probe.metrics(), "objects": objects}
+    
     def start_scan(self):
         """开始扫描操作"""
         # 获取用户输入的IP和端口范围
         ip_range = self.ip_range_input.text().strip()
         port_range = self.port_range_input.text().strip()
         
-        # 输入验证 (简化版)
-        if not ip_range:
-            self.status_label.setText("请输入有效的IP范围")
+        # 解析扫描目标，输入无效时提示后返回
+        try:
+            targets = parse_targets(ip_range)
+        except ValueError as error:
+            self.status_label.setText(str(error))
             return
         
+        concurrency = int(self.concurrency_input.text() or SCAN_CONCURRENCY)
+        concurrency = max(1, min(MAX_SCAN_CONCURRENCY, concurrency))
+        
         # 禁用输入控件
         self.ip_range_input.setEnabled(False)
         self.port_range_input.setEnabled(False)
+        self.concurrency_input.setEnabled(False)
         
-        # 创建扫描线程
-        self.scanner_thread = ScannerThread(ip_range, port_range, self)
+        # 创建扫描线程，上一次扫描的线程随之释放
+        self.release_scanner()
+        self.scanner_thread = ScannerThread(targets, port_range, concurrency, self)
         
         # 连接信号
         self.scanner_thread.progress_updated.connect(self.update_progress)
-        self.scanner_thread.host_found.connect(self.add_host)
-        self.scanner_thread.port_found.connect(self.add_port)
+        self.scanner_thread.results_ready.connect(self.add_results)
         self.scanner_thread.scan_complete.connect(self.scan_completed)
+        self.probe.watch_signals(self.scanner_thread.progress_updated, self.scanner_thread.results_ready,
+                                 self.scanner_thread.scan_complete)
         
         # 更新UI
         self.scan_button.setText("停止扫描")
-        self.status_label.setText(f"正在扫描 {ip_range} 上的端口 {port_range}...")
+        self.status_label.setText(f"正在扫描 {ip_range} ({len(targets)} 个地址) 上的端口 {port_range}，"
+                                  f"并发 {concurrency}...")
         self.progress_bar.setValue(0)
         
         # 启动线程
@@ -565,87 +481,79 @@ class NetworkScannerWindow(QWidget):
         """更新进度条"""
         self.progress_bar.setValue(value)
     
-    def add_host(self, ip, desc, status_type):
-        """添加主机到结果树"""
-        host_item = QTreeWidgetItem(self.results_tree)
-        host_item.setText(0, ip)
-        host_item.setText(1, "")
-        host_item.setText(2, self.get_status_text(status_type))
-        host_item.setText(3, desc)
-        
-        # 设置颜色
-        for i in range(4):
-            host_item.setForeground(i, QBrush(self.get_status_color(status_type)))
-        
-        # 展开项目
-        self.results_tree.expandItem(host_item)
+    def add_results(self, results):
+        """收到一批结果，等到下次插入时和其他批次一起插入模型"""
+        self.pending_results.extend(results)
+        if not self.apply_timer.isActive():
+            self.apply_timer.start()
     
-    def add_port(self, ip, port, service, status_type):
-        """添加端口到结果树"""
-        # 查找对应的主机项
-        host_item = None
-        for i in range(self.results_tree.topLevelItemCount()):
-            item = self.results_tree.topLevelItem(i)
-            if item.text(0) == ip:
-                host_item = item
-                break
-        
-        if not host_item:
+    def apply_results(self):
+        """把等待的结果插入模型，插入期间暂停结果视图的刷新；原来停在底部时继续跟随最新结果"""
+        self.apply_timer.stop()
+        if not self.pending_results:
             return
-        
-        # 创建端口项
-        port_item = QTreeWidgetItem(host_item)
-        port_item.setText(0, "")
-        port_item.setText(1, f"{port}/{service}")
-        port_item.setText(2, self.get_status_text(status_type))
-        
-        # 根据状态类型选择详情内容
-        if status_type == "warning":
-            vuln = random.choice(VULNERABILITIES)
-            port_item.setText(3, vuln)
-        elif status_type == "critical":
-            vuln = random.choice(VULNERABILITIES)
-            port_item.setText(3, f"Critical: {vuln}")
-        else:
-            port_item.setText(3, "Open Port")
-        
-        # 设置颜色
-        for i in range(4):
-            port_item.setForeground(i, QBrush(self.get_status_color(status_type)))
-        
-        # 滚动到最新项
-        self.results_tree.scrollToItem(port_item)
-    
-    def get_status_text(self, status_type):
-        """根据状态类型获取状态文本"""
-        if status_type == "info":
-            return "信息"
-        elif status_type == "warning":
-            return "警告"
-        elif status_type == "critical":
-            return "严重"
-        return ""
-    
-    def get_status_color(self, status_type):
-        """根据状态类型获取颜色"""
-        if status_type == "info":
-            return QColor(TEXT_COLOR)
-        elif status_type == "warning":
-            return QColor("#FFAA00")
-        elif status_type == "critical":
-            return QColor(HIGHLIGHT_COLOR)
-        return QColor(TEXT_COLOR)
+        results, self.pending_results = self.pending_results, []
+        
+        started = time.perf_counter()
+        scrollbar = self.results_tree.verticalScrollBar()
+        follow = scrollbar.value() == scrollbar.maximum()
+        self.results_tree.setUpdatesEnabled(False)
+        try:
+            hosts = self.results_model.append_results(results)
+            if self.results_model.row_count() < AUTO_EXPAND_ROWS:
+                for row in hosts:
+                    self.results_tree.expand(self.results_model.index(row, 0))
+            # 立即完成重新布局，以便计入本次插入的耗时
+            self.results_tree.executeDelayedItemsLayout()
+        finally:
+            self.results_tree.setUpdatesEnabled(True)
+        if follow:
+            self.results_tree.scrollToBottom()
+        
+        elapsed = time.perf_counter() - started
+        self.probe.record_tick(elapsed)
+        self.apply_timer.setInterval(max(RESULT_APPLY_INTERVAL, elapsed * 1000 * RESULT_APPLY_SHARE))
     
     def scan_completed(self):
         """扫描完成的处理"""
-        self.status_label.setText("扫描完成")
+        self.apply_results()
+        rates = self.scanner_thread.rates()
+        self.status_label.setText(f"扫描完成: {rates['hosts']} 个主机, {rates['probes']} 次探测, "
+                                  f"用时 {rates['seconds']}s ({rates['hosts_per_s']} 主机/s, "
+                                  f"{rates['probes_per_s']} 探测/s)")
         self.scan_button.setText("开始扫描")
         self.ip_range_input.setEnabled(True)
         self.port_range_input.setEnabled(True)
+        self.concurrency_input.setEnabled(True)
+    
+    def release_scanner(self):
+        """停止并释放扫描线程"""
+        if self.scanner_thread is None:
+            return
+        if self.scanner_thread.isRunning():
+            self.scanner_thread.stop()
+            self.scanner_thread.wait(1000)  # 等待最多1秒
+        if self.scanner_thread.isRunning():
+            self.scanner_thread.finished.connect(self.scanner_thread.deleteLater)
+        else:
+            self.scanner_thread.deleteLater()
+        self.scanner_thread = None
+    
+    def reset_state(self):
+        """重置为刚打开时的状态，窗口被复用时调用"""
+        self.release_scanner()
+        self.scan_button.setText("开始扫描")
+        self.ip_range_input.setEnabled(True)
+        self.port_range_input.setEnabled(True)
+        self.concurrency_input.setEnabled(True)
+        self.clear_results()
+        self.positionWindow()
     
     def clear_results(self):
         """清除扫描结果"""
-        self.results_tree.clear()
+        self.apply_timer.stop()
+        self.pending_results = []
+        self.results_model.clear()
         self.progress_bar.setValue(0)
         self.status_label.setText("等待开始扫描...")
     
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from PyQt5.QtCore import QObject, QElapsedTimer
+
+from frame_clock import frame_clock
+from perf_hud import PerfProbe
+
+# 单次模拟推进的最长时间(秒)，避免长时间卡顿后动画跳跃过大；
+# 帧率很低时放宽到两帧的时间，否则每帧推进的时间会少于帧间隔
+MAX_STEP = 0.25
+
+
+class FramePacer(QObject):
+    """帧节奏控制器：模拟按实际经过的时间推进，上一帧绘制超出预算时跳过后续帧"""
+
+    def __init__(self, parent, simulate, render, target_fps=30, max_step=MAX_STEP, catch_up=None):
+        super().__init__(parent)
+        self.simulate = simulate  # simulate(dt)，dt为经过的秒数
+        self.render = render      # 请求重绘，为None表示模拟本身会更新界面
+        self.catch_up = catch_up  # catch_up(seconds)，窗口重新可见时补上隐藏期间的时间，为None表示不补
+        self.max_step = max_step
+        self.target_fps = target_fps
+        self.rate_scale = 1.0   # 画质调节器降低刷新率时使用的比例
+        self.governor = None    # 可选的画质调节器，每帧绘制结束时接收绘制耗时
+
+        # 订阅共用的帧时钟，不单独使用计时器
+        self.timer = frame_clock().subscribe(self, self.tick, self.frame_interval())
+
+        self.clock = QElapsedTimer()
+        self.paint_clock = QElapsedTimer()
+        self.tick_clock = QElapsedTimer()
+        self.probe = PerfProbe(self)  # 供性能浮层读取的耗时和帧率
+        
+        # 窗口不可见时暂停模拟和绘制，running记录是否应当运行
+        self.running = False
+        self.paused = False
+        self.hidden_clock = QElapsedTimer()
+
+        # 帧统计
+        self.last_paint_time = 0.0
+        self.frames_rendered = 0
+        self.frames_skipped = 0
+        self.skip_frames = 0
+
+    def effective_fps(self):
+        """实际使用的帧率"""
+        return self.target_fps * self.rate_scale
+
+    def frame_interval(self):
+        """每帧间隔(毫秒)"""
+        return max(1, round(1000 / self.effective_fps()))
+
+    def frame_budget(self):
+        """每帧绘制预算(秒)"""
+        return 1.0 / self.effective_fps()
+
+    def step_limit(self):
+        """单次推进的最长时间(秒)，不小于两帧的时间"""
+        return max(self.max_step, 2 * self.frame_budget())
+
+    def set_target_fps(self, fps):
+        """设置目标帧率"""
+        self.target_fps = max(0.1, fps)
+        self.timer.setInterval(self.frame_interval())
+
+    def set_rate_scale(self, scale):
+        """按比例调整实际帧率，目标帧率保持不变"""
+        self.rate_scale = scale
+        self.timer.setInterval(self.frame_interval())
+
+    def start(self):
+        """开始计时，窗口不可见时等到可见后才开始"""
+        self.running = True
+        self.clock.start()
+        self.skip_frames = 0
+        if not self.paused:
+            self.timer.start()
+
+    def stop(self):
+        """停止计时"""
+        self.running = False
+        self.timer.stop()
+
+    def is_active(self):
+        """是否正在运行(包括因窗口不可见而暂停)"""
+        return self.running
+
+    def set_visible(self, visible):
+        """窗口可见性改变：不可见时暂停，重新可见时补上隐藏期间的时间后继续"""
+        if visible != self.paused:
+            return
+        self.paused = not visible
+        if self.paused:
+            self.timer.stop()
+            self.hidden_clock.start()
+        elif self.running:
+            if self.catch_up is not None and self.hidden_clock.isValid():
+                self.catch_up(self.hidden_clock.elapsed() / 1000)
+            self.clock.start()
+            self.skip_frames = 0
+            self.timer.start()
+
+    def tick(self):
+        """推进模拟，必要时跳过本帧的绘制"""
+        dt = min(self.clock.nsecsElapsed() / 1e9, self.step_limit())
+        self.clock.restart()
+        self.tick_clock.start()
+        self.simulate(dt)
+        self.probe.record_tick(self.tick_clock.nsecsElapsed() / 1e9)
+        if self.render is None:
+            self.probe.record_frame()
+            return
+
+        if self.skip_frames > 0:
+            self.skip_frames -= 1
+            self.frames_skipped += 1
+            return
+        self.frames_rendered += 1
+        self.render()
+
+    def paint_started(self):
+        """绘制开始时调用"""
+        self.paint_clock.start()
+
+    def paint_finished(self):
+        """绘制结束时调用，超出预算的部分折算为需要跳过的帧数"""
+        self.last_paint_time = self.paint_clock.nsecsElapsed() / 1e9
+        self.probe.record_paint(self.last_paint_time)
+        overrun = self.last_paint_time / self.frame_budget()
+        if overrun > 1:
+            self.skip_frames = int(overrun)
+        if self.governor is not None:
+            self.governor.record(self.last_paint_time, self.frame_budget())
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import time
+from collections import deque
+from PyQt5 import sip
+from PyQt5.QtCore import Qt, QObject
+from PyQt5.QtWidgets import QLabel
+
+from frame_clock import frame_clock
+from window_manager import process_memory
+
+# 保留的最近采样数，百分位数按这些采样计算
+PERF_SAMPLES = 240
+
+# 计算帧率的时间窗口(秒)
+FPS_WINDOW = 1.0
+
+# 性能浮层的刷新间隔(ms)
+HUD_INTERVAL = 500
+
+# 浮层与窗口右上角的距离
+HUD_MARGIN = 8
+
+
+def percentile(samples, fraction):
+    """采样的百分位数，没有采样时返回None"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class PerfProbe(QObject):
+    """性能探针：记录绘制和模拟耗时、帧率以及跨线程信号的积压数量"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.paint_times = deque(maxlen=PERF_SAMPLES)  # 秒
+        self.tick_times = deque(maxlen=PERF_SAMPLES)   # 秒
+        self.frame_times = deque(maxlen=PERF_SAMPLES)  # 每帧完成的时间点
+
+        # 跨线程信号：发出时在工作线程中计数，送达时在界面线程中计数
+        self.signals_emitted = 0
+        self.signals_delivered = 0
+
+    def record_frame(self):
+        """记录完成了一帧"""
+        self.frame_times.append(time.perf_counter())
+
+    def record_paint(self, seconds):
+        """记录一次绘制的耗时"""
+        self.paint_times.append(seconds)
+        self.record_frame()
+
+    def record_tick(self, seconds):
+        """记录一次模拟推进的耗时"""
+        self.tick_times.append(seconds)
+
+    def watch_signals(self, *signals):
+        """统计工作线程发往界面线程的信号，送达前的数量即为积压"""
+        for signal in signals:
+            signal.connect(self.count_emitted, Qt.DirectConnection)
+            signal.connect(self.count_delivered)
+
+    def count_emitted(self, *args):
+        self.signals_emitted += 1
+
+    def count_delivered(self, *args):
+        self.signals_delivered += 1
+
+    def fps(self):
+        """最近FPS_WINDOW秒内完成的帧数换算的帧率"""
+        since = time.perf_counter() - FPS_WINDOW
+        return sum(1 for moment in self.frame_times if moment >= since) / FPS_WINDOW
+
+    def metrics(self):
+        """通用指标，耗时单位为毫秒，没有数据的项为None"""
+        def ms(value):
+            return None if value is None else round(value * 1000, 3)
+        return {
+            "fps": self.fps(),
+            "paint_p50": ms(percentile(self.paint_times, 0.5)),
+            "paint_p99": ms(percentile(self.paint_times, 0.99)),
+            "tick": ms(percentile(self.tick_times, 0.5)),
+            "queued_signals": max(0, self.signals_emitted - self.signals_delivered),
+        }
+
+
+def format_metrics(metrics):
+    """把perf_metrics()的结果格式化为浮层显示的多行文本"""
+    def value(key, unit=""):
+        number = metrics.get(key)
+        return "-" if number is None else f"{number:.1f}{unit}"
+    memory = process_memory()
+    rows = [
+        ("fps", value("fps")),
+        ("paint", f"p50 {value('paint_p50', 'ms')}  p99 {value('paint_p99', 'ms')}"),
+        ("tick", value("tick", "ms")),
+        ("queue", metrics.get("queued_signals", 0)),
+    ]
+    quality = metrics.get("quality")
+    if quality is not None:
+        rows.append(("quality", f"{quality['name']} ({quality['reason']})"))
+    rows += list(metrics.get("objects", {}).items())
+    rows.append(("rss", f"{memory / 1048576:.1f}MB" if memory else "-"))
+    return "\n".join([metrics["name"]] + [f"{label:<8}{text}" for label, text in rows])
+
+
+class PerfOverlay(QLabel):
+    """显示在窗口右上角的性能浮层，只在自身可见时刷新"""
+
+    def __init__(self, window):
+        super().__init__(window)
+        self.setObjectName("perfOverlay")
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.timer = frame_clock().subscribe(self, self.refresh, HUD_INTERVAL)
+        self.refresh()
+        self.show()
+        self.raise_()
+
+    def refresh(self):
+        """读取窗口的指标并更新显示"""
+        self.setText(format_metrics(self.parent().perf_metrics()))
+        self.adjustSize()
+        self.move(self.parent().width() - self.width() - HUD_MARGIN, HUD_MARGIN + 32)
+
+    def showEvent(self, event):
+        self.timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
+
+
+class PerfHud:
+    """性能浮层管理：在所有打开的窗口上显示或移除浮层，并导出所有窗口的指标"""
+
+    def __init__(self):
+        self.enabled = False
+        # 浮层是所在窗口的子控件，窗口销毁后随之销毁，这里不持有窗口本身
+        self.overlays = []
+
+    def toggle(self, windows):
+        """切换浮层，返回切换后的状态"""
+        self.enabled = not self.enabled
+        if self.enabled:
+            for window in windows:
+                self.attach(window)
+        else:
+            for overlay in self.overlays:
+                if not sip.isdeleted(overlay):
+                    overlay.timer.stop()
+                    overlay.deleteLater()
+            self.overlays.clear()
+        return self.enabled
+
+    def attach(self, window):
+        """浮层开启时为窗口添加浮层，已有浮层的窗口不重复添加"""
+        if not self.enabled or window.findChild(PerfOverlay) is not None:
+            return
+        self.overlays = [overlay for overlay in self.overlays if not sip.isdeleted(overlay)]
+        self.overlays.append(PerfOverlay(window))
+
+    def snapshot(self, windows):
+        """所有窗口的指标和进程内存"""
+        return {
+            "time": time.time(),
+            "rss": process_memory(),
+            "clock": frame_clock().stats(),
+            "windows": [window.perf_metrics() for window in windows],
+        }
+
+    def export(self, windows):
+        """以一行JSON导出指标"""
+        return json.dumps(self.snapshot(windows), ensure_ascii=False)
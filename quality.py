@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+# 质量级别，由高到低逐级累加降级措施
+QUALITY_FULL = 0          # 完整质量
+QUALITY_NO_ANTIALIAS = 1  # 关闭抗锯齿
+QUALITY_LOW_DENSITY = 2   # 降低字符/粒子密度
+QUALITY_NO_TRAILS = 3     # 不绘制拖尾
+QUALITY_LOW_RATE = 4      # 降低刷新率
+
+QUALITY_NAMES = {
+    QUALITY_FULL: "完整质量",
+    QUALITY_NO_ANTIALIAS: "关闭抗锯齿",
+    QUALITY_LOW_DENSITY: "降低密度",
+    QUALITY_NO_TRAILS: "关闭拖尾",
+    QUALITY_LOW_RATE: "降低刷新率",
+}
+
+# 绘制耗时滑动平均的平滑系数
+PAINT_SMOOTHING = 0.1
+
+# 平均耗时连续超出预算多少帧后降一级
+DOWNGRADE_FRAMES = 15
+
+# 平均耗时连续低于预算的HEADROOM比例多少帧后升一级，比降级慢以免来回切换
+UPGRADE_FRAMES = 90
+HEADROOM = 0.5
+
+# 降低密度和刷新率时使用的比例
+LOW_DENSITY = 0.5
+LOW_RATE = 0.5
+
+
+class QualityGovernor(QObject):
+    """画质调节器：根据帧节奏控制器测得的绘制耗时逐级降低或恢复画质"""
+
+    # 画质级别改变信号(级别, 原因)
+    level_changed = pyqtSignal(int, str)
+
+    def __init__(self, pacer, smoothing=PAINT_SMOOTHING,
+                 downgrade_frames=DOWNGRADE_FRAMES, upgrade_frames=UPGRADE_FRAMES):
+        super().__init__(pacer)
+        self.pacer = pacer
+        self.smoothing = smoothing
+        self.downgrade_frames = downgrade_frames
+        self.upgrade_frames = upgrade_frames
+
+        self.level = QUALITY_FULL
+        self.reason = "初始状态"
+        self.average = 0.0
+        self.budget = pacer.frame_budget()
+        self.samples = 0
+        self.over_frames = 0
+        self.under_frames = 0
+
+        # 每帧绘制结束时由帧节奏控制器调用record
+        pacer.governor = self
+
+    @property
+    def antialiasing(self):
+        """是否开启抗锯齿"""
+        return self.level < QUALITY_NO_ANTIALIAS
+
+    @property
+    def density(self):
+        """字符/粒子密度比例"""
+        return LOW_DENSITY if self.level >= QUALITY_LOW_DENSITY else 1.0
+
+    @property
+    def trails(self):
+        """是否绘制拖尾"""
+        return self.level < QUALITY_NO_TRAILS
+
+    @property
+    def rate_scale(self):
+        """刷新率比例"""
+        return LOW_RATE if self.level >= QUALITY_LOW_RATE else 1.0
+
+    def record(self, paint_time, budget):
+        """记录一帧的绘制耗时(秒)和预算(秒)，必要时调整画质级别"""
+        if self.samples == 0:
+            self.average = paint_time
+        else:
+            self.average += self.smoothing * (paint_time - self.average)
+        self.samples += 1
+        self.budget = budget
+
+        if self.average > budget:
+            self.under_frames = 0
+            self.over_frames += 1
+            if self.over_frames >= self.downgrade_frames and self.level < QUALITY_LOW_RATE:
+                self.set_level(self.level + 1,
+                               f"平均绘制耗时 {self.average * 1000:.1f}ms 超出预算 {budget * 1000:.1f}ms")
+        elif self.average < budget * HEADROOM:
+            self.over_frames = 0
+            self.under_frames += 1
+            if self.under_frames >= self.upgrade_frames and self.level > QUALITY_FULL:
+                self.set_level(self.level - 1,
+                               f"平均绘制耗时 {self.average * 1000:.1f}ms 低于预算 {budget * 1000:.1f}ms")
+        else:
+            self.over_frames = 0
+            self.under_frames = 0
+
+    def set_level(self, level, reason="手动设置"):
+        """设置画质级别"""
+        level = max(QUALITY_FULL, min(QUALITY_LOW_RATE, level))
+        if level == self.level:
+            return
+        self.level = level
+        self.reason = reason
+        self.over_frames = 0
+        self.under_frames = 0
+        self.pacer.set_rate_scale(self.rate_scale)
+        self.level_changed.emit(level, reason)
+
+    def status(self):
+        """返回当前画质状态，供监控使用"""
+        return {
+            "level": self.level,
+            "name": QUALITY_NAMES[self.level],
+            "reason": self.reason,
+            "paint_ms": round(self.average * 1000, 2),
+            "budget_ms": round(self.budget * 1000, 2),
+        }
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+# 字符集，用于代码雨的显示
+CHARSET = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789!@#$%^&*()-=_+[]{}|;:'\",.<>/?"
+
+# 雨滴参数
+MIN_DROP_LENGTH = 5     # 雨滴最短长度
+MAX_DROP_LENGTH = 20    # 雨滴最长长度
+RAIN_TICK = 0.05        # 模拟的基准时间步长(秒)，以下速度和几率均以此为单位
+MIN_DROP_SPEED = 0.3    # 每个基准步长下落的最小行数
+MAX_DROP_SPEED = 1.0    # 每个基准步长下落的最大行数
+SPAWN_CHANCE = 0.02     # 空闲列每个基准步长产生新雨滴的几率
+MUTATE_CHANCE = 0.1     # 雨滴每个基准步长随机改变一个字符的几率
+
+
+class RainEngine:
+    """代码雨模拟核心，所有雨滴状态以NumPy数组按列存储，每次更新都是整体的向量化运算"""
+    
+    def __init__(self, columns, rows, charset=CHARSET, seed=None):
+        self.rng = np.random.default_rng(seed)
+        self.charset = charset
+        self.columns = 0
+        # 雨滴产生几率的比例，降低画质时减少同时存在的雨滴
+        self.density = 1.0
+        self.rows = rows
+        
+        # 雨滴头部所在行，-1表示该列当前没有雨滴
+        self.heads = np.empty(0, dtype=np.float32)
+        # 雨滴下落速度(行/次)
+        self.speeds = np.empty(0, dtype=np.float32)
+        # 雨滴长度
+        self.lengths = np.empty(0, dtype=np.int16)
+        # 字符索引网格，glyphs[列, j] 为距离头部第j个字符在字符集中的索引
+        self.glyphs = np.zeros((0, MAX_DROP_LENGTH), dtype=np.min_scalar_type(len(charset)))
+        
+        # 亮度表，brightness_table[长度, j]：头部最亮，尾部逐渐变暗
+        lengths = np.arange(MAX_DROP_LENGTH + 1)[:, None]
+        offsets = np.arange(MAX_DROP_LENGTH)[None, :]
+        table = 255 - offsets * 255 // np.maximum(lengths, 1)
+        table[:, 0] = 255
+        self.brightness_table = np.clip(table, 0, 255).astype(np.uint8)
+        
+        self.resize(columns, rows)
+        self.dirty_columns = np.empty(0, dtype=np.intp)
+        self.dirty_tops = np.empty(0, dtype=np.float32)
+        self.dirty_bottoms = np.empty(0, dtype=np.float32)
+        
+        # 初始化一些雨滴，每3列一个
+        cols = np.arange(0, self.columns, 3)
+        self.heads[cols] = self.rng.integers(0, rows // 2 + 1, cols.size)
+        self.generateGlyphs(cols)
+    
+    def resize(self, columns, rows):
+        """调整列数和行数，新增的列没有雨滴"""
+        self.rows = rows
+        old_columns = self.columns
+        if columns > old_columns:
+            added = columns - old_columns
+            self.heads = np.concatenate([self.heads, np.full(added, -1, dtype=np.float32)])
+            self.speeds = np.concatenate([
+                self.speeds,
+                self.rng.uniform(MIN_DROP_SPEED, MAX_DROP_SPEED, added).astype(np.float32)
+            ])
+            self.lengths = np.concatenate([
+                self.lengths,
+                self.rng.integers(MIN_DROP_LENGTH, MAX_DROP_LENGTH + 1, added).astype(np.int16)
+            ])
+            self.glyphs = np.concatenate([
+                self.glyphs,
+                np.zeros((added, MAX_DROP_LENGTH), dtype=self.glyphs.dtype)
+            ])
+        else:
+            self.heads = self.heads[:columns]
+            self.speeds = self.speeds[:columns]
+            self.lengths = self.lengths[:columns]
+            self.glyphs = self.glyphs[:columns]
+        self.columns = columns
+    
+    def setCharset(self, charset):
+        """更换字符集，超出新字符集范围的字符索引重新生成"""
+        self.charset = charset
+        dtype = np.min_scalar_type(len(charset))
+        self.glyphs = (self.glyphs.astype(np.intp) % len(charset)).astype(dtype)
+    
+    def generateGlyphs(self, cols):
+        """为指定列的雨滴重新生成随机字符"""
+        self.glyphs[cols] = self.rng.integers(0, len(self.charset), (len(cols), MAX_DROP_LENGTH))
+    
+    def step(self, ticks=1.0):
+        """推进ticks个基准步长：产生、下落、移除雨滴并随机改变字符"""
+        previous = self.heads.copy()
+        
+        # 空闲列随机产生新雨滴
+        spawn_chance = 1 - (1 - SPAWN_CHANCE * self.density) ** ticks
+        spawn = (self.heads < 0) & (self.rng.random(self.columns) < spawn_chance)
+        spawned = np.flatnonzero(spawn)
+        if spawned.size:
+            self.heads[spawned] = 0
+            self.generateGlyphs(spawned)
+        
+        # 所有现有雨滴下落
+        active = self.heads >= 0
+        self.heads[active] += self.speeds[active] * ticks
+        
+        # 超出屏幕底部的雨滴移除
+        expired = active & (self.heads - self.lengths > self.rows)
+        self.heads[expired] = -1
+        
+        # 随机改变一些字符
+        mutate_chance = 1 - (1 - MUTATE_CHANCE) ** ticks
+        mutated = np.flatnonzero(active & (self.rng.random(self.columns) < mutate_chance))
+        if mutated.size:
+            pos = (self.rng.random(mutated.size) * self.lengths[mutated]).astype(np.intp)
+            self.glyphs[mutated, pos] = self.rng.integers(0, len(self.charset), mutated.size)
+        
+        # 记录本次更新中发生变化的列及其行范围[top, bottom]，供局部重绘使用
+        self.dirty_columns = np.flatnonzero(active)
+        start = np.maximum(previous[self.dirty_columns], 0)
+        end = np.where(expired, previous, self.heads)[self.dirty_columns]
+        self.dirty_tops = start - self.lengths[self.dirty_columns] + 1
+        self.dirty_bottoms = end
+    
+    def dirtySpans(self):
+        """返回上一次更新中变化的(列, 起始行, 结束行)数组"""
+        return self.dirty_columns, self.dirty_tops, self.dirty_bottoms
+    
+    def visibleCells(self, max_row):
+        """返回可见字符的(列, 行位置, 字符索引, 亮度)数组，行位置在[0, max_row)之间"""
+        cols = np.flatnonzero(self.heads >= 0)
+        offsets = np.arange(MAX_DROP_LENGTH)
+        positions = self.heads[cols, None] - offsets[None, :]
+        mask = ((offsets[None, :] < self.lengths[cols, None])
+                & (positions >= 0) & (positions < max_row))
+        col_idx, offset_idx = np.nonzero(mask)
+        cols = cols[col_idx]
+        return (cols,
+                positions[col_idx, offset_idx],
+                self.glyphs[cols, offset_idx],
+                self.brightness_table[self.lengths[cols], offset_idx])
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from array import array
+from PyQt5.QtCore import Qt, QAbstractItemModel, QModelIndex
+from PyQt5.QtGui import QBrush, QColor
+
+from scan_targets import format_address
+from theme import TEXT_COLOR, WARNING_COLOR, HIGHLIGHT_COLOR
+
+# 严重程度代码
+SEVERITY_INFO = 0
+SEVERITY_WARNING = 1
+SEVERITY_CRITICAL = 2
+SEVERITY_TEXTS = ("信息", "警告", "严重")
+SEVERITY_COLORS = (TEXT_COLOR, WARNING_COLOR, HIGHLIGHT_COLOR)
+
+# 端口没有漏洞时的漏洞编号
+NO_VULNERABILITY = 255
+
+# 列标题
+RESULT_HEADERS = ("目标", "端口/服务", "状态", "详情")
+
+# 主机行的internalId，端口行的internalId为所属主机行号+1
+HOST_ROW = 0
+
+
+class ScanResultModel(QAbstractItemModel):
+    """扫描结果模型：主机为顶层行，端口为主机的子行
+
+    结果按列保存在紧凑数组中，每个端口只占用几个字节，
+    显示文本和颜色在视图请求时才生成，视图只会请求可见的行。
+    另有IP到主机行号的索引，再次发现的主机和端口更新原来的行，不重复添加。
+    批量结果的格式见 ScannerThread.results_ready。
+    """
+
+    def __init__(self, services, vulnerabilities, parent=None):
+        super().__init__(parent)
+        self.services = services  # 端口 -> 服务名
+        self.vulnerabilities = vulnerabilities
+        self.brushes = [QBrush(QColor(color)) for color in SEVERITY_COLORS]
+        self.reset_storage()
+
+    def reset_storage(self):
+        """清空所有列"""
+        # 主机列
+        self.host_ips = array("I")
+        self.host_latency = array("H")  # 毫秒
+        self.host_severity = array("B")
+        self.host_ports = []            # 每个主机的端口在端口列中的位置
+        self.host_rows = {}             # IP -> 主机行号
+        # 端口列
+        self.port_numbers = array("H")
+        self.port_severity = array("B")
+        self.port_details = array("B")  # 漏洞编号
+
+    def clear(self):
+        """清空结果"""
+        self.beginResetModel()
+        self.reset_storage()
+        self.endResetModel()
+
+    def row_count(self):
+        """主机和端口的总行数"""
+        return len(self.host_ips) + len(self.port_numbers)
+
+    def find_host(self, ip):
+        """按整数IP查找主机行号，找不到时返回None"""
+        return self.host_rows.get(ip)
+
+    def append_results(self, results):
+        """追加一批结果，返回新增主机的行号范围"""
+        # 先处理本批的主机，再按主机分组插入端口，每个父行只通知一次
+        first = len(self.host_ips)
+        updated_hosts = []  # 再次发现的主机行号
+        hosts = []
+        for result in results:
+            if result[0] != "host":
+                continue
+            _, ip, latency, severity = result
+            row = self.find_host(ip)
+            if row is None:
+                self.host_rows[ip] = first + len(hosts)
+                hosts.append(result)
+            elif row >= first:
+                hosts[row - first] = result  # 同一批中重复出现
+            else:
+                self.host_latency[row] = min(latency, 0xFFFF)
+                self.host_severity[row] = severity
+                updated_hosts.append(row)
+        if hosts:
+            self.beginInsertRows(QModelIndex(), first, first + len(hosts) - 1)
+            for _, ip, latency, severity in hosts:
+                self.host_ips.append(ip)
+                self.host_latency.append(min(latency, 0xFFFF))
+                self.host_severity.append(severity)
+                self.host_ports.append(array("I"))
+            self.endInsertRows()
+
+        added = {}    # 主机行号 -> 新端口的位置
+        updated = {}  # 主机行号 -> 再次发现的端口的子行号
+        known = {}    # 主机行号 -> {端口: 子行号}，只为本批涉及的主机建立
+        last_ip = last_row = None
+        for result in results:
+            if result[0] != "port":
+                continue
+            _, ip, port, severity, detail = result
+            # 同一主机的端口通常连续到达
+            if ip != last_ip:
+                last_ip, last_row = ip, self.find_host(ip)
+            if last_row is None:
+                continue
+            children = self.host_ports[last_row]
+            ports = known.get(last_row)
+            if ports is None:
+                ports = known[last_row] = {self.port_numbers[position]: child
+                                           for child, position in enumerate(children)}
+            new = added.setdefault(last_row, [])
+            child = ports.get(port)
+            if child is None:
+                ports[port] = len(children) + len(new)
+                new.append(len(self.port_numbers))
+                self.port_numbers.append(port)
+                self.port_severity.append(severity)
+                self.port_details.append(detail)
+                continue
+            # 再次发现的端口原地更新，已显示的行需要通知视图
+            if child < len(children):
+                position = children[child]
+                updated.setdefault(last_row, []).append(child)
+            else:
+                position = new[child - len(children)]
+            self.port_severity[position] = severity
+            self.port_details[position] = detail
+
+        for row, ports in added.items():
+            if not ports:
+                continue
+            children = self.host_ports[row]
+            self.beginInsertRows(self.index(row, 0), len(children), len(children) + len(ports) - 1)
+            children.extend(ports)
+            self.endInsertRows()
+
+        if updated_hosts:
+            self.rows_changed(QModelIndex(), updated_hosts)
+        for row, children in updated.items():
+            self.rows_changed(self.index(row, 0), children)
+        return range(first, len(self.host_ips))
+
+    def rows_changed(self, parent, rows):
+        """为原地更新的行发出一次覆盖所有这些行的dataChanged"""
+        last_column = len(RESULT_HEADERS) - 1
+        self.dataChanged.emit(self.index(min(rows), 0, parent), self.index(max(rows), last_column, parent))
+
+    def index(self, row, column, parent=QModelIndex()):
+        # 视图布局时会对每一行调用，直接检查范围，不经过hasIndex()再调用rowCount()
+        if row < 0 or not 0 <= column < len(RESULT_HEADERS):
+            return QModelIndex()
+        if not parent.isValid():
+            if row >= len(self.host_ips):
+                return QModelIndex()
+            return self.createIndex(row, column, HOST_ROW)
+        if parent.internalId() != HOST_ROW or row >= len(self.host_ports[parent.row()]):
+            return QModelIndex()
+        return self.createIndex(row, column, parent.row() + 1)
+
+    def parent(self, index):
+        if not index.isValid() or index.internalId() == HOST_ROW:
+            return QModelIndex()
+        return self.createIndex(index.internalId() - 1, 0, HOST_ROW)
+
+    def rowCount(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return len(self.host_ips)
+        if parent.internalId() == HOST_ROW and parent.column() == 0:
+            return len(self.host_ports[parent.row()])
+        return 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(RESULT_HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return RESULT_HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.ForegroundRole):
+            return None
+        column = index.column()
+        if index.internalId() == HOST_ROW:
+            row = index.row()
+            severity = self.host_severity[row]
+            if role == Qt.ForegroundRole:
+                return self.brushes[severity]
+            if column == 0:
+                return format_address(self.host_ips[row])
+            if column == 2:
+                return SEVERITY_TEXTS[severity]
+            if column == 3:
+                return f"Host is up ({self.host_latency[row]}ms latency)"
+            return ""
+
+        position = self.host_ports[index.internalId() - 1][index.row()]
+        severity = self.port_severity[position]
+        if role == Qt.ForegroundRole:
+            return self.brushes[severity]
+        if column == 1:
+            port = self.port_numbers[position]
+            return f"{port}/{self.services.get(port, 'Unknown')}"
+        if column == 2:
+            return SEVERITY_TEXTS[severity]
+        if column == 3:
+            detail = self.port_details[position]
+            if detail == NO_VULNERABILITY:
+                return "Open Port"
+            if severity == SEVERITY_CRITICAL:
+                return f"Critical: {self.vulnerabilities[detail]}"
+            return self.vulnerabilities[detail]
+        return ""
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import re
+import bisect
+import ipaddress
+
+# 目标之间的分隔符：逗号或空白
+TARGET_SEPARATOR = re.compile(r"[,\s]+")
+
+# 排除目标的前缀
+EXCLUDE_PREFIX = "!"
+
+
+def format_address(value):
+    """把整数地址格式化为点分十进制"""
+    return f"{value >> 24}.{value >> 16 & 255}.{value >> 8 & 255}.{value & 255}"
+
+
+def parse_address(text):
+    """解析一个完整的IPv4地址为整数"""
+    return int(ipaddress.IPv4Address(text.strip()))
+
+
+def network_hosts(network, hosts_only=True):
+    """网段的地址区间，hosts_only时/31和/32以外不包括网络地址和广播地址"""
+    first, last = int(network.network_address), int(network.broadcast_address)
+    if hosts_only and network.prefixlen <= 30:
+        first, last = first + 1, last - 1
+    return first, last
+
+
+def parse_item(item, hosts_only=True):
+    """解析单个目标为整数区间(first, last)，hosts_only为False时网段包括网络地址和广播地址
+
+    支持的格式：
+      192.168.1.0/24          CIDR网段
+      10.0.0.1-10.0.3.255     地址范围
+      10.0.0.1-50             只写末段的地址范围
+      192.168.1.5             单个地址
+      192.168.1 / 10.1 / 10   部分地址，表示对应的/24、/16、/8网段
+    """
+    try:
+        if "/" in item:
+            return network_hosts(ipaddress.IPv4Network(item, strict=False), hosts_only)
+        if "-" in item:
+            start, end = item.split("-", 1)
+            first = parse_address(start)
+            if "." in end:
+                last = parse_address(end)
+            else:
+                last = parse_address(".".join(start.split(".")[:3] + [end]))
+            if first > last:
+                raise ValueError(item)
+            return first, last
+        parts = item.split(".")
+        if len(parts) == 4:
+            value = parse_address(item)
+            return value, value
+        if 1 <= len(parts) < 4:
+            network = ".".join(parts + ["0"] * (4 - len(parts))) + f"/{8 * len(parts)}"
+            return network_hosts(ipaddress.IPv4Network(network), hosts_only)
+    except ValueError:
+        pass
+    raise ValueError(f"无效的目标: {item}")
+
+
+def merge_intervals(intervals):
+    """排序并合并重叠或相邻的区间"""
+    merged = []
+    for first, last in sorted(intervals):
+        if merged and first <= merged[-1][1] + 1:
+            if last > merged[-1][1]:
+                merged[-1] = (merged[-1][0], last)
+        else:
+            merged.append((first, last))
+    return merged
+
+
+def subtract_intervals(intervals, excluded):
+    """从已合并的区间中去掉已合并的排除区间"""
+    result = []
+    index = 0
+    for first, last in intervals:
+        # 跳过完全在当前区间之前的排除区间
+        while index < len(excluded) and excluded[index][1] < first:
+            index += 1
+        cursor = first
+        scan = index
+        while scan < len(excluded) and excluded[scan][0] <= last:
+            start, end = excluded[scan]
+            if start > cursor:
+                result.append((cursor, start - 1))
+            cursor = max(cursor, end + 1)
+            scan += 1
+        if cursor <= last:
+            result.append((cursor, last))
+    return result
+
+
+class TargetSet:
+    """扫描目标集合：保存合并后的整数区间，遍历时逐个生成地址，内存占用与范围大小无关"""
+
+    def __init__(self, intervals):
+        self.intervals = intervals  # 有序、互不重叠的闭区间
+        self.starts = [first for first, _ in intervals]
+        self.count = sum(last - first + 1 for first, last in intervals)
+
+    def __len__(self):
+        return self.count
+
+    def addresses(self):
+        """按顺序生成整数地址"""
+        for first, last in self.intervals:
+            yield from range(first, last + 1)
+
+    def __iter__(self):
+        """按顺序生成点分十进制地址"""
+        return map(format_address, self.addresses())
+
+    def __contains__(self, address):
+        value = parse_address(address) if isinstance(address, str) else address
+        index = bisect.bisect_right(self.starts, value) - 1
+        return index >= 0 and value <= self.intervals[index][1]
+
+
+def parse_targets(spec):
+    """解析目标描述，如 "10.0.0.0/16, 10.1.0.1-10.1.0.50, !10.0.5.0/24"，无效时抛出ValueError"""
+    included, excluded = [], []
+    for item in TARGET_SEPARATOR.split(spec.strip()):
+        if not item:
+            continue
+        if item.startswith(EXCLUDE_PREFIX):
+            # 排除网段时整个网段都不扫描
+            excluded.append(parse_item(item[len(EXCLUDE_PREFIX):], hosts_only=False))
+        else:
+            included.append(parse_item(item))
+    if not included:
+        raise ValueError("未指定扫描目标")
+    targets = TargetSet(subtract_intervals(merge_intervals(included), merge_intervals(excluded)))
+    if not targets:
+        raise ValueError("排除后没有剩余的扫描目标")
+    return targets
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+class LineBuffer:
+    """固定容量的环形行缓冲区，超出容量时丢弃最早的行，按下标访问为O(1)"""
+
+    def __init__(self, capacity):
+        self.capacity = max(1, capacity)
+        self.items = [None] * self.capacity
+        self.start = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def _slot(self, index):
+        """把逻辑下标转换为存储位置"""
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("行下标超出范围")
+        return (self.start + index) % self.capacity
+
+    def __getitem__(self, index):
+        return self.items[self._slot(index)]
+
+    def __setitem__(self, index, item):
+        self.items[self._slot(index)] = item
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self.items[(self.start + index) % self.capacity]
+
+    def append(self, item):
+        """追加一行，返回因超出容量而丢弃的行数"""
+        if self.count < self.capacity:
+            self.items[(self.start + self.count) % self.capacity] = item
+            self.count += 1
+            return 0
+        self.items[self.start] = item
+        self.start = (self.start + 1) % self.capacity
+        return 1
+
+    def pop(self):
+        """移除并返回最后一行"""
+        slot = self._slot(-1)
+        item = self.items[slot]
+        self.items[slot] = None
+        self.count -= 1
+        return item
+
+    def clear(self):
+        """清空所有行"""
+        self.items = [None] * self.capacity
+        self.start = 0
+        self.count = 0
+
+
+def wrap_line(text, max_width, char_width):
+    """按像素宽度把一行文本折成多行，char_width(ch)返回单个字符的宽度"""
+    if not text:
+        return [""]
+    rows = []
+    row_start = 0
+    width = 0
+    for index, ch in enumerate(text):
+        advance = char_width(ch)
+        if width + advance > max_width and index > row_start:
+            rows.append(text[row_start:index])
+            row_start = index
+            width = 0
+        width += advance
+    rows.append(text[row_start:])
+    return rows
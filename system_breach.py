@@ -9,15 +9,18 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
 from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QThread, QSize, QPropertyAnimation, QRect
 from PyQt5.QtGui import QFont, QColor, QPalette, QIcon, QBrush, QTextCharFormat, QTextCursor
 
-# 样式常量
-BG_COLOR = "#000000"
-TEXT_COLOR = "#00FF00"
-ACCENT_COLOR = "#00FFAA"
-HIGHLIGHT_COLOR = "#FF0000"
-ERROR_COLOR = "#FF3333"
-SUCCESS_COLOR = "#33FF33"
-DEFAULT_FONT = "Consolas"
-DEFAULT_FONT_SIZE = 14  # 增大默认字体大小
+from frame_clock import frame_clock
+from pacing import FramePacer
+from theme import (ensure_theme, set_style_state, TEXT_COLOR, ERROR_COLOR, SUCCESS_COLOR,
+                   DEFAULT_FONT, DEFAULT_FONT_SIZE)
+from visibility import VisibilityWatcher
+
+# 数据查看器随机刷新一段数据的平均间隔(秒)
+HEX_UPDATE_INTERVAL = 0.5
+
+# 状态指示器闪烁和时钟的刷新间隔(ms)
+BLINK_INTERVAL = 500
+CLOCK_INTERVAL = 1000
 
 # 系统名称列表，用于预设目标选择
 TARGET_SYSTEMS = [
@@ -181,38 +184,39 @@ class BreachThread(QThread):
 class HexViewer(QTextEdit):
     """十六进制查看器控件，显示模拟的内存/数据转储"""
     
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, target_fps=1 / HEX_UPDATE_INTERVAL):
         super().__init__(parent)
         self.initUI()
         self.active = False
-        self.update_timer = QTimer(self)
-        self.update_timer.timeout.connect(self.updateRandomSection)
+        
+        # 按经过的时间决定刷新次数，文本修改会自行触发重绘
+        self.pending_updates = 0.0
+        self.pacer = FramePacer(self, self.advance, None, target_fps)
     
     def initUI(self):
         """初始化界面"""
         self.setReadOnly(True)
         self.setFont(QFont(DEFAULT_FONT, 12))  # 增大字体
-        self.setStyleSheet(f"""
-            QTextEdit {{
-                background-color: {BG_COLOR};
-                color: {TEXT_COLOR};
-                border: 1px solid {TEXT_COLOR};
-                selection-background-color: {ACCENT_COLOR};
-                selection-color: {BG_COLOR};
-            }}
-        """)
         self.setText("数据查看器将在入侵开始后显示目标系统数据")
     
     def start(self):
         """开始显示和更新数据"""
         self.active = True
         self.updateData()
-        self.update_timer.start(500)  # 每500ms更新一次
+        self.pending_updates = 0.0
+        self.pacer.start()
     
     def stop(self):
         """停止数据更新"""
         self.active = False
-        self.update_timer.stop()
+        self.pacer.stop()
+    
+    def advance(self, dt):
+        """按经过的时间执行相应次数的随机刷新"""
+        self.pending_updates += dt / HEX_UPDATE_INTERVAL
+        while self.pending_updates >= 1:
+            self.pending_updates -= 1
+            self.updateRandomSection()
     
     def updateData(self):
         """更新显示数据"""
@@ -303,20 +307,24 @@ class SystemBreachWindow(QWidget):
     
     def __init__(self, parent=None):
         super().__init__(parent, Qt.Window | Qt.FramelessWindowHint)
+        ensure_theme()
         self.initUI()
         self.breach_thread = None
         self.drag_position = None
         
-        # 开始闪烁计时器
-        self.blink_timer = QTimer(self)
-        self.blink_timer.timeout.connect(self.toggleBlink)
-        self.blink_timer.start(500)
+        # 状态指示器闪烁，只在入侵进行中运行
+        clock = frame_clock()
+        self.blink_timer = clock.subscribe(self, self.toggleBlink, BLINK_INTERVAL)
         self.blink_on = False
         
         # 更新时钟
-        self.clock_timer = QTimer(self)
-        self.clock_timer.timeout.connect(self.updateClock)
-        self.clock_timer.start(1000)
+        self.clock_timer = clock.subscribe(self, self.updateClock, CLOCK_INTERVAL)
+        self.clock_timer.start()
+        
+        # 隐藏、最小化或被遮挡时暂停数据查看器、闪烁和时钟
+        self.visibility = VisibilityWatcher(self)
+        self.visibility.visibility_changed.connect(self.set_animating)
+        self.set_animating(self.visibility.visible)
         
         # 设置窗口位置在左下角
         self.positionWindow()
@@ -327,83 +335,6 @@ class SystemBreachWindow(QWidget):
         self.resize(1000, 700)
         self.setWindowTitle("System Breach")
         
-        # 设置窗口样式
-        self.setStyleSheet(f"""
-            QWidget {{
-                background-color: {BG_COLOR};
-                color: {TEXT_COLOR};
-                font-family: {DEFAULT_FONT};
-                border: 1px solid {TEXT_COLOR};
-            }}
-            QLabel {{
-                border: none;
-                font-size: {DEFAULT_FONT_SIZE}px;
-            }}
-            QProgressBar {{
-                border: 1px solid {TEXT_COLOR};
-                border-radius: 0px;
-                text-align: center;
-                background-color: {BG_COLOR};
-                font-size: {DEFAULT_FONT_SIZE}px;
-                min-height: 25px;
-            }}
-            QProgressBar::chunk {{
-                background-color: {TEXT_COLOR};
-            }}
-            QPushButton {{
-                background-color: {BG_COLOR};
-                color: {TEXT_COLOR};
-                border: 1px solid {TEXT_COLOR};
-                padding: 5px;
-                min-height: 30px;
-                font-size: {DEFAULT_FONT_SIZE}px;
-            }}
-            QPushButton:hover {{
-                background-color: rgba(0, 255, 170, 30%);
-                color: white;
-            }}
-            QPushButton:pressed {{
-                background-color: rgba(0, 255, 170, 50%);
-            }}
-            QTextEdit {{
-                background-color: {BG_COLOR};
-                color: {TEXT_COLOR};
-                border: 1px solid {TEXT_COLOR};
-                font-family: {DEFAULT_FONT};
-                font-size: {DEFAULT_FONT_SIZE}px;
-            }}
-            QComboBox {{
-                background-color: {BG_COLOR};
-                color: {TEXT_COLOR};
-                border: 1px solid {TEXT_COLOR};
-                padding: 5px;
-                min-height: 30px;
-                font-size: {DEFAULT_FONT_SIZE}px;
-            }}
-            QComboBox::drop-down {{
-                border: none;
-                width: 20px;
-            }}
-            QComboBox::down-arrow {{
-                image: none;
-                width: 0px;
-            }}
-            QComboBox QAbstractItemView {{
-                background-color: {BG_COLOR};
-                color: {TEXT_COLOR};
-                selection-background-color: {ACCENT_COLOR};
-                selection-color: {BG_COLOR};
-            }}
-            QLineEdit {{
-                background-color: {BG_COLOR};
-                color: {TEXT_COLOR};
-                border: 1px solid {TEXT_COLOR};
-                padding: 5px;
-                min-height: 30px;
-                font-size: {DEFAULT_FONT_SIZE}px;
-            }}
-        """)
-        
         # 设置窗口半透明
         self.setWindowOpacity(0.95)
         
@@ -416,32 +347,21 @@ class SystemBreachWindow(QWidget):
         title_layout = QHBoxLayout()
         
         self.title_label = QLabel("SYSTEM BREACH MODULE v2.0")
-        self.title_label.setStyleSheet(f"color: {TEXT_COLOR}; font-weight: bold; font-size: 16px;")
+        self.title_label.setObjectName("titleLabel")
         title_layout.addWidget(self.title_label)
         
         title_layout.addStretch()
         
         # 时钟显示
         self.clock_label = QLabel("00:00:00")
-        self.clock_label.setStyleSheet(f"color: {TEXT_COLOR}; font-family: {DEFAULT_FONT}; font-size: 14px;")
+        self.clock_label.setObjectName("clockLabel")
         title_layout.addWidget(self.clock_label)
         
         title_layout.addSpacing(20)
         
         close_button = QPushButton("×")
         close_button.setFixedSize(30, 30)
-        close_button.setStyleSheet(f"""
-            QPushButton {{
-                background-color: transparent;
-                color: {TEXT_COLOR};
-                border: none;
-                font-size: 18px;
-                font-weight: bold;
-            }}
-            QPushButton:hover {{
-                color: {HIGHLIGHT_COLOR};
-            }}
-        """)
+        close_button.setObjectName("closeButton")
         close_button.clicked.connect(self.close)
         title_layout.addWidget(close_button)
         
@@ -451,7 +371,7 @@ class SystemBreachWindow(QWidget):
         separator = QFrame()
         separator.setFrameShape(QFrame.HLine)
         separator.setFrameShadow(QFrame.Sunken)
-        separator.setStyleSheet(f"background-color: {TEXT_COLOR};")
+        separator.setObjectName("separator")
         separator.setFixedHeight(1)
         main_layout.addWidget(separator)
         
@@ -459,7 +379,7 @@ class SystemBreachWindow(QWidget):
         target_layout = QHBoxLayout()
         
         target_label = QLabel("目标系统:")
-        target_label.setStyleSheet("border: none; font-weight: bold; font-size: 14px;")
+        target_label.setObjectName("sectionLabel")
         target_layout.addWidget(target_label)
         
         # 添加下拉菜单
@@ -475,7 +395,7 @@ class SystemBreachWindow(QWidget):
         
         # 状态指示器
         self.status_indicator = QLabel("● 待命")
-        self.status_indicator.setStyleSheet(f"color: {TEXT_COLOR}; border: none; font-size: 14px;")
+        self.status_indicator.setObjectName("statusIndicator")
         target_layout.addWidget(self.status_indicator)
         
         main_layout.addLayout(target_layout)
@@ -495,7 +415,7 @@ class SystemBreachWindow(QWidget):
         log_layout = QVBoxLayout()
         
         log_label = QLabel("操作日志")
-        log_label.setStyleSheet("border: none; font-weight: bold; font-size: 14px;")
+        log_label.setObjectName("sectionLabel")
         log_layout.addWidget(log_label)
         
         self.log_text = QTextEdit()
@@ -508,7 +428,7 @@ class SystemBreachWindow(QWidget):
         data_layout = QVBoxLayout()
         
         data_label = QLabel("数据查看器")
-        data_label.setStyleSheet("border: none; font-weight: bold; font-size: 14px;")
+        data_label.setObjectName("sectionLabel")
         data_layout.addWidget(data_label)
         
         self.hex_viewer = HexViewer()
@@ -544,6 +464,18 @@ class SystemBreachWindow(QWidget):
         desktop = QDesktopWidget().availableGeometry()
         self.move(20, desktop.height() - self.height() - 40)
     
+    def set_animating(self, visible):
+        """窗口可见性改变时暂停或恢复动画，重新可见时立即刷新时钟"""
+        self.hex_viewer.pacer.set_visible(visible)
+        if not visible:
+            self.blink_timer.stop()
+            self.clock_timer.stop()
+            return
+        self.updateClock()
+        self.clock_timer.start()
+        if self.breach_thread and self.breach_thread.isRunning():
+            self.blink_timer.start()
+    
     def updateClock(self):
         """更新时钟显示"""
         current_time = time.strftime("%H:%M:%S", time.localtime())
@@ -554,12 +486,13 @@ class SystemBreachWindow(QWidget):
         self.blink_on = not self.blink_on
         
         if self.breach_thread and self.breach_thread.isRunning():
-            if self.blink_on:
-                self.status_indicator.setStyleSheet(f"color: #FF0000; border: none; font-size: 14px;")
-                self.status_indicator.setText("● 正在入侵")
-            else:
-                self.status_indicator.setStyleSheet(f"color: transparent; border: none; font-size: 14px;")
-                self.status_indicator.setText("○ 正在入侵")
+            # 只切换符号，颜色由状态决定，闪烁时不需要重新应用样式
+            self.status_indicator.setText("● 正在入侵" if self.blink_on else "○ 正在入侵")
+    
+    def set_status(self, text, state):
+        """设置状态指示器的文字和状态(idle/running/success/failed)"""
+        set_style_state(self.status_indicator, "state", state)
+        self.status_indicator.setText(text)
     
     def toggle_breach(self):
         """切换入侵状态"""
@@ -567,8 +500,8 @@ class SystemBreachWindow(QWidget):
             # 停止入侵
             self.breach_thread.stop()
             self.breach_button.setText("开始入侵")
-            self.status_indicator.setStyleSheet(f"color: {TEXT_COLOR}; border: none; font-size: 14px;")
-            self.status_indicator.setText("● 已中止")
+            self.blink_timer.stop()
+            self.set_status("● 已中止", "idle")
             self.add_log("入侵操作已手动终止", "warning")
             self.hex_viewer.stop()
             self.target_combo.setEnabled(True)
@@ -587,7 +520,8 @@ class SystemBreachWindow(QWidget):
         # 禁用目标选择下拉框
         self.target_combo.setEnabled(False)
         
-        # 创建入侵线程
+        # 创建入侵线程，上一次入侵的线程随之释放
+        self.release_breach()
         self.breach_thread = BreachThread(target_system, self)
         
         # 连接信号
@@ -595,11 +529,15 @@ class SystemBreachWindow(QWidget):
         self.breach_thread.update_status.connect(self.add_log)
         self.breach_thread.breach_complete.connect(self.breach_completed)
         self.breach_thread.update_data_viewer.connect(self.start_data_viewer)
+        self.hex_viewer.pacer.probe.watch_signals(
+            self.breach_thread.update_progress, self.breach_thread.update_status,
+            self.breach_thread.breach_complete, self.breach_thread.update_data_viewer)
         
         # 更新UI
         self.breach_button.setText("终止入侵")
-        self.status_indicator.setStyleSheet(f"color: #FF0000; border: none; font-size: 14px;")
-        self.status_indicator.setText("● 正在入侵")
+        self.set_status("● 正在入侵", "running")
+        self.blink_on = True
+        self.blink_timer.start()
         self.progress_bar.setValue(0)
         
         # 初始化日志
@@ -611,6 +549,11 @@ class SystemBreachWindow(QWidget):
         # 启动线程
         self.breach_thread.start()
     
+    def perf_metrics(self):
+        """性能浮层和指标导出读取的数据，帧率和模拟耗时来自数据查看器"""
+        return {"name": "system_breach", **self.hex_viewer.pacer.probe.metrics(),
+                "objects": {"log": self.log_text.document().blockCount()}}
+    
     def start_data_viewer(self):
         """启动数据查看器"""
         self.hex_viewer.start()
@@ -652,9 +595,9 @@ class SystemBreachWindow(QWidget):
     
     def breach_completed(self, success):
         """入侵完成处理"""
+        self.blink_timer.stop()
         if success:
-            self.status_indicator.setStyleSheet(f"color: {SUCCESS_COLOR}; border: none; font-size: 14px;")
-            self.status_indicator.setText("● 入侵成功")
+            self.set_status("● 入侵成功", "success")
             self.add_log("入侵操作已成功完成", "success")
             
             # 显示额外的成功信息
@@ -697,8 +640,7 @@ class SystemBreachWindow(QWidget):
                 for _ in range(3):
                     self.add_log(f"发现文件: {random.choice(file_paths)}", "success")
         else:
-            self.status_indicator.setStyleSheet(f"color: {ERROR_COLOR}; border: none; font-size: 14px;")
-            self.status_indicator.setText("● 入侵失败")
+            self.set_status("● 入侵失败", "failed")
             self.add_log("入侵操作失败", "error")
             
             # 显示失败原因
@@ -742,8 +684,37 @@ class SystemBreachWindow(QWidget):
         
         # 停止数据查看器的动态更新，但保留内容
         if self.hex_viewer.active:
-            self.hex_viewer.active = False
-            self.hex_viewer.update_timer.stop()
+            self.hex_viewer.stop()
+    
+    def release_breach(self):
+        """停止并释放入侵线程"""
+        if self.breach_thread is None:
+            return
+        if self.breach_thread.isRunning():
+            self.breach_thread.stop()
+            self.breach_thread.wait(1000)  # 等待最多1秒
+        if self.breach_thread.isRunning():
+            self.breach_thread.finished.connect(self.breach_thread.deleteLater)
+        else:
+            self.breach_thread.deleteLater()
+        self.breach_thread = None
+    
+    def reset_state(self):
+        """重置为刚打开时的状态，窗口被复用时调用"""
+        self.release_breach()
+        self.hex_viewer.stop()
+        self.hex_viewer.setText("数据查看器将在入侵开始后显示目标系统数据")
+        self.breach_button.setText("开始入侵")
+        self.target_combo.setEnabled(True)
+        self.set_status("● 待命", "idle")
+        self.progress_bar.setValue(0)
+        self.clear_log()
+        self.positionWindow()
+        
+        # 重新开始时钟
+        self.blink_timer.stop()
+        self.clock_timer.start()
+        self.updateClock()
     
     def mousePressEvent(self, event):
         """鼠标按下事件，用于移动窗口"""
@@ -770,4 +741,9 @@ class SystemBreachWindow(QWidget):
         if self.breach_thread and self.breach_thread.isRunning():
             self.breach_thread.stop()
             self.breach_thread.wait(1000)  # 等待最多1秒
+        
+        # 隐藏的窗口不需要闪烁和时钟
+        self.hex_viewer.stop()
+        self.blink_timer.stop()
+        self.clock_timer.stop()
         super().closeEvent(event) 
\ No newline at end of file
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+
+import pytest
+
+# 测试不需要显示器，默认使用offscreen平台
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+# 模块都在仓库根目录下
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtWidgets import QApplication
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    """测试共用的QApplication，QObject和帧时钟需要它"""
+    app = QApplication.instance() or QApplication([])
+    yield app
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from commands import CommandRegistry
+
+
+@pytest.fixture
+def registry():
+    calls = []
+    registry = CommandRegistry()
+    registry.calls = calls
+    registry.register("scan", lambda *args: calls.append(("scan",) + args), args=("[target]",), help="扫描")
+    registry.register("scanner", lambda: calls.append(("scanner",)), help="扫描器")
+    registry.register("clear", lambda: calls.append(("clear",)), aliases=("cls",), help="清屏")
+    registry.register("exit", lambda: calls.append(("exit",)), aliases=("Quit",), help="退出")
+    registry.register("status", lambda: calls.append(("status",)), help="状态")
+    registry.register("echo", lambda a, b=None: calls.append(("echo", a, b)), args=("text", "[more]"), help="回显")
+    return registry
+
+
+def test_exact_name_wins_over_longer_names(registry):
+    command, candidates = registry.resolve("scan")
+    assert command.name == "scan"
+    assert candidates == []
+
+
+def test_ambiguous_prefix_lists_candidates(registry):
+    command, candidates = registry.resolve("sc")
+    assert command is None
+    assert candidates == ["scan", "scanner"]
+    command, candidates = registry.resolve("s")
+    assert candidates == ["scan", "scanner", "status"]
+
+
+def test_unique_prefix_and_alias_prefix(registry):
+    assert registry.resolve("sta")[0].name == "status"
+    # 名字和别名都属于同一个命令时前缀不算歧义
+    assert registry.resolve("cl")[0].name == "clear"
+    assert registry.resolve("c")[0].name == "clear"
+    assert registry.resolve("QU")[0].name == "exit"
+
+
+def test_unknown_word(registry):
+    assert registry.resolve("xyz") == (None, [])
+    assert registry.matches("xyz") == []
+
+
+def test_complete_prefers_command_name(registry):
+    assert registry.complete("c") == ("clear", True)
+    assert registry.complete("cls") == ("cls", True)
+    assert registry.complete("q") == ("quit", True)
+    assert registry.complete("E") == ("e", False)
+
+
+def test_complete_ambiguous_extends_to_common_prefix(registry):
+    # scan和scanner的公共前缀停在完整的命令名scan处
+    assert registry.complete("sc") == ("scan", False)
+    assert registry.complete("scann") == ("scanner", True)
+    assert registry.complete("s") == ("s", False)
+    assert registry.complete("zz") == ("zz", False)
+
+
+def test_register_rejects_duplicates_without_side_effects(registry):
+    with pytest.raises(ValueError):
+        registry.register("help", lambda: None, aliases=("CLS",))
+    # 失败的注册不会留下部分名字
+    assert registry.find("help") is None
+    assert registry.resolve("he") == (None, [])
+    with pytest.raises(ValueError):
+        registry.register("Scan", lambda: None)
+
+
+def test_register_prefix_of_existing_name():
+    registry = CommandRegistry()
+    registry.register("scanner", lambda: None)
+    assert registry.resolve("scan")[0].name == "scanner"
+    registry.register("scan", lambda: None)
+    assert registry.resolve("scan")[0].name == "scan"
+    assert registry.resolve("sca") == (None, ["scan", "scanner"])
+
+
+def test_execute_dispatches_arguments(registry):
+    assert registry.execute("   ") == (None, None)
+    command, error = registry.execute("SCAN 10.0.0.0/24")
+    assert (command.name, error) == ("scan", None)
+    command, error = registry.execute("ec hello world")
+    assert error is None
+    assert registry.calls == [("scan", "10.0.0.0/24"), ("echo", "hello", "world")]
+
+
+def test_execute_reports_errors(registry):
+    assert registry.execute("nope")[1] == "未知命令: nope"
+    assert registry.execute("sc")[1] == "命令不明确: sc 可能是 scan, scanner"
+    command, error = registry.execute("echo")
+    assert error == "用法: echo text [more]"
+    assert registry.execute("echo a b c")[1] == "用法: echo text [more]"
+    assert registry.execute("clear now")[1] == "用法: clear"
+    assert registry.calls == []
+
+
+def test_help_text_lists_commands_in_order(registry):
+    lines = registry.help_text().strip().splitlines()
+    assert lines[0] == "可用命令列表:"
+    assert lines[1].lstrip().startswith("scan [target]")
+    assert "clear/cls" in lines[3]
+    # 说明列对齐
+    assert len({line.index(" - ") for line in lines[1:]}) == 1
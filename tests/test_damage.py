@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from PyQt5.QtCore import QRect
+from PyQt5.QtGui import QRegion
+
+from damage import DamageTracker, region_columns
+
+
+class FakeWidget:
+    """记录update调用的替身控件"""
+
+    def __init__(self):
+        self.updates = []
+
+    def update(self, *args):
+        self.updates.append(args)
+
+
+def test_region_columns_empty_region():
+    assert region_columns(QRegion(), 10, 8) == []
+
+
+def test_region_columns_cell_boundaries():
+    # 恰好覆盖第1列的矩形不应算入第2列
+    assert region_columns(QRegion(QRect(10, 0, 10, 5)), 10, 8) == [(1, 1)]
+    # 跨过列边界一个像素就包括两列
+    assert region_columns(QRegion(QRect(19, 0, 2, 5)), 10, 8) == [(1, 2)]
+
+
+def test_region_columns_clamped_to_grid():
+    assert region_columns(QRegion(QRect(-15, 0, 40, 5)), 10, 8) == [(0, 2)]
+    assert region_columns(QRegion(QRect(65, 0, 100, 5)), 10, 8) == [(6, 7)]
+
+
+def test_region_columns_outside_grid():
+    assert region_columns(QRegion(QRect(200, 0, 10, 5)), 10, 8) == []
+
+
+def test_region_columns_disjoint_rects():
+    region = QRegion(QRect(0, 0, 10, 5)).united(QRect(50, 0, 20, 5))
+    assert sorted(region_columns(region, 10, 8)) == [(0, 0), (5, 6)]
+
+
+def test_mark_column_spans_merges_adjacent_columns():
+    tracker = DamageTracker(FakeWidget(), 10, 20)
+    tracker.mark_column_spans([2, 3, 4, 7], [0, 40, 20, 0], [20, 60, 40, 20])
+    # 2-4列合并为一个从最高处到最低处的矩形，第7列单独一个
+    assert QRegion(QRect(20, 0, 30, 60)).united(QRect(70, 0, 10, 20)) == tracker.region
+
+
+def test_mark_column_spans_empty_input():
+    tracker = DamageTracker(FakeWidget(), 10, 20)
+    tracker.mark_column_spans([], [], [])
+    assert not tracker.is_dirty()
+
+
+def test_mark_all_overrides_regions_until_flush():
+    widget = FakeWidget()
+    tracker = DamageTracker(widget, 10, 20)
+    tracker.mark_cell(1, 1)
+    tracker.mark_all()
+    tracker.mark_cell(2, 2)
+    assert tracker.region.isEmpty()
+    tracker.flush()
+    assert widget.updates == [()]
+    assert not tracker.is_dirty()
+
+
+def test_flush_submits_accumulated_region():
+    widget = FakeWidget()
+    tracker = DamageTracker(widget, 10, 20)
+    tracker.mark_cell(1, 2)
+    tracker.mark_rect(QRect(0, 0, 0, 0))
+    tracker.flush()
+    assert len(widget.updates) == 1
+    assert widget.updates[0][0] == QRegion(QRect(10, 40, 10, 20))
+    tracker.flush()
+    assert len(widget.updates) == 1
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import multiprocessing
+
+import pytest
+
+import history
+from history import CommandHistory
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "data" / "history")
+
+
+def read_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+def append_many(path, worker, count):
+    """在另一个进程中追加历史"""
+    log = CommandHistory(path)
+    for index in range(count):
+        log.add(f"worker {worker} command {index} " + "x" * 200)
+
+
+def test_loaded_lazily(path):
+    log = CommandHistory(path)
+    assert log.entries is None
+    assert len(log) == 0
+    assert log.entries == []
+
+
+def test_missing_file_is_created_on_first_add(path):
+    log = CommandHistory(path)
+    log.add("scan")
+    assert read_lines(path) == ["scan"]
+
+
+def test_dedupe_keeps_latest(path):
+    log = CommandHistory(path)
+    for command in ["scan", "status", "scan", "help", "status"]:
+        log.add(command)
+    assert log.commands() == ["scan", "help", "status"]
+    assert len(log) == 3
+    # 文件保留全部记录，加载时再去重
+    assert read_lines(path) == ["scan", "status", "scan", "help", "status"]
+    assert CommandHistory(path).commands() == ["scan", "help", "status"]
+
+
+def test_consecutive_duplicate_not_written(path):
+    log = CommandHistory(path)
+    log.add("scan")
+    log.add(" scan ")
+    assert read_lines(path) == ["scan"]
+
+
+def test_blank_and_multiline_commands(path):
+    log = CommandHistory(path)
+    log.add("   ")
+    log.add("")
+    log.add("echo a\nb")
+    assert log.commands() == ["echo a b"]
+
+
+def test_load_tolerates_damaged_file(path, tmp_path):
+    (tmp_path / "data").mkdir()
+    with open(path, "wb") as f:
+        # 空行、非UTF-8字节以及没有换行结尾的最后一行
+        f.write(b"scan\n\n\xff\xfe bad\nstatus")
+    log = CommandHistory(path)
+    assert log.commands() == ["scan", "�� bad", "status"]
+    log.add("help")
+    assert CommandHistory(path).commands()[-2:] == ["status", "help"]
+
+
+def test_unwritable_path_is_ignored(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    log = CommandHistory(str(blocker / "history"))
+    log.add("scan")
+    assert log.commands() == ["scan"]
+
+
+def test_older_and_newer_skip_replaced_entries(path):
+    log = CommandHistory(path)
+    for command in ["a", "b", "c", "b"]:
+        log.add(command)
+    position, command = log.older(None)
+    assert command == "b"
+    position, command = log.older(position)
+    assert command == "c"
+    position, command = log.older(position)
+    # 被覆盖的旧b被跳过
+    assert command == "a"
+    assert log.older(position) is None
+    position, command = log.newer(position)
+    assert command == "c"
+    assert log.newer(log.older(None)[0]) is None
+    assert log.newer(None) is None
+
+
+def test_search_newest_first(path):
+    log = CommandHistory(path)
+    for command in ["scan 10.0.0.1", "status", "scan 10.0.0.2", "scan 10.0.0.1"]:
+        log.add(command)
+    assert log.search("scan") == ["scan 10.0.0.1", "scan 10.0.0.2"]
+    assert log.search("") == []
+    assert log.search("zzz") == []
+
+
+def test_search_narrows_cached_matches(path):
+    log = CommandHistory(path)
+    for command in ["scan a", "status", "scan b", "stop"]:
+        log.add(command)
+    assert log.search("s") == ["stop", "scan b", "status", "scan a"]
+    assert log.search_matches == [3, 2, 1, 0]
+    assert log.search("sc") == ["scan b", "scan a"]
+    # 追加字符时只在上一次的结果中筛选
+    log.search_matches = [2]
+    assert log.search("sca") == ["scan b"]
+    # 不是上一次查询的延续时重新搜索全部记录
+    assert log.search("st") == ["stop", "status"]
+
+
+def test_search_cache_reset_by_add(path):
+    log = CommandHistory(path)
+    log.add("scan a")
+    assert log.search("scan") == ["scan a"]
+    log.add("scan b")
+    assert log.search("scan ") == ["scan b", "scan a"]
+
+
+def test_compaction_at_threshold(path, monkeypatch):
+    monkeypatch.setattr(history, "COMPACT_MIN_ENTRIES", 8)
+    log = CommandHistory(path)
+    for index in range(8):
+        log.add(f"cmd {index % 2}")
+    # 未超过阈值时保留被覆盖的位置
+    assert len(log.entries) == 8
+    log.add("cmd 0")
+    assert log.entries == ["cmd 1", "cmd 0"]
+    assert log.positions == {"cmd 1": 0, "cmd 0": 1}
+    assert log.older(None) == (1, "cmd 0")
+    log.add("cmd 1")
+    assert log.commands() == ["cmd 0", "cmd 1"]
+
+
+def test_append_takes_exclusive_lock(path, monkeypatch):
+    calls = []
+
+    class FakeFcntl:
+        LOCK_EX = "exclusive"
+
+        @staticmethod
+        def flock(fd, operation):
+            calls.append(operation)
+
+    monkeypatch.setattr(history, "fcntl", FakeFcntl)
+    log = CommandHistory(path)
+    log.add("scan")
+    log.add("status")
+    assert calls == ["exclusive", "exclusive"]
+
+
+def test_append_without_fcntl(path, monkeypatch):
+    monkeypatch.setattr(history, "fcntl", None)
+    log = CommandHistory(path)
+    log.add("scan")
+    assert read_lines(path) == ["scan"]
+
+
+def test_concurrent_appends_do_not_interleave(path):
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=append_many, args=(path, worker, 200)) for worker in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join(60)
+        assert process.exitcode == 0
+    lines = read_lines(path)
+    assert len(lines) == 800
+    assert sorted(lines) == sorted(f"worker {worker} command {index} " + "x" * 200
+                                   for worker in range(4) for index in range(200))
+    assert len(CommandHistory(path)) == 800
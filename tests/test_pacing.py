@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import pytest
+from PyQt5.QtCore import QObject
+
+from pacing import FramePacer, MAX_STEP
+
+
+class FakeClock:
+    """替代QElapsedTimer，经过的时间由测试指定"""
+
+    def __init__(self, seconds=0.0):
+        self.seconds = seconds
+
+    def nsecsElapsed(self):
+        return int(self.seconds * 1e9)
+
+    def elapsed(self):
+        return int(self.seconds * 1000)
+
+    def isValid(self):
+        return True
+
+    def start(self):
+        pass
+
+    def restart(self):
+        pass
+
+
+@pytest.fixture
+def parent(qapp):
+    owner = QObject()
+    yield owner
+    owner.deleteLater()
+
+
+def make_pacer(parent, fps=30, render=True, catch_up=None):
+    steps, frames = [], []
+    pacer = FramePacer(parent, steps.append, (lambda: frames.append(1)) if render else None,
+                       target_fps=fps, catch_up=catch_up)
+    return pacer, steps, frames
+
+
+def test_step_limit_never_below_two_frames(parent):
+    pacer, _, _ = make_pacer(parent, fps=30)
+    assert pacer.step_limit() == MAX_STEP
+    pacer.set_target_fps(2)
+    assert pacer.step_limit() == pytest.approx(1.0)
+    # 降低刷新率同样放宽单次推进的上限
+    pacer.set_target_fps(8)
+    pacer.set_rate_scale(0.5)
+    assert pacer.step_limit() == pytest.approx(0.5)
+
+
+def test_tick_clamps_long_stalls(parent):
+    pacer, steps, frames = make_pacer(parent, fps=30)
+    pacer.clock = FakeClock(5.0)
+    pacer.tick()
+    assert steps == [MAX_STEP]
+    assert frames == [1]
+
+
+def test_tick_passes_short_steps_through(parent):
+    pacer, steps, _ = make_pacer(parent, fps=30)
+    pacer.clock = FakeClock(0.02)
+    pacer.tick()
+    assert steps == [pytest.approx(0.02)]
+
+
+def test_overrun_skips_whole_frames(parent):
+    pacer, steps, frames = make_pacer(parent, fps=20)
+    pacer.clock = FakeClock(0.05)
+    pacer.paint_clock = FakeClock(pacer.frame_budget() * 2.5)
+    pacer.paint_finished()
+    assert pacer.skip_frames == 2
+
+    for _ in range(3):
+        pacer.tick()
+    # 跳过的帧仍然推进模拟，只是不绘制
+    assert len(steps) == 3
+    assert frames == [1]
+    assert pacer.frames_skipped == 2
+    assert pacer.frames_rendered == 1
+
+
+def test_paint_within_budget_skips_nothing(parent):
+    pacer, _, _ = make_pacer(parent, fps=20)
+    pacer.paint_clock = FakeClock(pacer.frame_budget() * 0.9)
+    pacer.paint_finished()
+    assert pacer.skip_frames == 0
+
+
+def test_self_updating_simulation_never_skips(parent):
+    pacer, steps, _ = make_pacer(parent, render=False)
+    pacer.clock = FakeClock(0.01)
+    pacer.skip_frames = 3
+    pacer.tick()
+    assert len(steps) == 1
+    assert pacer.frames_skipped == 0
+
+
+def test_frame_interval_limits(parent):
+    pacer, _, _ = make_pacer(parent, fps=30)
+    assert pacer.frame_interval() == 33
+    pacer.set_target_fps(5000)
+    assert pacer.frame_interval() == 1
+    pacer.set_target_fps(0)
+    assert pacer.target_fps == 0.1
+    assert pacer.timer.interval == 10000
+
+
+def test_hidden_time_is_caught_up_once(parent):
+    caught = []
+    pacer, _, _ = make_pacer(parent, catch_up=caught.append)
+    pacer.start()
+    pacer.hidden_clock = FakeClock(3.0)
+    pacer.set_visible(False)
+    assert not pacer.timer.isActive()
+    assert pacer.is_active()
+    # 重复的可见性通知不会重复补时间
+    pacer.set_visible(False)
+    pacer.set_visible(True)
+    pacer.set_visible(True)
+    assert caught == [3.0]
+    assert pacer.timer.isActive()
+    pacer.stop()
+
+
+def test_start_while_hidden_waits_for_visibility(parent):
+    pacer, _, _ = make_pacer(parent)
+    pacer.set_visible(False)
+    pacer.start()
+    assert not pacer.timer.isActive()
+    pacer.set_visible(True)
+    assert pacer.timer.isActive()
+    pacer.stop()
+    assert not pacer.is_active()
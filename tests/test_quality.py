@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import pytest
+from PyQt5.QtCore import QObject
+
+from pacing import FramePacer
+from quality import (QualityGovernor, QUALITY_FULL, QUALITY_NO_ANTIALIAS,
+                     QUALITY_LOW_DENSITY, QUALITY_NO_TRAILS, QUALITY_LOW_RATE,
+                     LOW_DENSITY, LOW_RATE)
+
+BUDGET = 0.02
+
+
+@pytest.fixture
+def governor(qapp):
+    owner = QObject()
+    pacer = FramePacer(owner, lambda dt: None, lambda: None, target_fps=50)
+    governor = QualityGovernor(pacer, smoothing=0.5, downgrade_frames=3, upgrade_frames=5)
+    yield governor
+    owner.deleteLater()
+
+
+def feed(governor, paint_time, frames):
+    for _ in range(frames):
+        governor.record(paint_time, BUDGET)
+
+
+def test_attaches_to_pacer(governor):
+    assert governor.pacer.governor is governor
+    assert governor.budget == pytest.approx(BUDGET)
+
+
+def test_downgrades_after_consecutive_overruns(governor):
+    changes = []
+    governor.level_changed.connect(lambda level, reason: changes.append(level))
+    feed(governor, 0.05, 2)
+    assert governor.level == QUALITY_FULL
+    feed(governor, 0.05, 1)
+    assert governor.level == QUALITY_NO_ANTIALIAS
+    assert changes == [QUALITY_NO_ANTIALIAS]
+    # 降级后重新计数，再超出三帧才降下一级
+    feed(governor, 0.05, 2)
+    assert governor.level == QUALITY_NO_ANTIALIAS
+    feed(governor, 0.05, 1)
+    assert governor.level == QUALITY_LOW_DENSITY
+
+
+def test_single_spike_is_smoothed(governor):
+    feed(governor, 0.001, 10)
+    governor.record(0.03, BUDGET)
+    assert governor.average < BUDGET
+    assert governor.over_frames == 0
+
+
+def test_first_sample_seeds_average(governor):
+    governor.record(0.05, BUDGET)
+    assert governor.average == pytest.approx(0.05)
+
+
+def test_level_stops_at_lowest(governor):
+    feed(governor, 0.1, 50)
+    assert governor.level == QUALITY_LOW_RATE
+    assert not governor.antialiasing
+    assert not governor.trails
+    assert governor.density == LOW_DENSITY
+    assert governor.rate_scale == LOW_RATE
+    assert governor.pacer.rate_scale == LOW_RATE
+
+
+def test_upgrades_slowly_with_headroom(governor):
+    governor.set_level(QUALITY_NO_TRAILS)
+    feed(governor, 0.001, 4)
+    assert governor.level == QUALITY_NO_TRAILS
+    feed(governor, 0.001, 1)
+    assert governor.level == QUALITY_LOW_DENSITY
+
+
+def test_paint_near_budget_holds_level(governor):
+    governor.set_level(QUALITY_LOW_DENSITY)
+    # 介于预算一半和预算之间时既不降级也不升级
+    feed(governor, BUDGET * 0.8, 100)
+    assert governor.level == QUALITY_LOW_DENSITY
+    assert governor.over_frames == 0
+    assert governor.under_frames == 0
+
+
+def test_alternating_samples_reset_counters(governor):
+    # 不做平滑，每帧的耗时直接作为平均值
+    governor.smoothing = 1.0
+    for _ in range(10):
+        governor.record(0.05, BUDGET)
+        governor.record(0.05, BUDGET)
+        governor.record(0.0, BUDGET)
+        governor.record(0.0, BUDGET)
+    assert governor.level == QUALITY_FULL
+
+
+def test_set_level_clamps_and_ignores_no_change(governor):
+    changes = []
+    governor.level_changed.connect(lambda level, reason: changes.append((level, reason)))
+    governor.set_level(99)
+    governor.set_level(QUALITY_LOW_RATE)
+    governor.set_level(-5, "恢复")
+    assert changes == [(QUALITY_LOW_RATE, "手动设置"), (QUALITY_FULL, "恢复")]
+    assert governor.pacer.rate_scale == 1.0
+
+
+def test_status(governor):
+    governor.record(0.0123, BUDGET)
+    status = governor.status()
+    assert status["level"] == QUALITY_FULL
+    assert status["paint_ms"] == 12.3
+    assert status["budget_ms"] == 20.0
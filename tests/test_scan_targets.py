@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from scan_targets import (format_address, parse_address, parse_item, parse_targets,
+                          merge_intervals, subtract_intervals, TargetSet)
+
+
+def ip(text):
+    return parse_address(text)
+
+
+def test_address_round_trip():
+    for text in ["0.0.0.0", "10.1.2.3", "255.255.255.255"]:
+        assert format_address(parse_address(text)) == text
+
+
+@pytest.mark.parametrize("item, expected", [
+    ("192.168.1.0/24", ("192.168.1.1", "192.168.1.254")),
+    ("192.168.1.77/24", ("192.168.1.1", "192.168.1.254")),
+    ("10.0.0.0/30", ("10.0.0.1", "10.0.0.2")),
+    ("10.0.0.0/31", ("10.0.0.0", "10.0.0.1")),
+    ("10.0.0.9/32", ("10.0.0.9", "10.0.0.9")),
+    ("10.0.0.1-10.0.3.255", ("10.0.0.1", "10.0.3.255")),
+    ("10.0.0.1-50", ("10.0.0.1", "10.0.0.50")),
+    ("10.0.0.7-7", ("10.0.0.7", "10.0.0.7")),
+    ("192.168.1.5", ("192.168.1.5", "192.168.1.5")),
+    ("192.168.1", ("192.168.1.1", "192.168.1.254")),
+    ("10.1", ("10.1.0.1", "10.1.255.254")),
+    ("10", ("10.0.0.1", "10.255.255.254")),
+])
+def test_parse_item(item, expected):
+    assert parse_item(item) == (ip(expected[0]), ip(expected[1]))
+
+
+def test_parse_item_whole_network():
+    assert parse_item("192.168.1.0/24", hosts_only=False) == (ip("192.168.1.0"), ip("192.168.1.255"))
+    assert parse_item("10.1", hosts_only=False) == (ip("10.1.0.0"), ip("10.1.255.255"))
+
+
+@pytest.mark.parametrize("item", [
+    "", "10.0.0.50-10.0.0.1", "10.0.0.5-1", "10.0.0.256", "10.0.0.0/33",
+    "host.example", "1.2.3.4.5", "10.0.0.1-", "-10.0.0.1", "300",
+])
+def test_parse_item_rejects_invalid(item):
+    with pytest.raises(ValueError, match="无效的目标"):
+        parse_item(item)
+
+
+def test_merge_intervals():
+    assert merge_intervals([]) == []
+    # 重叠、相邻、包含以及乱序的区间
+    assert merge_intervals([(20, 30), (1, 5), (6, 8), (25, 40), (50, 50), (21, 22)]) == \
+        [(1, 8), (20, 40), (50, 50)]
+    assert merge_intervals([(1, 10), (1, 10)]) == [(1, 10)]
+    assert merge_intervals([(1, 3), (5, 7)]) == [(1, 3), (5, 7)]
+
+
+def test_subtract_intervals():
+    assert subtract_intervals([], [(1, 5)]) == []
+    assert subtract_intervals([(1, 10)], []) == [(1, 10)]
+    # 排除区间在中间、两端、完全覆盖以及跨越多个区间
+    assert subtract_intervals([(1, 10)], [(4, 6)]) == [(1, 3), (7, 10)]
+    assert subtract_intervals([(1, 10)], [(0, 1), (10, 12)]) == [(2, 9)]
+    assert subtract_intervals([(1, 10)], [(0, 20)]) == []
+    assert subtract_intervals([(1, 10), (20, 30), (40, 50)], [(8, 22), (45, 45)]) == \
+        [(1, 7), (23, 30), (40, 44), (46, 50)]
+    assert subtract_intervals([(5, 6)], [(1, 2), (8, 9)]) == [(5, 6)]
+
+
+def test_subtract_reuses_exclusion_across_intervals():
+    # 一个排除区间覆盖多个目标区间时，每个区间都要检查它
+    assert subtract_intervals([(1, 3), (5, 7), (9, 11)], [(2, 10)]) == [(1, 1), (11, 11)]
+
+
+def test_target_set():
+    targets = TargetSet([(ip("10.0.0.254"), ip("10.0.1.1")), (ip("10.0.2.5"), ip("10.0.2.5"))])
+    assert len(targets) == 5
+    assert list(targets) == ["10.0.0.254", "10.0.0.255", "10.0.1.0", "10.0.1.1", "10.0.2.5"]
+    assert "10.0.1.0" in targets
+    assert ip("10.0.2.5") in targets
+    assert "10.0.2.4" not in targets
+    assert "10.0.0.1" not in targets
+    assert "10.0.3.0" not in targets
+
+
+def test_target_set_is_lazy():
+    targets = parse_targets("10.0.0.0/8")
+    assert len(targets) == 2 ** 24 - 2
+    addresses = iter(targets)
+    assert next(addresses) == "10.0.0.1"
+    assert next(addresses) == "10.0.0.2"
+
+
+def test_parse_targets_with_exclusions():
+    targets = parse_targets("10.0.0.0/24, 10.0.0.100-10.0.1.10 !10.0.0.0/25,!10.0.1.5")
+    assert targets.intervals == [(ip("10.0.0.128"), ip("10.0.1.4")), (ip("10.0.1.6"), ip("10.0.1.10"))]
+    assert len(targets) == 138
+
+
+def test_parse_targets_overlapping_inputs_counted_once():
+    targets = parse_targets("192.168.1.0/24 192.168.1.10 192.168.1.1-20")
+    assert len(targets) == 254
+
+
+def test_parse_targets_errors():
+    with pytest.raises(ValueError, match="未指定扫描目标"):
+        parse_targets("  , ")
+    with pytest.raises(ValueError, match="未指定扫描目标"):
+        parse_targets("!10.0.0.1")
+    with pytest.raises(ValueError, match="没有剩余"):
+        parse_targets("10.0.0.1-10.0.0.5 !10.0.0.0/24")
+    with pytest.raises(ValueError, match="无效的目标: 10.0.0.999"):
+        parse_targets("10.0.0.1, 10.0.0.999")
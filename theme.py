@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from PyQt5.QtWidgets import QApplication
+
+# 风格常量 - 各窗口统一使用
+BG_COLOR = "#000000"
+TEXT_COLOR = "#00FF00"
+ACCENT_COLOR = "#00FFAA"
+HIGHLIGHT_COLOR = "#FF0000"
+WARNING_COLOR = "#FFAA00"
+ERROR_COLOR = "#FF3333"
+SUCCESS_COLOR = "#33FF33"
+DISABLED_COLOR = "#007700"
+DEFAULT_FONT = "Consolas"
+DEFAULT_FONT_SIZE = 14
+
+# 各模块窗口共用的控件样式
+MODULE_WINDOWS = ("NetworkScannerWindow", "SystemBreachWindow", "ThreatMapWindow")
+FORM_WINDOWS = ("NetworkScannerWindow", "SystemBreachWindow")
+
+
+def scoped(windows, selector):
+    """为每个窗口类生成带作用域的选择器"""
+    return ", ".join(f"{window} {part.strip()}" if part.strip() else window
+                     for window in windows for part in selector.split(","))
+
+
+# 整个程序只使用这一份样式表，在第一个窗口创建时设置到QApplication上
+STYLESHEET = f"""
+    /* 主窗口 */
+    HackerConsole {{
+        background-color: {BG_COLOR};
+        border: 1px solid {TEXT_COLOR};
+    }}
+    Terminal {{
+        background-color: {BG_COLOR};
+        color: {TEXT_COLOR};
+        border: 1px solid {TEXT_COLOR};
+        font-family: {DEFAULT_FONT};
+        font-size: {DEFAULT_FONT_SIZE}px;
+    }}
+    CommandInput {{
+        background-color: {BG_COLOR};
+        color: {TEXT_COLOR};
+        border: 1px solid {TEXT_COLOR};
+        border-radius: 0px;
+        padding: 5px 8px;
+        font-family: {DEFAULT_FONT};
+        font-size: {DEFAULT_FONT_SIZE}px;
+        selection-background-color: {ACCENT_COLOR};
+        selection-color: {BG_COLOR};
+        min-height: 30px;
+    }}
+    QLabel#promptLabel {{
+        color: {TEXT_COLOR};
+        font-weight: bold;
+        font-family: {DEFAULT_FONT};
+        font-size: {DEFAULT_FONT_SIZE}px;
+    }}
+    CodeRainWindow {{
+        background-color: {BG_COLOR};
+    }}
+
+    /* 模块窗口 */
+    {scoped(MODULE_WINDOWS, ",QWidget")} {{
+        background-color: {BG_COLOR};
+        color: {TEXT_COLOR};
+        font-family: {DEFAULT_FONT};
+        border: 1px solid {TEXT_COLOR};
+    }}
+    {scoped(MODULE_WINDOWS, "QLabel")} {{
+        border: none;
+        font-size: {DEFAULT_FONT_SIZE}px;
+    }}
+    {scoped(FORM_WINDOWS, "QProgressBar")} {{
+        border: 1px solid {TEXT_COLOR};
+        border-radius: 0px;
+        text-align: center;
+        background-color: {BG_COLOR};
+        font-size: {DEFAULT_FONT_SIZE}px;
+        min-height: 20px;
+    }}
+    SystemBreachWindow QProgressBar {{
+        min-height: 25px;
+    }}
+    {scoped(FORM_WINDOWS, "QProgressBar::chunk")} {{
+        background-color: {TEXT_COLOR};
+    }}
+    {scoped(FORM_WINDOWS, "QPushButton")} {{
+        background-color: {BG_COLOR};
+        color: {TEXT_COLOR};
+        border: 1px solid {TEXT_COLOR};
+        padding: 5px;
+        min-height: 30px;
+        font-size: {DEFAULT_FONT_SIZE}px;
+    }}
+    {scoped(FORM_WINDOWS, "QPushButton:hover")} {{
+        background-color: rgba(0, 255, 170, 30%);
+        color: white;
+    }}
+    {scoped(FORM_WINDOWS, "QPushButton:pressed")} {{
+        background-color: rgba(0, 255, 170, 50%);
+    }}
+    {scoped(FORM_WINDOWS, "QLineEdit")} {{
+        background-color: {BG_COLOR};
+        color: {TEXT_COLOR};
+        border: 1px solid {TEXT_COLOR};
+        padding: 5px;
+        font-size: {DEFAULT_FONT_SIZE}px;
+    }}
+    SystemBreachWindow QLineEdit {{
+        min-height: 30px;
+    }}
+    {scoped(FORM_WINDOWS, "QLineEdit:disabled, QComboBox:disabled")} {{
+        color: {DISABLED_COLOR};
+        border-color: {DISABLED_COLOR};
+    }}
+
+    /* 网络扫描窗口 */
+    NetworkScannerWindow QTreeView {{
+        background-color: {BG_COLOR};
+        color: {TEXT_COLOR};
+        border: 1px solid {TEXT_COLOR};
+        alternate-background-color: #0A0A0A;
+        font-size: {DEFAULT_FONT_SIZE}px;
+    }}
+    NetworkScannerWindow QTreeView::item:selected {{
+        background-color: rgba(0, 255, 170, 30%);
+    }}
+    NetworkScannerWindow QTreeView::item {{
+        border-bottom: 1px solid #222222;
+        padding: 2px;
+    }}
+    NetworkScannerWindow QHeaderView::section {{
+        background-color: {BG_COLOR};
+        color: {TEXT_COLOR};
+        border: 1px solid {TEXT_COLOR};
+        padding: 6px;
+        font-size: {DEFAULT_FONT_SIZE}px;
+    }}
+    NetworkScannerWindow QGroupBox {{
+        background-color: {BG_COLOR};
+        color: {TEXT_COLOR};
+        border: 1px solid {TEXT_COLOR};
+        margin-top: 12px;
+        font-size: {DEFAULT_FONT_SIZE}px;
+    }}
+    NetworkScannerWindow QGroupBox::title {{
+        subcontrol-origin: margin;
+        subcontrol-position: top left;
+        padding: 0 5px;
+    }}
+
+    /* 系统入侵窗口 */
+    SystemBreachWindow QTextEdit {{
+        background-color: {BG_COLOR};
+        color: {TEXT_COLOR};
+        border: 1px solid {TEXT_COLOR};
+        font-family: {DEFAULT_FONT};
+        font-size: {DEFAULT_FONT_SIZE}px;
+        selection-background-color: {ACCENT_COLOR};
+        selection-color: {BG_COLOR};
+    }}
+    SystemBreachWindow QComboBox {{
+        background-color: {BG_COLOR};
+        color: {TEXT_COLOR};
+        border: 1px solid {TEXT_COLOR};
+        padding: 5px;
+        min-height: 30px;
+        font-size: {DEFAULT_FONT_SIZE}px;
+    }}
+    SystemBreachWindow QComboBox::drop-down {{
+        border: none;
+        width: 20px;
+    }}
+    SystemBreachWindow QComboBox::down-arrow {{
+        image: none;
+        width: 0px;
+    }}
+    SystemBreachWindow QComboBox QAbstractItemView {{
+        background-color: {BG_COLOR};
+        color: {TEXT_COLOR};
+        selection-background-color: {ACCENT_COLOR};
+        selection-color: {BG_COLOR};
+    }}
+    QLabel#sectionLabel {{
+        font-weight: bold;
+        font-size: 14px;
+    }}
+    QLabel#statusIndicator {{
+        color: {TEXT_COLOR};
+        font-size: 14px;
+    }}
+    QLabel#statusIndicator[state="running"] {{
+        color: {HIGHLIGHT_COLOR};
+    }}
+    QLabel#statusIndicator[state="success"] {{
+        color: {SUCCESS_COLOR};
+    }}
+    QLabel#statusIndicator[state="failed"] {{
+        color: {ERROR_COLOR};
+    }}
+
+    /* 威胁地图窗口 */
+    QWidget#infoPanel {{
+        background-color: {BG_COLOR};
+        border: none;
+        border-bottom: 1px solid {TEXT_COLOR};
+    }}
+    QLabel#totalAttacksLabel {{
+        font-size: 16px;
+    }}
+    QLabel#selectedAttackLabel {{
+        color: {ACCENT_COLOR};
+    }}
+    QWidget#mapArea {{
+        background-color: transparent;
+        border: none;
+    }}
+    QWidget#statusBar {{
+        background-color: {BG_COLOR};
+        border: none;
+    }}
+    QLabel#statusNote {{
+        font-size: 10px;
+    }}
+
+    /* 公共部件 */
+    QLabel#titleLabel {{
+        color: {TEXT_COLOR};
+        font-weight: bold;
+        font-family: {DEFAULT_FONT};
+        font-size: 16px;
+    }}
+    QLabel#clockLabel {{
+        font-family: {DEFAULT_FONT};
+        font-size: 14px;
+    }}
+    QFrame#separator {{
+        background-color: {TEXT_COLOR};
+        border: none;
+    }}
+    QPushButton#closeButton {{
+        background-color: transparent;
+        color: {TEXT_COLOR};
+        border: none;
+        font-size: 18px;
+        font-weight: bold;
+    }}
+    QPushButton#closeButton:hover {{
+        color: {HIGHLIGHT_COLOR};
+    }}
+    QLabel#perfOverlay {{
+        background-color: rgba(0, 0, 0, 70%);
+        color: {ACCENT_COLOR};
+        border: 1px solid {ACCENT_COLOR};
+        padding: 4px;
+        font-family: {DEFAULT_FONT};
+        font-size: 11px;
+    }}
+    CustomTitleBar QPushButton {{
+        background-color: transparent;
+        color: {TEXT_COLOR};
+        border: none;
+        font-family: {DEFAULT_FONT};
+        font-weight: bold;
+        font-size: 18px;
+    }}
+    CustomTitleBar QPushButton:hover {{
+        background-color: rgba(0, 255, 170, 30%);
+        color: white;
+    }}
+    CustomTitleBar QPushButton:pressed {{
+        background-color: rgba(0, 255, 170, 50%);
+    }}
+"""
+
+
+def ensure_theme():
+    """把程序样式表设置到QApplication上，只在第一次调用时生效"""
+    app = QApplication.instance()
+    if app is not None and not app.property("theme_applied"):
+        app.setStyleSheet(STYLESHEET)
+        app.setProperty("theme_applied", True)
+
+
+def set_style_state(widget, name, value):
+    """设置控件的动态属性并只重新应用该控件的样式，不重新解析样式表"""
+    if widget.property(name) == value:
+        return
+    widget.setProperty(name, value)
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
+    widget.update()
@@ -4,19 +4,23 @@
 import random
 import time
 import math
+import threading
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                             QFrame, QDesktopWidget, QPushButton, QApplication)
 from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QThread, QPointF, QRectF
 from PyQt5.QtGui import QFont, QColor, QPainter, QPen, QBrush, QPainterPath, QLinearGradient
 import sys
 
-# 风格常量 - 与主窗口保持一致
-TITLE_COLOR = "#00FF00"
-BG_COLOR = "#000000"
-ACCENT_COLOR = "#00FFAA"
-HIGHLIGHT_COLOR = "#FF0000"
-DEFAULT_FONT = "Consolas"
-DEFAULT_FONT_SIZE = 14
+from pacing import FramePacer
+from quality import QualityGovernor
+from theme import ensure_theme, DEFAULT_FONT, DEFAULT_FONT_SIZE
+from visibility import VisibilityWatcher
+
+# 攻击动画的基准时间步长(秒)，攻击速度以此为单位
+ATTACK_TICK = 0.016
+
+# 默认目标帧率
+MAP_FPS = 60
 
 # 模拟世界地图坐标
 # 格式: "国家": (x坐标百分比, y坐标百分比)
@@ -92,7 +96,7 @@ class CustomTitleBar(QWidget):
         
         # 窗口标题
         self.title_label = QLabel("实时网络威胁地图")
-        self.title_label.setStyleSheet(f"color: {TITLE_COLOR}; font-weight: bold; font-family: {DEFAULT_FONT}; font-size: 16px;")
+        self.title_label.setObjectName("titleLabel")
         self.title_label.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
         
         # 窗口按钮
@@ -108,9 +112,6 @@ class CustomTitleBar(QWidget):
         self.close_button.setFixedSize(35, 35)
         self.close_button.clicked.connect(self.parent.close)
         
-        # 设置按钮样式
-        self.set_button_style()
-        
         # 添加控件到布局
         layout.addSpacing(10)
         layout.addWidget(self.title_label)
@@ -121,30 +122,6 @@ class CustomTitleBar(QWidget):
         
         self.setLayout(layout)
     
-    def set_button_style(self):
-        """设置按钮样式"""
-        style = f"""
-            QPushButton {{
-                background-color: transparent;
-                color: {TITLE_COLOR};
-                border: none;
-                font-family: {DEFAULT_FONT};
-                font-weight: bold;
-                font-size: 18px;
-            }}
-            QPushButton:hover {{
-                background-color: rgba(0, 255, 170, 30%);
-                color: white;
-            }}
-            QPushButton:pressed {{
-                background-color: rgba(0, 255, 170, 50%);
-            }}
-        """
-        
-        self.minimize_button.setStyleSheet(style)
-        self.maximize_button.setStyleSheet(style)
-        self.close_button.setStyleSheet(style)
-    
     def toggle_maximize(self):
         """切换窗口最大化状态"""
         if self.parent.isMaximized():
@@ -186,7 +163,7 @@ class AttackAnimation:
         self.source = source  # 源坐标 (x, y)
         self.target = target  # 目标坐标 (x, y)
         self.progress = 0.0   # 动画进度 (0.0 ~ 1.0)
-        self.speed = random.uniform(0.005, 0.02)  # 速度
+        self.speed = random.uniform(0.005, 0.02)  # 每个基准步长的进度
         self.size = random.uniform(3, 6)          # 粒子大小
         self.active = True    # 是否活跃
         self.color = self.get_attack_color()      # 攻击颜色
@@ -202,12 +179,12 @@ class AttackAnimation:
         
         self.control_point = (cx, cy)
     
-    def update(self):
-        """更新动画进度"""
+    def update(self, dt=ATTACK_TICK):
+        """按经过的时间更新动画进度"""
         if not self.active:
             return False
             
-        self.progress += self.speed
+        self.progress += self.speed * dt / ATTACK_TICK
         if self.progress >= 1.0:
             self.active = False
             return False
@@ -241,6 +218,9 @@ class ThreatMapThread(QThread):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.is_running = True
+        # 窗口不可见时清除，线程阻塞等待而不生成攻击
+        self.resumed = threading.Event()
+        self.resumed.set()
         self.map_width = 0
         self.map_height = 0
         
@@ -259,12 +239,25 @@ class ThreatMapThread(QThread):
     def stop(self):
         """停止线程"""
         self.is_running = False
+        self.resumed.set()
+    
+    def set_paused(self, paused):
+        """暂停或恢复攻击生成"""
+        if paused:
+            self.resumed.clear()
+        else:
+            self.resumed.set()
     
     def run(self):
         """运行线程"""
         countries = list(WORLD_LOCATIONS.keys())
         
         while self.is_running:
+            # 暂停时阻塞，不占用CPU
+            self.resumed.wait()
+            if not self.is_running:
+                break
+            
             # 随机选择源和目标国家
             source_country = random.choice(countries)
             target_country = random.choice(countries)
@@ -323,22 +316,33 @@ class ThreatMapWindow(QWidget):
     # 添加关闭信号
     closed = pyqtSignal()
     
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, target_fps=MAP_FPS):
         super().__init__(parent, Qt.Window | Qt.FramelessWindowHint)  # 无边框窗口
+        ensure_theme()
         self.initUI()
         
         # 攻击动画列表
         self.active_attacks = []
+        self.attack_share = 0.0  # 降低画质时累积的显示份额
+        
+        # 动画节奏控制，按实际经过的时间推进
+        self.pacer = FramePacer(self, self.update_animations, self.update, target_fps,
+                                catch_up=self.update_animations)
+        self.pacer.start()
         
-        # 动画定时器
-        self.animation_timer = QTimer(self)
-        self.animation_timer.timeout.connect(self.update_animations)
-        self.animation_timer.start(16)  # ~60 FPS
+        # 根据绘制耗时自动调节画质
+        self.governor = QualityGovernor(self.pacer)
         
         # 数据生成线程
         self.threat_thread = ThreatMapThread(self)
         self.threat_thread.new_attack.connect(self.add_attack)
         self.threat_thread.update_stats.connect(self.update_statistics)
+        self.pacer.probe.watch_signals(self.threat_thread.new_attack, self.threat_thread.update_stats)
+        
+        # 隐藏、最小化或被遮挡时暂停动画和攻击生成，重新可见时已过期的攻击直接移除
+        self.visibility = VisibilityWatcher(self)
+        self.visibility.visibility_changed.connect(self.set_animating)
+        self.set_animating(self.visibility.visible)
         
         # 拖动相关
         self.drag_position = None
@@ -372,20 +376,6 @@ class ThreatMapWindow(QWidget):
         self.resize(1000, 700)
         self.setWindowTitle("网络威胁实时地图")
         
-        # 设置窗口样式 - 与主窗口一致的边框
-        self.setStyleSheet(f"""
-            QWidget {{
-                background-color: {BG_COLOR};
-                color: {TITLE_COLOR};
-                font-family: {DEFAULT_FONT};
-                border: 1px solid {TITLE_COLOR};
-            }}
-            QLabel {{
-                border: none;
-                font-size: {DEFAULT_FONT_SIZE}px;
-            }}
-        """)
-        
         # 创建主布局
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(0, 0, 0, 0)
@@ -399,35 +389,30 @@ class ThreatMapWindow(QWidget):
         separator = QFrame()
         separator.setFrameShape(QFrame.HLine)
         separator.setFrameShadow(QFrame.Sunken)
-        separator.setStyleSheet(f"background-color: {TITLE_COLOR};")
+        separator.setObjectName("separator")
         separator.setFixedHeight(1)
         main_layout.addWidget(separator)
         
         # 创建信息面板
         self.info_panel = QWidget()
         self.info_panel.setFixedHeight(80)
-        self.info_panel.setStyleSheet(f"""
-            background-color: {BG_COLOR};
-            border: none;
-            border-bottom: 1px solid {TITLE_COLOR};
-        """)
+        self.info_panel.setObjectName("infoPanel")
         info_layout = QHBoxLayout(self.info_panel)
         info_layout.setContentsMargins(10, 5, 10, 5)
         
         # 总攻击计数
         stats_layout = QVBoxLayout()
         self.total_attacks_label = QLabel("总攻击次数: 0")
-        self.total_attacks_label.setStyleSheet(f"color: {TITLE_COLOR}; font-size: 16px; border: none;")
+        self.total_attacks_label.setObjectName("totalAttacksLabel")
         stats_layout.addWidget(self.total_attacks_label)
         
         # 活跃攻击数量
         self.active_attacks_label = QLabel("活跃攻击: 0")
-        self.active_attacks_label.setStyleSheet(f"color: {TITLE_COLOR}; border: none;")
         stats_layout.addWidget(self.active_attacks_label)
         
         # 当前选中的攻击信息
         self.selected_attack_label = QLabel("选择攻击以查看详情")
-        self.selected_attack_label.setStyleSheet(f"color: {ACCENT_COLOR}; border: none;")
+        self.selected_attack_label.setObjectName("selectedAttackLabel")
         stats_layout.addWidget(self.selected_attack_label)
         
         info_layout.addLayout(stats_layout)
@@ -438,35 +423,27 @@ class ThreatMapWindow(QWidget):
         
         # 添加主要地图区域（由paintEvent处理）
         self.map_area = QWidget()
-        self.map_area.setStyleSheet("background-color: transparent; border: none;")
+        self.map_area.setObjectName("mapArea")
         main_layout.addWidget(self.map_area, 1)  # 1是伸展因子
         
         # 添加水平分隔线
         separator2 = QFrame()
         separator2.setFrameShape(QFrame.HLine)
         separator2.setFrameShadow(QFrame.Sunken)
-        separator2.setStyleSheet(f"background-color: {TITLE_COLOR};")
+        separator2.setObjectName("separator")
         separator2.setFixedHeight(1)
         main_layout.addWidget(separator2)
         
         # 状态栏
         status_bar = QWidget()
         status_bar.setFixedHeight(25)
-        status_bar.setStyleSheet(f"""
-            background-color: {BG_COLOR};
-            border: none;
-        """)
+        status_bar.setObjectName("statusBar")
         status_layout = QHBoxLayout(status_bar)
         status_layout.setContentsMargins(10, 0, 10, 0)
         
         # 状态信息
         status_label = QLabel("注: 此地图模拟全球网络攻击流量，仅作为视觉效果展示")
-        status_label.setStyleSheet(f"""
-            color: {TITLE_COLOR};
-            font-family: {DEFAULT_FONT};
-            font-size: 10px;
-            border: none;
-        """)
+        status_label.setObjectName("statusNote")
         status_layout.addWidget(status_label)
         status_layout.addStretch()
         
@@ -486,20 +463,40 @@ class ThreatMapWindow(QWidget):
         self.move((desktop.width() - size.width()) // 2, 
                  (desktop.height() - size.height()) // 2)
     
+    def set_animating(self, visible):
+        """窗口可见性改变时暂停或恢复动画和数据线程"""
+        self.pacer.set_visible(visible)
+        self.threat_thread.set_paused(not visible)
+    
     def add_attack(self, attack):
-        """添加新的攻击动画"""
+        """添加新的攻击动画，降低画质时按密度只保留一部分新攻击"""
+        # 按密度累积份额，满一份才显示，已显示的攻击不受画质变化影响
+        self.attack_share += self.governor.density
+        if self.attack_share < 1:
+            return
+        self.attack_share -= 1
         self.active_attacks.append(attack)
     
-    def update_animations(self):
-        """更新所有攻击动画"""
+    def set_target_fps(self, fps):
+        """设置目标帧率"""
+        self.pacer.set_target_fps(fps)
+    
+    def quality_status(self):
+        """当前画质级别和原因"""
+        return self.governor.status()
+    
+    def perf_metrics(self):
+        """性能浮层和指标导出读取的数据"""
+        return {"name": "threat_map", **self.pacer.probe.metrics(),
+                "quality": self.quality_status(), "objects": {"attacks": len(self.active_attacks)}}
+    
+    def update_animations(self, dt):
+        """按经过的时间更新所有攻击动画"""
         # 更新动画状态
-        self.active_attacks = [attack for attack in self.active_attacks if attack.update()]
+        self.active_attacks = [attack for attack in self.active_attacks if attack.update(dt)]
         
         # 更新活跃攻击标签
         self.active_attacks_label.setText(f"活跃攻击: {len(self.active_attacks)}")
-        
-        # 触发重绘
-        self.update()
     
     def update_statistics(self, stats):
         """更新统计数据"""
@@ -508,8 +505,9 @@ class ThreatMapWindow(QWidget):
     
     def paintEvent(self, event):
         """绘制地图和攻击动画"""
+        self.pacer.paint_started()
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setRenderHint(QPainter.Antialiasing, self.governor.antialiasing)
         
         # 绘制背景
         self.draw_background(painter)
@@ -522,6 +520,9 @@ class ThreatMapWindow(QWidget):
         
         # 绘制攻击
         self.draw_attacks(painter)
+        
+        painter.end()
+        self.pacer.paint_finished()
     
     def draw_background(self, painter):
         """绘制背景"""
@@ -664,7 +665,7 @@ class ThreatMapWindow(QWidget):
                                 attack.size, attack.size)
             
             # 绘制轨迹
-            if attack.progress > 0.05:  # 当动画进行一段时间后才显示轨迹
+            if self.governor.trails and attack.progress > 0.05:  # 当动画进行一段时间后才显示轨迹
                 path = QPainterPath()
                 path.moveTo(attack.source[0], attack.source[1])
                 path.quadTo(attack.control_point[0], attack.control_point[1], 
@@ -716,8 +717,8 @@ class ThreatMapWindow(QWidget):
             self.threat_thread.stop()
             self.threat_thread.wait(1000)  # 等待最多1秒
             
-        # 停止定时器
-        self.animation_timer.stop()
+        # 停止动画
+        self.pacer.stop()
         
         # 发送关闭信号
         self.closed.emit()
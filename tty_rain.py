@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import time
+import shutil
+import argparse
+import numpy as np
+
+from rain_engine import RAIN_TICK, RainEngine
+
+# 默认目标帧率
+TTY_FPS = 20
+
+# 256色调色板中由暗到亮的绿色，雨滴头部使用接近白色的浅绿
+GREEN_LEVELS = [22, 28, 34, 40, 46]
+HEAD_COLOR = 194
+
+# 每个雨滴列在终端中占用的字符列数
+COLUMN_SPACING = 2
+
+# 终端控制序列
+ENTER_SCREEN = "\x1b[?1049h\x1b[?25l\x1b[0m\x1b[2J"
+LEAVE_SCREEN = "\x1b[0m\x1b[?25h\x1b[?1049l"
+
+
+class AnsiRainRenderer:
+    """ANSI终端渲染器，每帧只输出与上一帧不同的字符单元格"""
+
+    def __init__(self, engine, term_columns, term_rows):
+        self.engine = engine
+        self.resize(term_columns, term_rows)
+
+        # 亮度(0~255)到颜色编号的查找表，0表示空白
+        levels = len(GREEN_LEVELS)
+        self.color_table = np.minimum(np.arange(256) * levels // 256 + 1, levels).astype(np.uint8)
+        self.palette = [None] + GREEN_LEVELS + [HEAD_COLOR]
+        self.head_color = levels + 1
+
+    def resize(self, term_columns, term_rows):
+        """终端尺寸改变时调整模拟并清空上一帧"""
+        self.term_columns = term_columns
+        self.term_rows = term_rows
+        self.engine.resize(max(1, term_columns // COLUMN_SPACING), term_rows)
+
+        # 上一帧各单元格的字符索引(-1为空白)和颜色编号
+        self.chars = np.full((term_rows, self.engine.columns), -1, dtype=np.int16)
+        self.colors = np.zeros((term_rows, self.engine.columns), dtype=np.uint8)
+        self.needs_clear = True
+
+    def build_frame(self):
+        """根据模拟状态生成当前帧的字符和颜色网格"""
+        chars = np.full_like(self.chars, -1)
+        colors = np.zeros_like(self.colors)
+        cols, positions, glyphs, brightness = self.engine.visibleCells(self.term_rows)
+        rows = positions.astype(np.intp)
+        chars[rows, cols] = glyphs
+        colors[rows, cols] = np.where(brightness == 255, self.head_color, self.color_table[brightness])
+        return chars, colors
+
+    def render(self):
+        """返回把终端从上一帧更新到当前帧所需的转义序列"""
+        chars, colors = self.build_frame()
+        changed_rows, changed_cols = np.nonzero((chars != self.chars) | (colors != self.colors))
+
+        out = []
+        if self.needs_clear:
+            out.append("\x1b[0m\x1b[2J")
+            self.needs_clear = False
+
+        cursor_row = cursor_col = -1
+        current_color = None
+        for row, col, char, color in zip(changed_rows.tolist(), changed_cols.tolist(),
+                                         chars[changed_rows, changed_cols].tolist(),
+                                         colors[changed_rows, changed_cols].tolist()):
+            x = col * COLUMN_SPACING
+            # 光标已经在目标位置时不需要移动；与上一个单元格只隔着空白间隔列时输出空格更短
+            if row == cursor_row and x - cursor_col == COLUMN_SPACING - 1:
+                out.append(" " * (COLUMN_SPACING - 1))
+            elif row != cursor_row or x != cursor_col:
+                out.append(f"\x1b[{row + 1};{x + 1}H")
+            if char < 0:
+                out.append(" ")
+            else:
+                if color != current_color:
+                    out.append(f"\x1b[38;5;{self.palette[color]}m")
+                    current_color = color
+                out.append(self.engine.charset[char])
+            cursor_row, cursor_col = row, x + 1
+
+        self.chars = chars
+        self.colors = colors
+        return "".join(out)
+
+
+class FrameStats:
+    """统计每帧输出字节数和实际帧率"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.frames = 0
+        self.total_bytes = 0
+        self.peak_bytes = 0
+        self.window_started = self.started
+        self.window_frames = 0
+        self.window_bytes = 0
+
+    def record(self, size):
+        """记录一帧的输出字节数"""
+        self.frames += 1
+        self.total_bytes += size
+        self.peak_bytes = max(self.peak_bytes, size)
+        self.window_frames += 1
+        self.window_bytes += size
+
+    def take_window(self):
+        """返回最近一个统计窗口的(帧率, 每帧字节数)并开始新窗口"""
+        now = time.perf_counter()
+        elapsed = max(now - self.window_started, 1e-6)
+        fps = self.window_frames / elapsed
+        per_frame = self.window_bytes / max(1, self.window_frames)
+        self.window_started = now
+        self.window_frames = 0
+        self.window_bytes = 0
+        return fps, per_frame
+
+    def summary(self):
+        """整个运行过程的统计摘要"""
+        elapsed = max(time.perf_counter() - self.started, 1e-6)
+        return (f"frames: {self.frames}  fps: {self.frames / elapsed:.1f}  "
+                f"bytes/frame: {self.total_bytes / max(1, self.frames):.0f} (peak {self.peak_bytes})  "
+                f"bandwidth: {self.total_bytes * 8 / elapsed / 1000:.1f} kbit/s")
+
+
+def run(out, fps=TTY_FPS, duration=None, show_stats=False, seed=None):
+    """在终端中运行代码雨，直到超时或被Ctrl+C中断"""
+    size = shutil.get_terminal_size()
+    # 显示统计信息时保留最后一行
+    rows = size.lines - 1 if show_stats else size.lines
+    engine = RainEngine(max(1, size.columns // COLUMN_SPACING), rows, seed=seed)
+    renderer = AnsiRainRenderer(engine, size.columns, rows)
+    stats = FrameStats()
+    frame_time = 1.0 / fps
+
+    out.write(ENTER_SCREEN.encode())
+    out.flush()
+    last = time.perf_counter()
+    next_report = last + 1.0
+    try:
+        while duration is None or time.perf_counter() - stats.started < duration:
+            # 终端尺寸变化时重建网格
+            size = shutil.get_terminal_size()
+            rows = size.lines - 1 if show_stats else size.lines
+            if (size.columns, rows) != (renderer.term_columns, renderer.term_rows):
+                renderer.resize(size.columns, rows)
+
+            now = time.perf_counter()
+            engine.step((now - last) / RAIN_TICK)
+            last = now
+
+            frame = renderer.render()
+            if show_stats and now >= next_report:
+                measured_fps, per_frame = stats.take_window()
+                frame += (f"\x1b[{rows + 1};1H\x1b[0m\x1b[2K"
+                          f"{measured_fps:5.1f} fps  {per_frame:7.0f} B/frame")
+                next_report = now + 1.0
+            data = frame.encode()
+            out.write(data)
+            out.flush()
+            stats.record(len(data))
+
+            # 按目标帧率休眠剩余时间
+            remaining = frame_time - (time.perf_counter() - now)
+            if remaining > 0:
+                time.sleep(remaining)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        out.write(LEAVE_SCREEN.encode())
+        out.flush()
+    return stats
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="在ANSI终端中显示代码雨")
+    parser.add_argument("--fps", type=float, default=TTY_FPS, help="目标帧率")
+    parser.add_argument("--duration", type=float, default=None, help="运行秒数，默认直到Ctrl+C")
+    parser.add_argument("--stats", action="store_true", help="在最后一行显示帧率和每帧字节数")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子")
+    args = parser.parse_args(argv)
+
+    stats = run(sys.stdout.buffer, args.fps, args.duration, args.stats, args.seed)
+    print(stats.summary(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from PyQt5.QtCore import QObject, QEvent, pyqtSignal
+
+
+class VisibilityWatcher(QObject):
+    """窗口可见性监视：窗口隐藏、最小化或被完全遮挡时发出visibility_changed(False)
+
+    通过事件过滤器监视窗口的Show/Hide/WindowStateChange事件，
+    以及底层QWindow的Expose事件(窗口系统报告被完全遮挡时isExposed()为False)。
+    """
+
+    visibility_changed = pyqtSignal(bool)
+
+    def __init__(self, window):
+        super().__init__(window)
+        self.window = window
+        self.handle = None
+        self.visible = False
+        window.installEventFilter(self)
+        self.watch_handle()
+        self.refresh()
+
+    def watch_handle(self):
+        """窗口第一次显示后才有QWindow，之后开始监视它的Expose事件"""
+        handle = self.window.windowHandle()
+        if handle is not None and handle is not self.handle:
+            self.handle = handle
+            handle.installEventFilter(self)
+
+    def is_shown(self):
+        """窗口当前是否能被看到"""
+        if not self.window.isVisible() or self.window.isMinimized():
+            return False
+        return self.handle is None or self.handle.isExposed()
+
+    def refresh(self):
+        """重新判断可见性，发生变化时发出信号"""
+        visible = self.is_shown()
+        if visible != self.visible:
+            self.visible = visible
+            self.visibility_changed.emit(visible)
+
+    def eventFilter(self, obj, event):
+        if obj is self.window:
+            if event.type() in (QEvent.Show, QEvent.Hide, QEvent.WindowStateChange):
+                self.watch_handle()
+                self.refresh()
+        elif obj is self.handle and event.type() == QEvent.Expose:
+            self.refresh()
+        return False
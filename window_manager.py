@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+from functools import partial
+from PyQt5.QtCore import Qt, QObject, QEvent
+
+# 每种窗口关闭后最多保留的隐藏实例数
+POOL_SIZE = 1
+
+# 每种窗口最多同时显示的实例数，达到上限时不再打开新窗口
+MAX_WINDOWS = 3
+
+
+def process_memory():
+    """当前进程的常驻内存(字节)，无法获取时返回None"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        # Linux上ru_maxrss单位为KB，macOS上为字节；这里只作为估算
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except (ImportError, OSError):
+        return None
+
+
+class WindowManager(QObject):
+    """子窗口管理器：关闭的窗口隐藏后放回池中复用，池满时随关闭一起销毁"""
+
+    def __init__(self, parent=None, pool_size=POOL_SIZE, max_windows=MAX_WINDOWS):
+        super().__init__(parent)
+        self.pool_size = pool_size
+        self.max_windows = max_windows
+        self.windows = {}  # 窗口类 -> 存活的窗口列表，最近使用的在最后
+        self.pools = {}    # 窗口类 -> 已关闭、等待复用的窗口列表
+        self.releasing = set()  # 已决定销毁、尚未销毁的窗口
+
+        # 统计
+        self.created = 0
+        self.reused = 0
+        self.refused = 0
+        self.released = 0
+
+    def open(self, window_class, *args):
+        """显示一个窗口，优先复用池中的实例；窗口需提供reset_state()
+
+        显示中的窗口已达到上限时不打开，返回None；正在使用的窗口不会被复用。
+        """
+        live = self.windows.setdefault(window_class, [])
+        pool = self.pools.setdefault(window_class, [])
+        if pool:
+            window = pool.pop()
+            window.reset_state()
+            self.reused += 1
+        elif len([window for window in live if window not in self.releasing]) >= self.max_windows:
+            self.refused += 1
+            return None
+        else:
+            window = window_class(*args)
+            window.installEventFilter(self)
+            window.destroyed.connect(partial(self.forget, window))
+            self.created += 1
+        if window in live:
+            live.remove(window)
+        live.append(window)
+
+        window.show()
+        window.raise_()
+        window.activateWindow()
+        return window
+
+    def eventFilter(self, window, event):
+        """窗口关闭时放回池中，池已满时设置WA_DeleteOnClose使其在关闭后销毁"""
+        if event.type() == QEvent.Close:
+            pool = self.pools.get(type(window))
+            # Qt在关闭时会清除WA_DeleteOnClose，等待销毁的窗口另行记录，再次关闭时不重复计数
+            if pool is not None and window not in pool and window not in self.releasing:
+                if len(pool) < self.pool_size:
+                    pool.append(window)
+                else:
+                    window.setAttribute(Qt.WA_DeleteOnClose)
+                    self.releasing.add(window)
+                    self.released += 1
+        return False
+
+    def forget(self, window, *args):
+        """窗口销毁后从列表中移除"""
+        self.releasing.discard(window)
+        window_class = type(window)
+        for windows in (self.windows.get(window_class, []), self.pools.get(window_class, [])):
+            if window in windows:
+                windows.remove(window)
+
+    def close_all(self):
+        """关闭所有显示中的窗口"""
+        for windows in list(self.windows.values()):
+            for window in list(windows):
+                if window.isVisible():
+                    window.close()
+
+    def stats(self):
+        """窗口数量和内存估算"""
+        live = sum(len(windows) for windows in self.windows.values())
+        pooled = sum(len(pool) for pool in self.pools.values())
+        objects = sum(len(window.findChildren(QObject))
+                      for windows in self.windows.values() for window in windows)
+        return {
+            "live": live,
+            "visible": live - pooled,
+            "pooled": pooled,
+            "created": self.created,
+            "reused": self.reused,
+            "refused": self.refused,
+            "released": self.released,
+            "objects": objects,
+            "memory": process_memory(),
+        }